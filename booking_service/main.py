@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from deadline import deadline_middleware
 from database import Base, engine
 from routers import booking
 
@@ -21,6 +22,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Stop work on requests whose gateway deadline has passed
+app.middleware("http")(deadline_middleware)
+
 # Include routers
 app.include_router(booking.router)
 
@@ -26,8 +26,8 @@ class BlindDateBooking(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     match_id = Column(Integer, index=True)
-    user_1_id = Column(Integer, index=True)
-    user_2_id = Column(Integer, index=True)
+    user_1_id = Column(String, index=True)
+    user_2_id = Column(String, index=True)
     
     # Proposed by user_1
     user_1_proposed_venue_id = Column(Integer, nullable=True)
@@ -45,7 +45,7 @@ def create_booking(request: BookingRequest, db: Session = Depends(get_db)):
 # Propose Venue
 # -----------------------------
 @router.post("/propose-venue", response_model=BlindDateBookingResponse)
-def propose_venue(booking_id: int, venue_id: int, user_id: int, db: Session = Depends(get_db)):
+def propose_venue(booking_id: int, venue_id: int, user_id: str, db: Session = Depends(get_db)):
     """Alice proposes a venue for the date"""
     booking = db.query(BlindDateBooking).filter(BlindDateBooking.id == booking_id).first()
     
@@ -64,7 +64,7 @@ def propose_venue(booking_id: int, venue_id: int, user_id: int, db: Session = De
 # Approve Venue
 # -----------------------------
 @router.post("/approve-venue", response_model=BlindDateBookingResponse)
-def approve_venue(approval: VenueApproval, user_id: int, db: Session = Depends(get_db)):
+def approve_venue(approval: VenueApproval, user_id: str, db: Session = Depends(get_db)):
     """Bob approves Alice's proposed venue"""
     booking = db.query(BlindDateBooking).filter(BlindDateBooking.id == approval.booking_id).first()
     
@@ -88,7 +88,7 @@ def approve_venue(approval: VenueApproval, user_id: int, db: Session = Depends(g
 # Propose Time
 # -----------------------------
 @router.post("/propose-time", response_model=BlindDateBookingResponse)
-def propose_time(booking_id: int, date: str, time: str, user_id: int, db: Session = Depends(get_db)):
+def propose_time(booking_id: int, date: str, time: str, user_id: str, db: Session = Depends(get_db)):
     """Alice proposes a date and time for the meeting"""
     booking = db.query(BlindDateBooking).filter(BlindDateBooking.id == booking_id).first()
     
@@ -109,7 +109,7 @@ def propose_time(booking_id: int, date: str, time: str, user_id: int, db: Sessio
 # Approve Time
 # -----------------------------
 @router.post("/approve-time", response_model=BlindDateBookingResponse)
-def approve_time(approval: TimeApproval, user_id: int, db: Session = Depends(get_db)):
+def approve_time(approval: TimeApproval, user_id: str, db: Session = Depends(get_db)):
     """Bob approves Alice's proposed time"""
     booking = db.query(BlindDateBooking).filter(BlindDateBooking.id == approval.booking_id).first()
     
@@ -198,7 +198,7 @@ def get_booking(booking_id: int, db: Session = Depends(get_db)):
 # Get All Bookings for User
 # -----------------------------
 @router.get("/user/{user_id}", response_model=List[BlindDateBookingResponse])
-def get_user_bookings(user_id: int, db: Session = Depends(get_db)):
+def get_user_bookings(user_id: str, db: Session = Depends(get_db)):
     bookings = db.query(BlindDateBooking).filter(
         (BlindDateBooking.user_1_id == user_id) | (BlindDateBooking.user_2_id == user_id)
     ).all()
@@ -1,7 +1,15 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, BeforeValidator
+from typing import Optional, Annotated
 from datetime import datetime
 
+def user_id_to_str(value):
+    """User ids are strings; rows written before that hold INTEGERs."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+    return value
+
+UserId = Annotated[str, BeforeValidator(user_id_to_str)]
+
 class VenueInfo(BaseModel):
     venue_id: int
     name: str
@@ -19,8 +27,8 @@ class TimeSlotResponse(BaseModel):
 
 class BookingRequest(BaseModel):
     match_id: int
-    user_1_id: int
-    user_2_id: int
+    user_1_id: UserId
+    user_2_id: UserId
 
 class VenueApproval(BaseModel):
     booking_id: int
@@ -48,8 +56,8 @@ class BookingConfirmation(BaseModel):
 class BlindDateBookingResponse(BaseModel):
     id: int
     match_id: int
-    user_1_id: int
-    user_2_id: int
+    user_1_id: UserId
+    user_2_id: UserId
     
     # Proposals
     user_1_proposed_venue_id: Optional[int]
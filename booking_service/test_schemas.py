@@ -0,0 +1,44 @@
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import Integer, MetaData, create_engine
+from sqlalchemy.orm import Session
+
+from database import Base
+from models.booking import BlindDateBooking
+from schemas.booking import BlindDateBookingResponse, BookingRequest
+
+
+@pytest.fixture
+def legacy_db():
+    """A database created before user ids became strings (INTEGER columns)."""
+    legacy = MetaData()
+    for table in Base.metadata.sorted_tables:
+        copy = table.to_metadata(legacy)
+        for column in copy.columns:
+            if column.name in ("user_1_id", "user_2_id"):
+                column.type = Integer()
+    engine = create_engine("sqlite://")
+    legacy.create_all(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO blind_date_bookings (id, match_id, user_1_id, user_2_id, status, "
+            "user_1_venue_approved, user_2_venue_approved, user_1_time_approved, user_2_time_approved, created_at) "
+            "VALUES (1, 3, 7, 12, 'PENDING_VENUE_APPROVAL', 0, 0, 0, 0, '2024-05-01 10:00:00')"
+        )
+    with Session(engine) as session:
+        yield session
+
+
+def test_legacy_integer_rows_serialize_as_strings(legacy_db):
+    booking = legacy_db.get(BlindDateBooking, 1)
+    assert booking.user_1_id == 7
+    response = BlindDateBookingResponse.model_validate(booking)
+    assert (response.user_1_id, response.user_2_id) == ("7", "12")
+    assert response.model_dump()["user_1_id"] == "7"
+
+
+def test_user_ids_in_requests():
+    request = BookingRequest(match_id=3, user_1_id=7, user_2_id="3f2c9e1a-uuid")
+    assert (request.user_1_id, request.user_2_id) == ("7", "3f2c9e1a-uuid")
+    with pytest.raises(ValidationError):
+        BookingRequest(match_id=3, user_1_id=True, user_2_id="x")
@@ -0,0 +1,297 @@
+"""In-process verification of access tokens issued by user_service.
+
+user_service signs tokens with rotating RS256 keys and publishes the public
+halves at ``/.well-known/jwks.json``. The key set is fetched once and cached;
+it is fetched again when it is older than JWKS_CACHE_TTL, or when a token
+names a kid that isn't cached yet (at most once per
+JWKS_MIN_REFRESH_INTERVAL, so made-up kids can't flood user_service). If a
+refresh fails, the keys already cached keep being used. Tokens from before
+signing keys existed (HS256, no kid) are only accepted when
+USER_SERVICE_SECRET is set, and each one is logged.
+
+Revoked tokens and sessions are checked against the Bloom filter that
+user_service publishes at ``/.well-known/revocations.json``. It is refetched
+every REVOCATIONS_REFRESH_INTERVAL, so a revocation takes at most about
+that long to reach a verifier. Only filter hits (revoked ids plus a small
+false-positive rate) cost a call to user_service for an exact answer.
+
+Nothing is fetched at import: the first verify() loads the key set and the
+revocation filter, unless the service called ``verifier.warm()`` at startup.
+Routes that need the caller's identity depend on ``current_user``:
+
+    @router.get("/things")
+    def things(user: dict = Depends(current_user)):
+        ...
+"""
+import json
+import logging
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+from typing import Dict, Iterable, List, Optional
+
+import jwt
+from fastapi import HTTPException, Request
+
+from bloom import BloomFilter
+
+USER_SERVICE_URL = os.getenv("USER_SERVICE_URL", "http://localhost:8006")
+JWKS_URL = os.getenv("JWKS_URL", f"{USER_SERVICE_URL}/.well-known/jwks.json")
+JWKS_CACHE_TTL = float(os.getenv("JWKS_CACHE_TTL", "300"))
+JWKS_MIN_REFRESH_INTERVAL = float(os.getenv("JWKS_MIN_REFRESH_INTERVAL", "30"))
+JWKS_FETCH_TIMEOUT = float(os.getenv("JWKS_FETCH_TIMEOUT", "2"))
+REVOCATIONS_URL = os.getenv("REVOCATIONS_URL", f"{USER_SERVICE_URL}/.well-known/revocations.json")
+REVOCATION_CHECK_URL = os.getenv("REVOCATION_CHECK_URL", f"{USER_SERVICE_URL}/auth/revocations")
+REVOCATIONS_REFRESH_INTERVAL = float(os.getenv("REVOCATIONS_REFRESH_INTERVAL", "30"))
+
+ALGORITHMS = ["RS256"]
+
+logger = logging.getLogger(__name__)
+
+
+class TokenInvalid(Exception):
+    pass
+
+
+class TokenExpired(TokenInvalid):
+    pass
+
+
+class TokenRevoked(TokenInvalid):
+    pass
+
+
+class KeysUnavailable(Exception):
+    """No key set has been fetched yet and user_service can't be reached."""
+
+
+class RevocationFilter:
+    """Revoked token/session ids published by user_service.
+
+    Until the first successful fetch nothing is treated as revoked. A
+    confirmed answer for a filter hit is remembered until the next refresh.
+    """
+
+    def __init__(self, url: str, check_url: str, refresh_interval: float = 30.0, timeout: float = 2.0):
+        self.url = url
+        self.check_url = check_url.rstrip("/")
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self._bloom: Optional[BloomFilter] = None
+        self._confirmed: Dict[str, bool] = {}
+        self._fetched_at: Optional[float] = None
+        self._attempted_at = float("-inf")
+        self._lock = threading.Lock()
+        self.filter_hits = 0
+        self.false_positives = 0
+        self.refresh_failures = 0
+
+    def needs_refresh(self) -> bool:
+        return self._fetched_at is None or time.monotonic() - self._fetched_at > self.refresh_interval
+
+    def refresh(self) -> bool:
+        # Callers don't queue up behind a refresh already in progress
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            now = time.monotonic()
+            interval = self.refresh_interval if self._fetched_at is not None else 1.0
+            if now - self._attempted_at < interval:
+                return False
+            self._attempted_at = now
+            try:
+                with urllib.request.urlopen(self.url, timeout=self.timeout) as resp:
+                    bloom = BloomFilter.from_dict(json.load(resp))
+            except (OSError, ValueError, KeyError) as e:
+                self.refresh_failures += 1
+                logger.warning(f"Could not refresh revocations from {self.url}: {e}")
+                return False
+            self._bloom = bloom
+            self._confirmed = {}
+            self._fetched_at = now
+            return True
+        finally:
+            self._lock.release()
+
+    def might_be_revoked(self, token_ids: Iterable[Optional[str]]) -> List[str]:
+        """Ids the filter flags; in memory, no network."""
+        bloom = self._bloom
+        if bloom is None:
+            return []
+        return [t for t in token_ids if t and t in bloom]
+
+    def confirm(self, token_id: str) -> bool:
+        if token_id in self._confirmed:
+            return self._confirmed[token_id]
+        url = f"{self.check_url}/{urllib.parse.quote(token_id, safe='')}"
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as resp:
+                revoked = bool(json.load(resp)["revoked"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Revocation check for {token_id} failed: {e}")
+            raise KeysUnavailable("Revocation check unavailable")
+        self._confirmed[token_id] = revoked
+        return revoked
+
+    def is_revoked(self, claims: dict) -> bool:
+        if self.needs_refresh():
+            self.refresh()
+        hits = self.might_be_revoked([claims.get("jti"), claims.get("sid")])
+        if not hits:
+            return False
+        self.filter_hits += 1
+        if any(self.confirm(t) for t in hits):
+            return True
+        self.false_positives += 1
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "size_bytes": len(self._bloom.bits) if self._bloom else None,
+            "age_seconds": None if self._fetched_at is None else round(time.monotonic() - self._fetched_at, 1),
+            "filter_hits": self.filter_hits,
+            "false_positives": self.false_positives,
+            "refresh_failures": self.refresh_failures,
+        }
+
+
+class JWKSVerifier:
+    def __init__(
+        self,
+        url: str,
+        ttl: float = 300.0,
+        min_refresh_interval: float = 30.0,
+        timeout: float = 2.0,
+        legacy_secret: Optional[str] = None,
+        revocations: Optional[RevocationFilter] = None,
+    ):
+        self.url = url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self.timeout = timeout
+        # HS256 secret for tokens issued before signing keys existed (no kid)
+        self.legacy_secret = legacy_secret
+        self.revocations = revocations
+        self._keys: Dict[str, object] = {}
+        self._fetched_at: Optional[float] = None
+        self._attempted_at = float("-inf")
+        self._lock = threading.Lock()
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def needs_refresh(self, kid: Optional[str] = None) -> bool:
+        if self._fetched_at is None or time.monotonic() - self._fetched_at > self.ttl:
+            return True
+        return kid is not None and kid not in self._keys
+
+    def refresh(self) -> bool:
+        """Fetch the key set, unless one was attempted very recently."""
+        with self._lock:
+            now = time.monotonic()
+            # Retry sooner while there are no keys at all (e.g. started before user_service)
+            interval = self.min_refresh_interval if self._fetched_at is not None else 1.0
+            if now - self._attempted_at < interval:
+                return False
+            self._attempted_at = now
+            try:
+                with urllib.request.urlopen(self.url, timeout=self.timeout) as resp:
+                    jwks = json.load(resp)
+                keys = {}
+                for jwk in jwks.get("keys", []):
+                    if jwk.get("kid") and jwk.get("alg", "RS256") in ALGORITHMS:
+                        keys[jwk["kid"]] = jwt.PyJWK(jwk).key
+            except (OSError, ValueError, jwt.PyJWTError) as e:
+                self.refresh_failures += 1
+                logger.warning(f"Could not refresh JWKS from {self.url}: {e}")
+                return False
+            self._keys = keys
+            self._fetched_at = now
+            self.refreshes += 1
+            return True
+
+    def warm(self):
+        """Load keys (and revocations) before the first request needs them."""
+        self.refresh()
+        if self.revocations is not None:
+            self.revocations.refresh()
+
+    def kid(self, token: str) -> Optional[str]:
+        try:
+            return jwt.get_unverified_header(token).get("kid")
+        except jwt.InvalidTokenError:
+            raise TokenInvalid("Malformed token")
+
+    def verify(self, token: str) -> dict:
+        """Verified claims. May block on user_service to refresh keys or
+        confirm a revocation, so async callers run it in a thread."""
+        kid = self.kid(token)
+        if kid is None:
+            if not self.legacy_secret:
+                raise TokenInvalid("Token has no kid")
+            key, algorithms = self.legacy_secret, ["HS256"]
+        else:
+            if self.needs_refresh(kid):
+                self.refresh()
+            key, algorithms = self._keys.get(kid), ALGORITHMS
+            if key is None:
+                if self._fetched_at is None:
+                    raise KeysUnavailable("Token signing keys not loaded")
+                raise TokenInvalid("Unknown signing key")
+
+        try:
+            claims = jwt.decode(token, key, algorithms=algorithms)
+        except jwt.ExpiredSignatureError:
+            raise TokenExpired("Token expired")
+        except jwt.InvalidTokenError:
+            raise TokenInvalid("Invalid token")
+
+        if kid is None:
+            logger.warning(f"Accepted legacy HS256 token for user {claims.get('sub')}")
+        if self.revocations is not None and self.revocations.is_revoked(claims):
+            raise TokenRevoked("Token revoked")
+        return claims
+
+    def stats(self) -> dict:
+        return {
+            "keys": sorted(self._keys),
+            "age_seconds": None if self._fetched_at is None else round(time.monotonic() - self._fetched_at, 1),
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+        }
+
+
+verifier = JWKSVerifier(
+    JWKS_URL,
+    ttl=JWKS_CACHE_TTL,
+    min_refresh_interval=JWKS_MIN_REFRESH_INTERVAL,
+    timeout=JWKS_FETCH_TIMEOUT,
+    legacy_secret=os.getenv("USER_SERVICE_SECRET"),
+    revocations=RevocationFilter(
+        REVOCATIONS_URL,
+        REVOCATION_CHECK_URL,
+        refresh_interval=REVOCATIONS_REFRESH_INTERVAL,
+        timeout=JWKS_FETCH_TIMEOUT,
+    ),
+)
+
+
+def claims_to_user(claims: dict) -> dict:
+    return {"user_id": claims.get("sub"), "email": claims.get("email")}
+
+
+def current_user(request: Request) -> dict:
+    """FastAPI dependency: the caller of a request with a bearer token."""
+    auth = request.headers.get("Authorization")
+    if not auth or not auth.lower().startswith("bearer "):
+        raise HTTPException(status_code=401, detail="Missing bearer token")
+    try:
+        claims = verifier.verify(auth.split(" ", 1)[1])
+    except TokenExpired:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except TokenInvalid:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    except KeysUnavailable:
+        raise HTTPException(status_code=503, detail="Token verification unavailable")
+    return claims_to_user(claims)
@@ -1,5 +1,8 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from deadline import deadline_middleware
+from token_verifier import verifier, TokenInvalid, KeysUnavailable
 from pydantic import BaseModel
 from datetime import datetime, timedelta, timezone
 import uuid
@@ -8,6 +11,7 @@ from typing import Dict, List, Optional
 from enum import Enum
 import asyncio
 import logging
+import os
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,6 +27,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Stop work on requests whose gateway deadline has passed
+app.middleware("http")(deadline_middleware)
+
+# Clients connecting directly (not through the gateway, which authenticates
+# WebSockets itself) must pass ?token=, unless CHAT_REQUIRE_TOKEN=0.
+REQUIRE_TOKEN = os.getenv("CHAT_REQUIRE_TOKEN", "1") == "1"
+
+@app.on_event("startup")
+async def load_token_keys():
+    await run_in_threadpool(verifier.warm)
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
@@ -177,6 +192,23 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, user_id: str
     if user_id != session.user1_id and user_id != session.user2_id:
         await websocket.close(code=1008, reason="Unauthorized")
         return
+
+    token = websocket.query_params.get("token")
+    auth = websocket.headers.get("Authorization")
+    if not token and auth and auth.lower().startswith("bearer "):
+        token = auth.split(" ", 1)[1]
+    if token:
+        try:
+            claims = await run_in_threadpool(verifier.verify, token)
+        except (TokenInvalid, KeysUnavailable) as e:
+            await websocket.close(code=1008, reason=str(e))
+            return
+        if claims.get("sub") != user_id:
+            await websocket.close(code=1008, reason="Unauthorized")
+            return
+    elif REQUIRE_TOKEN:
+        await websocket.close(code=1008, reason="Authorization required")
+        return
     
     # Check if chat is active
     current_time = datetime.now(timezone.utc)
@@ -31,10 +31,11 @@ const Login = () => {
     
     try {
       const response = await authAPI.login(formData);
-      const { access_token, user_id, email } = response.data;
+      const { access_token, refresh_token, user_id, email } = response.data;
       
-      // Store token and user info in localStorage
+      // Store tokens and user info in localStorage
       localStorage.setItem('access_token', access_token);
+      localStorage.setItem('refresh_token', refresh_token);
       const userData = { id: user_id, email };
       localStorage.setItem('user', JSON.stringify(userData));
       
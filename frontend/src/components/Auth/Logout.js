@@ -1,21 +1,28 @@
 import React, { useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
+import { authAPI } from '../../services/api';
 
 const Logout = () => {
   const navigate = useNavigate();
 
   useEffect(() => {
+    const refreshToken = localStorage.getItem('refresh_token');
+
     // Clear authentication data from localStorage
     localStorage.removeItem('access_token');
+    localStorage.removeItem('refresh_token');
     localStorage.removeItem('user');
-    
+
+    // Revoke the session server-side; local logout happens either way
+    const revoke = refreshToken
+      ? authAPI.logout(refreshToken).catch((err) => console.error('Logout error:', err))
+      : Promise.resolve();
+
     // Redirect to login page
-    navigate('/login');
+    revoke.finally(() => navigate('/login'));
   }, [navigate]);
 
   return null; // This component doesn't render anything
 };
 
 export default Logout;
-
-
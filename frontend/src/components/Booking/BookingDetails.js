@@ -25,7 +25,7 @@ const VenueSelection = ({ bookingId, onComplete }) => {
       
       // Load other user's proposal
       if (user) {
-        const proposalResponse = await bookingAPI.getOtherUserProposal(bookingId, parseInt(user.id));
+        const proposalResponse = await bookingAPI.getOtherUserProposal(bookingId, user.id);
         setProposal(proposalResponse.data);
       }
     } catch (err) {
@@ -43,10 +43,10 @@ const VenueSelection = ({ bookingId, onComplete }) => {
     if (!selectedVenue || !user) return;
     
     try {
-      await bookingAPI.proposeVenue(bookingId, selectedVenue, parseInt(user.id));
+      await bookingAPI.proposeVenue(bookingId, selectedVenue, user.id);
       setMessage('Venue proposed successfully!');
       // Reload proposal
-      const proposalResponse = await bookingAPI.getOtherUserProposal(bookingId, parseInt(user.id));
+      const proposalResponse = await bookingAPI.getOtherUserProposal(bookingId, user.id);
       setProposal(proposalResponse.data);
       setSelectedVenue(null);
     } catch (err) {
@@ -59,7 +59,7 @@ const VenueSelection = ({ bookingId, onComplete }) => {
     
     setApproving(true);
     try {
-      await bookingAPI.approveVenue(bookingId, proposal.proposed_venue_id, parseInt(user.id), true);
+      await bookingAPI.approveVenue(bookingId, proposal.proposed_venue_id, user.id, true);
       setMessage('Venue approved! Now select a time.');
       onComplete(); // Move to time selection
     } catch (err) {
@@ -168,7 +168,7 @@ const TimeSelection: React.FC<{ bookingId: number; onComplete: () => void }> = (
       
       // Load other user's proposal
       if (user) {
-        const proposalResponse = await bookingAPI.getOtherUserProposal(bookingId, parseInt(user.id));
+        const proposalResponse = await bookingAPI.getOtherUserProposal(bookingId, user.id);
         setProposal(proposalResponse.data);
       }
     } catch (err) {
@@ -203,10 +203,10 @@ const TimeSelection: React.FC<{ bookingId: number; onComplete: () => void }> = (
     if (!selectedDate || !selectedTime || !user) return;
     
     try {
-      await bookingAPI.proposeTime(bookingId, selectedDate, selectedTime, parseInt(user.id));
+      await bookingAPI.proposeTime(bookingId, selectedDate, selectedTime, user.id);
       setMessage('Time proposed successfully!');
       // Reload proposal
-      const proposalResponse = await bookingAPI.getOtherUserProposal(bookingId, parseInt(user.id));
+      const proposalResponse = await bookingAPI.getOtherUserProposal(bookingId, user.id);
       setProposal(proposalResponse.data);
     } catch (err) {
       setError(err.response?.data?.detail || 'Failed to propose time');
@@ -222,7 +222,7 @@ const TimeSelection: React.FC<{ bookingId: number; onComplete: () => void }> = (
         bookingId, 
         proposal.proposed_date, 
         proposal.proposed_time, 
-        parseInt(user.id), 
+        user.id, 
         true
       );
       setMessage('Time approved! Booking confirmed.');
@@ -427,7 +427,7 @@ const BookingModal: React.FC<BookingModalProps> = ({ show, onHide, matchId }) =>
       // For this example, we'll simulate getting the other user ID
       const otherUserId = 0; // This should be retrieved from the match details
       
-      const response = await bookingAPI.createBooking(matchId, parseInt(user.id), otherUserId);
+      const response = await bookingAPI.createBooking(matchId, user.id, otherUserId);
       setBookingId(response.data.id);
       setMessage('Booking created successfully! Now select a venue.');
     } catch (err) {
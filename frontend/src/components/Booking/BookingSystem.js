@@ -40,12 +40,12 @@ const BookingSystem = () => {
     
     try {
       // Load user matches that are confirmed
-      const matchesResponse = await matchingAPI.getUserMatches(parseInt(user.id));
+      const matchesResponse = await matchingAPI.getUserMatches(user.id);
       const matched = matchesResponse.data.filter((match) => match.status === 'matched');
       setMatches(matched);
       
       // Load user bookings
-      const bookingsResponse = await bookingAPI.getUserBookings(parseInt(user.id));
+      const bookingsResponse = await bookingAPI.getUserBookings(user.id);
       const bookingList = bookingsResponse.data || [];
       setBookings(bookingList);
       if (!selectedBookingId && bookingList.length > 0) {
@@ -78,9 +78,9 @@ const BookingSystem = () => {
         return;
       }
       
-      const otherUserId = match.user_1_id === parseInt(user.id) ? match.user_2_id : match.user_1_id;
+      const otherUserId = match.user_1_id === user.id ? match.user_2_id : match.user_1_id;
       
-      const response = await bookingAPI.createBooking(selectedMatch, parseInt(user.id), otherUserId);
+      const response = await bookingAPI.createBooking(selectedMatch, user.id, otherUserId);
       setSelectedBookingId(response.data?.id);
       setMessage('Booking created successfully! Now select a venue.');
       setBookingStep('venue');
@@ -92,7 +92,7 @@ const BookingSystem = () => {
 
   const handleApproveVenue = async (booking, approved) => {
     if (!user) return;
-    const isUser1 = parseInt(user.id) === booking.user_1_id;
+    const isUser1 = user.id === booking.user_1_id;
     const partnerVenueId = isUser1 ? booking.user_2_proposed_venue_id : booking.user_1_proposed_venue_id;
 
     if (!partnerVenueId) {
@@ -102,11 +102,11 @@ const BookingSystem = () => {
 
     try {
       if (approved) {
-        await bookingAPI.approveVenue(booking.id, partnerVenueId, parseInt(user.id), true);
+        await bookingAPI.approveVenue(booking.id, partnerVenueId, user.id, true);
         setMessage('Venue approved!');
       } else {
         // Use the explicit reject endpoint so the backend resets approvals correctly
-        await bookingAPI.rejectVenue(booking.id, parseInt(user.id));
+        await bookingAPI.rejectVenue(booking.id, user.id);
         setMessage('Venue rejected (other user will need to propose again).');
       }
 
@@ -118,7 +118,7 @@ const BookingSystem = () => {
 
   const handleApproveTime = async (booking, approved) => {
     if (!user) return;
-    const isUser1 = parseInt(user.id) === booking.user_1_id;
+    const isUser1 = user.id === booking.user_1_id;
     const partnerDate = isUser1 ? booking.user_2_proposed_date : booking.user_1_proposed_date;
     const partnerTime = isUser1 ? booking.user_2_proposed_time : booking.user_1_proposed_time;
 
@@ -129,10 +129,10 @@ const BookingSystem = () => {
 
     try {
       if (approved) {
-        await bookingAPI.approveTime(booking.id, partnerDate, partnerTime, parseInt(user.id), true);
+        await bookingAPI.approveTime(booking.id, partnerDate, partnerTime, user.id, true);
         setMessage('Time approved!');
       } else {
-        await bookingAPI.rejectTime(booking.id, parseInt(user.id));
+        await bookingAPI.rejectTime(booking.id, user.id);
         setMessage('Time rejected (please propose a different time).');
       }
       await loadMatchesAndBookings();
@@ -163,7 +163,7 @@ const BookingSystem = () => {
       return;
     }
     try {
-      await bookingAPI.proposeVenue(selectedBookingId, selectedVenueId, parseInt(user.id));
+      await bookingAPI.proposeVenue(selectedBookingId, selectedVenueId, user.id);
       setMessage('Venue proposed to your match!');
       setBookingStep('time');
       await loadMatchesAndBookings();
@@ -192,7 +192,7 @@ const BookingSystem = () => {
       return;
     }
     try {
-      await bookingAPI.proposeTime(selectedBookingId, selectedDate, selectedTime, parseInt(user.id));
+      await bookingAPI.proposeTime(selectedBookingId, selectedDate, selectedTime, user.id);
       setMessage('Time proposed to your match!');
       setBookingStep('confirm');
       await loadMatchesAndBookings();
@@ -414,7 +414,7 @@ const BookingSystem = () => {
           ) : (
             <ListGroup>
               {bookings.map((booking) => {
-                const isUser1 = parseInt(user.id) === booking.user_1_id;
+                const isUser1 = user.id === booking.user_1_id;
                 const myVenue = isUser1 ? booking.user_1_proposed_venue_id : booking.user_2_proposed_venue_id;
                 const partnerVenue = isUser1 ? booking.user_2_proposed_venue_id : booking.user_1_proposed_venue_id;
                 const myDate = isUser1 ? booking.user_1_proposed_date : booking.user_2_proposed_date;
@@ -45,8 +45,9 @@ const ChatInterface = () => {
     }
     
     try {
-      // WebSocket URL from the backend documentation
-      const wsUrl = `ws://localhost:8001/ws/${sessionId}/${user.id}`;
+      // Chat WebSocket is proxied (and authenticated) by the gateway
+      const token = encodeURIComponent(localStorage.getItem('access_token') || '');
+      const wsUrl = `ws://localhost:8000/chat/ws/${sessionId}/${user.id}?token=${token}`;
       const ws = new WebSocket(wsUrl);
       
       wsRef.current = ws;
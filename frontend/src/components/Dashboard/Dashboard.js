@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { Container, Row, Col, Card, Button, ListGroup, Alert } from 'react-bootstrap';
 import { Link } from 'react-router-dom';
-import { matchingAPI, bookingAPI } from '../../services/api';
+import { dashboardAPI } from '../../services/api';
 import { useUser } from '../../contexts/UserContext';
 import './Dashboard.css';
 
@@ -27,14 +27,11 @@ const Dashboard = () => {
     if (!user) return;
     
     try {
-      // Load matches and bookings in parallel
-      const [matchesResponse, bookingsResponse] = await Promise.all([
-        matchingAPI.getUserMatches(parseInt(user.id)),
-        bookingAPI.getUserBookings(parseInt(user.id))
-      ]);
+      // The gateway fetches matches, bookings etc. in parallel in one call
+      const response = await dashboardAPI.getDashboard();
       
-      const matchesData = matchesResponse.data || [];
-      const bookingsData = bookingsResponse.data || [];
+      const matchesData = response.data.matches || [];
+      const bookingsData = response.data.bookings || [];
       
       setMatches(matchesData);
       setBookings(bookingsData);
@@ -20,12 +20,12 @@ const FindMatches = () => {
     
     try {
       // Load user matches
-      const matchesResponse = await matchingAPI.getUserMatches(parseInt(user.id));
+      const matchesResponse = await matchingAPI.getUserMatches(user.id);
       setMatches(matchesResponse.data);
       
       // Load queue status
       try {
-        const queueResponse = await matchingAPI.getQueueStatus(parseInt(user.id));
+        const queueResponse = await matchingAPI.getQueueStatus(user.id);
         setQueueStatus(queueResponse.data);
       } catch (err) {
         // Queue status might not exist if user isn't in queue
@@ -42,12 +42,12 @@ const FindMatches = () => {
     if (!user) return;
     
     try {
-      const response = await matchingAPI.findMatch(parseInt(user.id));
+      const response = await matchingAPI.findMatch(user.id);
       
       if (response.data.id === -1) {
         setMessage('You have been added to the matching queue. We will find a match for you soon!');
         // Reload queue status
-        const queueResponse = await matchingAPI.getQueueStatus(parseInt(user.id));
+        const queueResponse = await matchingAPI.getQueueStatus(user.id);
         setQueueStatus(queueResponse.data);
       } else {
         setMessage('Match found! Check your matches list.');
@@ -61,7 +61,7 @@ const FindMatches = () => {
 
   const handleApproveMatch = async (matchId) => {
     try {
-      const response = await matchingAPI.approveMatch(matchId, parseInt(user.id), true);
+      const response = await matchingAPI.approveMatch(matchId, user.id, true);
       
       if (response.data.status === 'matched') {
         setMessage('Match approved! You can now communicate with your match.');
@@ -79,7 +79,7 @@ const FindMatches = () => {
 
   const handleRejectMatch = async (matchId) => {
     try {
-      await matchingAPI.approveMatch(matchId, parseInt(user.id), false);
+      await matchingAPI.approveMatch(matchId, user.id, false);
       setMessage('Match rejected. We will continue searching for a suitable match.');
       // Reload matches
       loadMatchesAndQueue();
@@ -118,7 +118,7 @@ const FindMatches = () => {
                   variant="outline-danger" 
                   onClick={async () => {
                     try {
-                      await matchingAPI.leaveQueue(parseInt(user.id));
+                      await matchingAPI.leaveQueue(user.id);
                       setQueueStatus(null);
                       setMessage('You have left the matching queue.');
                     } catch (err) {
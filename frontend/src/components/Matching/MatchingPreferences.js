@@ -26,7 +26,7 @@ const MatchingPreferences = () => {
     if (!user) return;
     
     try {
-      const response = await matchingAPI.getPreferences(parseInt(user.id));
+      const response = await matchingAPI.getPreferences(user.id);
       if (response.data) {
         setPreferences(response.data);
         setFormData({
@@ -67,12 +67,12 @@ const MatchingPreferences = () => {
     try {
       const preferencesData = {
         ...formData,
-        user_id: parseInt(user.id)
+        user_id: user.id
       };
 
       // Update or create preferences
       if (preferences) {
-        await matchingAPI.updatePreferences(parseInt(user.id), preferencesData);
+        await matchingAPI.updatePreferences(user.id, preferencesData);
       } else {
         await matchingAPI.createPreferences(preferencesData);
       }
@@ -26,15 +26,51 @@ apiClient.interceptors.request.use(
   }
 );
 
-// Response interceptor to handle errors
+const clearSession = () => {
+  localStorage.removeItem('access_token');
+  localStorage.removeItem('refresh_token');
+  localStorage.removeItem('user');
+};
+
+// Refresh tokens are single-use, so concurrent 401s share one refresh call
+let refreshing = null;
+
+const refreshAccessToken = () => {
+  if (!refreshing) {
+    const refreshToken = localStorage.getItem('refresh_token');
+    refreshing = (refreshToken
+      ? axios.post(`${API_BASE_URL}/auth/refresh`, { refresh_token: refreshToken })
+      : Promise.reject(new Error('No refresh token'))
+    )
+      .then((response) => {
+        localStorage.setItem('access_token', response.data.access_token);
+        localStorage.setItem('refresh_token', response.data.refresh_token);
+        return response.data.access_token;
+      })
+      .finally(() => {
+        refreshing = null;
+      });
+  }
+  return refreshing;
+};
+
+// Response interceptor: on a 401, refresh the access token and retry once
 apiClient.interceptors.response.use(
   (response) => response,
-  (error) => {
-    if (error.response?.status === 401) {
-      // Token might be expired, clear it and redirect to login
-      localStorage.removeItem('access_token');
-      localStorage.removeItem('user');
-      window.location.href = '/login';
+  async (error) => {
+    const request = error.config;
+    const isAuthCall = request?.url?.startsWith('/auth/');
+    if (error.response?.status === 401 && request && !request._retried && !isAuthCall) {
+      request._retried = true;
+      try {
+        const token = await refreshAccessToken();
+        request.headers.Authorization = `Bearer ${token}`;
+        return apiClient(request);
+      } catch (refreshError) {
+        // Refresh token expired or revoked, back to login
+        clearSession();
+        window.location.href = '/login';
+      }
     }
     return Promise.reject(error);
   }
@@ -63,6 +99,12 @@ export const authAPI = {
   login: (credentials) =>
     apiClient.post('/auth/login', credentials),
 
+  refresh: (refreshToken) =>
+    apiClient.post('/auth/refresh', { refresh_token: refreshToken }),
+
+  logout: (refreshToken) =>
+    apiClient.post('/auth/logout', { refresh_token: refreshToken }),
+
   verifyToken: () => apiClient.post('/auth/verify-token'),
 };
 
@@ -221,6 +263,11 @@ export const adminAPI = {
   rejectRegistration: (userId, reason) => apiClient.post(`/admin/registrations/${userId}/reject`, { reason }),
 };
 
+// Dashboard API (aggregated by the gateway)
+export const dashboardAPI = {
+  getDashboard: () => apiClient.get('/dashboard'),
+};
+
 // Chat API
 export const chatAPI = {
   createChatSession: (matchData) => apiClient.post('/chat/match', matchData),
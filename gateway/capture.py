@@ -0,0 +1,149 @@
+import hashlib
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import time
+from typing import AsyncIterator, Iterable, Optional
+
+# Replaced wherever they appear in captured JSON bodies
+DEFAULT_REDACT_FIELDS = frozenset({
+    "password", "new_password", "token", "access_token", "refresh_token",
+    "secret", "authorization", "id_document", "selfie",
+})
+
+REDACTED = "[REDACTED]"
+
+
+def redact(value, fields: Iterable[str]):
+    if isinstance(value, dict):
+        return {
+            k: REDACTED if k.lower() in fields else redact(v, fields)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(v, fields) for v in value]
+    return value
+
+
+class CaptureRecord:
+    """Metadata for one sampled request, filled in as the request is handled."""
+
+    __slots__ = ("started", "body_hash", "body_size", "body")
+
+    def __init__(self):
+        self.started = time.time()
+        self.body_hash = None
+        self.body_size = 0
+        self.body: Optional[bytes] = None
+
+    def add_body(self, chunk: bytes, keep_up_to: int):
+        if self.body_hash is None:
+            self.body_hash = hashlib.sha256()
+        self.body_hash.update(chunk)
+        self.body_size += len(chunk)
+        # Oversized bodies are dropped entirely rather than truncated
+        if self.body_size <= keep_up_to:
+            self.body = (self.body or b"") + chunk
+        else:
+            self.body = None
+
+
+class TrafficCapture:
+    """Sampled request log for offline replay (see replay.py).
+
+    One compact JSON object per line, written to a size-rotated file by a
+    background thread so the event loop never blocks on disk. Request bodies
+    are only kept when ``max_body_bytes`` > 0, and only JSON bodies, with
+    sensitive fields redacted; otherwise just their SHA-256 and size are
+    recorded. Headers (and so credentials) are never captured.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sample_rate: float = 0.1,
+        max_bytes: int = 50 * 1024 * 1024,
+        backups: int = 5,
+        max_body_bytes: int = 0,
+        redact_fields: Iterable[str] = DEFAULT_REDACT_FIELDS,
+    ):
+        self.sample_rate = sample_rate
+        self.max_body_bytes = max_body_bytes
+        self.redact_fields = frozenset(f.lower() for f in redact_fields)
+        self.recorded = 0
+        self.dropped = 0
+
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self._queue: "queue.Queue" = queue.Queue(maxsize=10000)
+        self._listener = logging.handlers.QueueListener(self._queue, handler)
+
+    def start(self):
+        self._listener.start()
+
+    def stop(self):
+        self._listener.stop()
+
+    def sample(self) -> Optional[CaptureRecord]:
+        if random.random() >= self.sample_rate:
+            return None
+        return CaptureRecord()
+
+    async def tee(self, record: CaptureRecord, stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Pass a request body stream through while hashing it."""
+        async for chunk in stream:
+            record.add_body(chunk, self.max_body_bytes)
+            yield chunk
+
+    def record(
+        self,
+        record: CaptureRecord,
+        method: str,
+        path: str,
+        query: str,
+        content_type: Optional[str],
+        status: int,
+        latency: float,
+        route: str,
+        upstream: Optional[str],
+    ):
+        entry = {
+            "ts": round(record.started, 6),
+            "method": method,
+            "path": path,
+            "query": query,
+            "route": route,
+            "upstream": upstream,
+            "status": status,
+            "latency_ms": round(latency * 1000, 3),
+            "body_size": record.body_size,
+        }
+        if record.body_hash is not None:
+            entry["body_sha256"] = record.body_hash.hexdigest()
+        if content_type:
+            entry["content_type"] = content_type
+
+        body = self._redacted_body(record, content_type)
+        if body is not None:
+            entry["body"] = body
+
+        line = json.dumps(entry, separators=(",", ":"))
+        try:
+            self._queue.put_nowait(logging.makeLogRecord({"msg": line}))
+        except queue.Full:
+            # Disk can't keep up; drop samples rather than block requests
+            self.dropped += 1
+            return
+        self.recorded += 1
+
+    def _redacted_body(self, record: CaptureRecord, content_type: Optional[str]):
+        if not record.body or not content_type or "json" not in content_type:
+            return None
+        try:
+            return redact(json.loads(record.body), self.redact_fields)
+        except ValueError:
+            return None
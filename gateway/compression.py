@@ -0,0 +1,66 @@
+import gzip
+from typing import Optional, Sequence
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# Content types worth compressing; images, archives etc. already are
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "image/svg+xml",
+)
+
+
+def available_encodings() -> Sequence[str]:
+    """Supported encodings, most preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: Optional[str], supported: Sequence[str]) -> Optional[str]:
+    """Pick an encoding from an Accept-Encoding header (RFC 9110 12.5.3).
+
+    Ties in q-value go to the order of ``supported``; ``q=0`` excludes an
+    encoding, ``*`` covers any encoding not listed explicitly.
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in supported:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    return any(content_type.startswith(t) for t in COMPRESSIBLE_TYPES)
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    # mtime=0 keeps the output deterministic for identical bodies
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
@@ -0,0 +1,237 @@
+import os
+
+# --------------------------------------------------
+# Auth
+# --------------------------------------------------
+# Tokens are verified locally against user_service's published signing keys
+# (/.well-known/jwks.json, see token_verifier.py); defaults to the first user
+# backend
+JWKS_URL = os.getenv("GATEWAY_JWKS_URL")
+JWKS_CACHE_TTL = float(os.getenv("GATEWAY_JWKS_CACHE_TTL", "300"))
+JWKS_MIN_REFRESH_INTERVAL = float(os.getenv("GATEWAY_JWKS_MIN_REFRESH_INTERVAL", "30"))
+
+# Revoked tokens/sessions, published by user_service as a Bloom filter
+REVOCATIONS_URL = os.getenv("GATEWAY_REVOCATIONS_URL")
+REVOCATION_CHECK_URL = os.getenv("GATEWAY_REVOCATION_CHECK_URL")
+REVOCATIONS_REFRESH_INTERVAL = float(os.getenv("GATEWAY_REVOCATIONS_REFRESH_INTERVAL", "30"))
+
+# HS256 tokens issued before signing keys existed. Off by default: they are
+# only accepted with GATEWAY_ACCEPT_LEGACY_TOKENS=1 and the real old secret in
+# USER_SERVICE_SECRET, and each one accepted is logged
+ACCEPT_LEGACY_TOKENS = os.getenv("GATEWAY_ACCEPT_LEGACY_TOKENS", "0") == "1"
+SECRET_KEY = os.getenv("USER_SERVICE_SECRET")
+
+# Set to "0" to fall back to calling user_service /auth/verify-token
+LOCAL_TOKEN_VERIFY = os.getenv("GATEWAY_LOCAL_TOKEN_VERIFY", "1") == "1"
+TOKEN_CACHE_SIZE = int(os.getenv("GATEWAY_TOKEN_CACHE_SIZE", "10000"))
+TOKEN_CACHE_TTL = float(os.getenv("GATEWAY_TOKEN_CACHE_TTL", "300"))
+
+# Rejected tokens are remembered briefly so retries with a bad token are cheap
+NEGATIVE_TOKEN_CACHE_SIZE = int(os.getenv("GATEWAY_NEGATIVE_TOKEN_CACHE_SIZE", "10000"))
+NEGATIVE_TOKEN_CACHE_TTL = float(os.getenv("GATEWAY_NEGATIVE_TOKEN_CACHE_TTL", "30"))
+
+# Per-client-IP backoff for replaying tokens already rejected (negative cache hits)
+AUTH_BACKOFF_THRESHOLD = int(os.getenv("GATEWAY_AUTH_BACKOFF_THRESHOLD", "5"))
+AUTH_BACKOFF_BASE = float(os.getenv("GATEWAY_AUTH_BACKOFF_BASE", "1"))
+AUTH_BACKOFF_MAX = float(os.getenv("GATEWAY_AUTH_BACKOFF_MAX", "300"))
+AUTH_BACKOFF_RESET = float(os.getenv("GATEWAY_AUTH_BACKOFF_RESET", "600"))
+
+# --------------------------------------------------
+# Proxy
+# --------------------------------------------------
+# Stream request/response bodies through instead of buffering them
+STREAM_PROXY = os.getenv("GATEWAY_STREAM_PROXY", "1") == "1"
+
+# --------------------------------------------------
+# Upstream pools
+# --------------------------------------------------
+def _backends(service: str, default: str) -> list:
+    """Comma-separated backend URLs, e.g. GATEWAY_MATCH_BACKENDS=http://a,http://b"""
+    raw = os.getenv(f"GATEWAY_{service.upper()}_BACKENDS", default)
+    return [u.strip() for u in raw.split(",") if u.strip()]
+
+
+SERVICE_BACKENDS = {
+    "user": _backends("user", "http://localhost:8006"),
+    "match": _backends("match", "http://localhost:8002"),
+    "booking": _backends("booking", "http://localhost:8003"),
+    "venue": _backends("venue", "http://localhost:8004"),
+    "chat": _backends("chat", "http://localhost:8001"),
+}
+
+if JWKS_URL is None:
+    JWKS_URL = f"{SERVICE_BACKENDS['user'][0]}/.well-known/jwks.json"
+if REVOCATIONS_URL is None:
+    REVOCATIONS_URL = f"{SERVICE_BACKENDS['user'][0]}/.well-known/revocations.json"
+if REVOCATION_CHECK_URL is None:
+    REVOCATION_CHECK_URL = f"{SERVICE_BACKENDS['user'][0]}/auth/revocations"
+
+# "least_outstanding" or "p2c"
+LB_STRATEGY = os.getenv("GATEWAY_LB_STRATEGY", "least_outstanding")
+LB_MAX_FAILURES = int(os.getenv("GATEWAY_LB_MAX_FAILURES", "5"))
+LB_EJECT_SECONDS = float(os.getenv("GATEWAY_LB_EJECT_SECONDS", "10"))
+LB_MAX_EJECT_SECONDS = float(os.getenv("GATEWAY_LB_MAX_EJECT_SECONDS", "300"))
+LB_SLOW_START_SECONDS = float(os.getenv("GATEWAY_LB_SLOW_START_SECONDS", "30"))
+HEALTH_CHECK_INTERVAL = float(os.getenv("GATEWAY_HEALTH_CHECK_INTERVAL", "5"))
+HEALTH_CHECK_TIMEOUT = float(os.getenv("GATEWAY_HEALTH_CHECK_TIMEOUT", "2"))
+
+# --------------------------------------------------
+# Retries and hedging
+# --------------------------------------------------
+# Retries after connect errors (nothing was sent, so any method is safe)
+UPSTREAM_RETRIES = int(os.getenv("GATEWAY_UPSTREAM_RETRIES", "1"))
+# Hedged GETs fire a second request after this percentile of recent latency
+HEDGE_PERCENTILE = float(os.getenv("GATEWAY_HEDGE_PERCENTILE", "0.95"))
+HEDGE_MIN_DELAY = float(os.getenv("GATEWAY_HEDGE_MIN_DELAY", "0.01"))
+# Used until a pool has enough latency samples
+HEDGE_DEFAULT_DELAY = float(os.getenv("GATEWAY_HEDGE_DEFAULT_DELAY", "0.1"))
+# Retries + hedges may add at most this fraction of extra upstream load
+RETRY_BUDGET_RATIO = float(os.getenv("GATEWAY_RETRY_BUDGET_RATIO", "0.1"))
+RETRY_BUDGET_MIN_PER_SECOND = float(os.getenv("GATEWAY_RETRY_BUDGET_MIN_PER_SECOND", "1"))
+
+# --------------------------------------------------
+# Response cache (public GET routes)
+# --------------------------------------------------
+RESPONSE_CACHE_ENABLED = os.getenv("GATEWAY_RESPONSE_CACHE", "1") == "1"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("GATEWAY_RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("GATEWAY_RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# --------------------------------------------------
+# Request coalescing (opt-in)
+# --------------------------------------------------
+COALESCE_ENABLED = os.getenv("GATEWAY_COALESCE", "0") == "1"
+
+# --------------------------------------------------
+# Response compression (gzip, plus brotli if the module is installed)
+# --------------------------------------------------
+COMPRESSION_ENABLED = os.getenv("GATEWAY_COMPRESSION", "1") == "1"
+COMPRESSION_MIN_BYTES = int(os.getenv("GATEWAY_COMPRESSION_MIN_BYTES", "1024"))
+# Larger bodies are passed through rather than buffered for compression
+COMPRESSION_MAX_BYTES = int(os.getenv("GATEWAY_COMPRESSION_MAX_BYTES", str(8 * 1024 * 1024)))
+# Bodies above this are compressed off the event loop
+COMPRESSION_THREADPOOL_BYTES = int(os.getenv("GATEWAY_COMPRESSION_THREADPOOL_BYTES", str(64 * 1024)))
+COMPRESSION_WORKERS = int(os.getenv("GATEWAY_COMPRESSION_WORKERS", "2"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("GATEWAY_COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("GATEWAY_COMPRESSION_BROTLI_QUALITY", "4"))
+
+# --------------------------------------------------
+# Traffic capture (for replay.py)
+# --------------------------------------------------
+CAPTURE_ENABLED = os.getenv("GATEWAY_CAPTURE", "0") == "1"
+CAPTURE_PATH = os.getenv("GATEWAY_CAPTURE_PATH", "gateway_capture.log")
+CAPTURE_SAMPLE_RATE = float(os.getenv("GATEWAY_CAPTURE_SAMPLE_RATE", "0.1"))
+CAPTURE_MAX_BYTES = int(os.getenv("GATEWAY_CAPTURE_MAX_BYTES", str(50 * 1024 * 1024)))
+CAPTURE_BACKUPS = int(os.getenv("GATEWAY_CAPTURE_BACKUPS", "5"))
+# 0 = record body hash and size only; otherwise keep (redacted) JSON bodies up to this size
+CAPTURE_MAX_BODY_BYTES = int(os.getenv("GATEWAY_CAPTURE_MAX_BODY_BYTES", "0"))
+
+# --------------------------------------------------
+# Metrics
+# --------------------------------------------------
+# Scrapers send "Authorization: Bearer <token>" for /metrics. Without a
+# token set, only loopback clients may scrape.
+METRICS_TOKEN = os.getenv("GATEWAY_METRICS_TOKEN")
+
+# --------------------------------------------------
+# WebSocket proxy
+# --------------------------------------------------
+WS_MAX_FRAME_SIZE = int(os.getenv("GATEWAY_WS_MAX_FRAME_SIZE", str(1024 * 1024)))
+# Frames buffered from the upstream before reads pause (backpressure)
+WS_MAX_QUEUE = int(os.getenv("GATEWAY_WS_MAX_QUEUE", "16"))
+
+# --------------------------------------------------
+# Admission control
+# --------------------------------------------------
+RATE_LIMIT_ENABLED = os.getenv("GATEWAY_RATE_LIMIT", "1") == "1"
+
+# group -> (requests per second, burst)
+RATE_LIMITS = {
+    "auth": (
+        float(os.getenv("GATEWAY_RATE_AUTH_PER_SEC", "1")),
+        float(os.getenv("GATEWAY_RATE_AUTH_BURST", "5")),
+    ),
+    "matching": (
+        float(os.getenv("GATEWAY_RATE_MATCHING_PER_SEC", "5")),
+        float(os.getenv("GATEWAY_RATE_MATCHING_BURST", "20")),
+    ),
+    "default": (
+        float(os.getenv("GATEWAY_RATE_DEFAULT_PER_SEC", "20")),
+        float(os.getenv("GATEWAY_RATE_DEFAULT_BURST", "50")),
+    ),
+}
+
+MAX_CONCURRENT_REQUESTS = int(os.getenv("GATEWAY_MAX_CONCURRENT_REQUESTS", "256"))
+MAX_QUEUED_REQUESTS = int(os.getenv("GATEWAY_MAX_QUEUED_REQUESTS", "512"))
+SHED_RETRY_AFTER = float(os.getenv("GATEWAY_SHED_RETRY_AFTER", "1"))
+
+# --------------------------------------------------
+# Dashboard aggregate
+# --------------------------------------------------
+# (result key, service, path template, timeout seconds)
+DASHBOARD_BRANCHES = (
+    ("profile", "user", "/users/{user_id}", float(os.getenv("GATEWAY_DASHBOARD_PROFILE_TIMEOUT", "2"))),
+    ("matches", "match", "/matches/user/{user_id}", float(os.getenv("GATEWAY_DASHBOARD_MATCHES_TIMEOUT", "3"))),
+    ("bookings", "booking", "/bookings/user/{user_id}", float(os.getenv("GATEWAY_DASHBOARD_BOOKINGS_TIMEOUT", "3"))),
+    ("queue", "match", "/matches/queue/status/{user_id}", float(os.getenv("GATEWAY_DASHBOARD_QUEUE_TIMEOUT", "2"))),
+)
+
+# --------------------------------------------------
+# Route policies
+# --------------------------------------------------
+# Compiled into a trie by route_policy.RoutePolicyTable. "/x" covers /x and
+# everything below it, "{param}" matches one segment, a trailing "$" means
+# that exact path only. Unset fields are inherited from the enclosing rule.
+ROUTE_POLICIES = {
+    "/health": {"public_methods": "*"},
+    # Lists user ids and session paths, so it needs a token
+    "/health/websockets/connections$": {"public_methods": set()},
+    # Not a user token: checked against GATEWAY_METRICS_TOKEN by the handler
+    "/metrics": {"public_methods": "*"},
+    "/docs": {"public_methods": "*"},
+    "/openapi.json": {"public_methods": "*"},
+
+    "/auth": {"upstream": "user"},
+    "/auth/login": {"public_methods": "*", "rate_limit": "auth"},
+    # Authenticated by the refresh token in the body
+    "/auth/refresh": {"public_methods": "*", "rate_limit": "auth"},
+    "/auth/logout$": {"public_methods": "*"},
+    "/auth/signup": {
+        "public_methods": "*",
+        "rate_limit": "auth",
+        # ID document + selfie uploads
+        "timeout": float(os.getenv("GATEWAY_TIMEOUT_SIGNUP", "120")),
+    },
+
+    "/users": {"upstream": "user"},
+    # Profile photos are public; user_service authorizes ID documents/selfies
+    "/users/media": {"public_methods": {"GET", "HEAD"}},
+    # Admin credentials are checked by user_service itself
+    "/admin": {"upstream": "user", "public_methods": "*"},
+
+    "/matches": {"upstream": "match", "rate_limit": "matching"},
+    "/matches/queue/status": {"coalesce": True, "hedge": True},
+    "/matches/user": {"coalesce": True, "hedge": True},
+
+    "/bookings": {"upstream": "booking"},
+    "/bookings/user": {"coalesce": True, "hedge": True},
+
+    "/venues": {
+        "upstream": "venue",
+        "public_methods": {"GET"},
+        "coalesce": True,
+        "hedge": True,
+        "timeout": float(os.getenv("GATEWAY_TIMEOUT_VENUES", "5")),
+    },
+    "/venues/$": {"cache_ttl": float(os.getenv("GATEWAY_CACHE_TTL_VENUE_LIST", "30"))},
+    "/venues/{venue_id}$": {"cache_ttl": float(os.getenv("GATEWAY_CACHE_TTL_VENUE_DETAIL", "60"))},
+    "/venues/{venue_id}/timeslots$": {
+        "cache_ttl": float(os.getenv("GATEWAY_CACHE_TTL_VENUE_TIMESLOTS", "10")),
+    },
+
+    "/chat": {"upstream": "chat"},
+    "/chat/match": {"public_methods": "*"},
+    "/chat/sessions": {"public_methods": "*"},
+}
+
+DEFAULT_TIMEOUT = float(os.getenv("GATEWAY_DEFAULT_TIMEOUT", "30"))
+CONNECT_TIMEOUT = float(os.getenv("GATEWAY_CONNECT_TIMEOUT", "10"))
@@ -0,0 +1,100 @@
+"""Shared fixtures for the gateway unit tests (run ``python -m pytest`` here)."""
+import asyncio
+
+import jwt
+import pytest
+
+
+class FakeClock:
+    """Stands in for the ``time`` module of the modules under test."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    import rate_limit
+    import token_cache
+    import upstreams
+
+    clock = FakeClock()
+    for module in (token_cache, rate_limit, upstreams):
+        monkeypatch.setattr(module, "time", clock)
+    return clock
+
+
+class FakeVerifier:
+    """Accepts any token it issued that hasn't expired or been revoked."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = 0
+        self.revoked = set()
+        self.revocations = self
+
+    # JWKSVerifier
+    def verify(self, token):
+        from token_verifier import TokenExpired, TokenInvalid, TokenRevoked
+
+        self.calls += 1
+        try:
+            claims = jwt.decode(token, options={"verify_signature": False})
+        except jwt.InvalidTokenError:
+            raise TokenInvalid("Malformed token")
+        if claims.get("forged"):
+            raise TokenInvalid("Invalid token")
+        if claims["exp"] <= self.clock.now:
+            raise TokenExpired("Token expired")
+        if claims.get("jti") in self.revoked:
+            raise TokenRevoked("Token revoked")
+        return claims
+
+    # RevocationFilter
+    def needs_refresh(self):
+        return False
+
+    def might_be_revoked(self, token_ids):
+        return [t for t in token_ids if t in self.revoked]
+
+
+class Auth:
+    def __init__(self, clock, verifier):
+        self.clock = clock
+        self.verifier = verifier
+
+    def token(self, sub="user-1", lifetime=900.0, **claims):
+        claims = {"sub": sub, "exp": int(self.clock.now + lifetime), "jti": f"{sub}-token", **claims}
+        return jwt.encode(claims, "k" * 32, algorithm="HS256")
+
+    def verify(self, token, source=None):
+        """Claims, or the HTTPException verify_token raised."""
+        import main
+        from fastapi import HTTPException
+
+        try:
+            return asyncio.run(main.verify_token(token, source=source))
+        except HTTPException as e:
+            return e
+
+
+@pytest.fixture
+def auth(monkeypatch, clock):
+    """main.verify_token with fresh caches and a fake local verifier."""
+    import main
+    from rate_limit import FailureBackoff
+    from token_cache import TokenCache
+
+    verifier = FakeVerifier(clock)
+    monkeypatch.setattr(main, "LOCAL_TOKEN_VERIFY", True)
+    monkeypatch.setattr(main, "jwks_verifier", verifier)
+    monkeypatch.setattr(main, "token_cache", TokenCache(maxsize=100, ttl=300.0))
+    monkeypatch.setattr(main, "rejected_token_cache", TokenCache(maxsize=100, ttl=30.0))
+    monkeypatch.setattr(main, "auth_backoff", FailureBackoff(threshold=3, base=1.0, max_delay=8.0, reset_after=600.0))
+    return Auth(clock, verifier)
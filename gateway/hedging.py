@@ -0,0 +1,70 @@
+import time
+from collections import deque
+from typing import Optional
+
+
+class LatencyTracker:
+    """Recent upstream response times, used to pick a hedging delay.
+
+    Keeps a fixed window of samples and recomputes the percentile every
+    ``refresh_every`` observations instead of on every request.
+    """
+
+    def __init__(self, percentile: float = 0.95, window: int = 512, refresh_every: int = 32):
+        self.percentile = percentile
+        self.refresh_every = refresh_every
+        self._samples = deque(maxlen=window)
+        self._since_refresh = 0
+        self._cached: Optional[float] = None
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+        self._since_refresh += 1
+        if self._since_refresh >= self.refresh_every:
+            self._since_refresh = 0
+            self._cached = None
+
+    def value(self, min_samples: int = 20) -> Optional[float]:
+        """The configured percentile, or None until there are enough samples."""
+        if len(self._samples) < min_samples:
+            return None
+        if self._cached is None:
+            ordered = sorted(self._samples)
+            self._cached = ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile))]
+        return self._cached
+
+
+class RetryBudget:
+    """Caps retries and hedges at a fraction of regular upstream traffic.
+
+    Every upstream request deposits ``ratio`` tokens and every retry or
+    hedge withdraws a whole one, so extra attempts can never add more than
+    ``ratio`` load on top of normal traffic. A small per-second allowance
+    keeps quiet services retryable. When an upstream is failing outright the
+    budget drains quickly and further retries are refused instead of piling
+    onto it.
+    """
+
+    def __init__(self, ratio: float = 0.1, min_per_second: float = 1.0, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._last = time.monotonic()
+        self.exhausted = 0
+
+    def _refill(self, amount: float):
+        self.tokens = min(self.max_tokens, self.tokens + amount)
+
+    def deposit(self):
+        self._refill(self.ratio)
+
+    def withdraw(self) -> bool:
+        now = time.monotonic()
+        self._refill((now - self._last) * self.min_per_second)
+        self._last = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        self.exhausted += 1
+        return False
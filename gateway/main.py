@@ -1,9 +1,115 @@
-from fastapi import FastAPI, Request, HTTPException, status
+from fastapi import FastAPI, Request, HTTPException, WebSocket, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+import asyncio
+import functools
+import hmac
 import httpx
+import ipaddress
+import json
+import jwt
 import logging
-from typing import Optional
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from config import (
+    SECRET_KEY,
+    ACCEPT_LEGACY_TOKENS,
+    JWKS_URL,
+    JWKS_CACHE_TTL,
+    JWKS_MIN_REFRESH_INTERVAL,
+    REVOCATIONS_URL,
+    REVOCATION_CHECK_URL,
+    REVOCATIONS_REFRESH_INTERVAL,
+    LOCAL_TOKEN_VERIFY,
+    TOKEN_CACHE_SIZE,
+    TOKEN_CACHE_TTL,
+    NEGATIVE_TOKEN_CACHE_SIZE,
+    NEGATIVE_TOKEN_CACHE_TTL,
+    AUTH_BACKOFF_THRESHOLD,
+    AUTH_BACKOFF_BASE,
+    AUTH_BACKOFF_MAX,
+    AUTH_BACKOFF_RESET,
+    STREAM_PROXY,
+    SERVICE_BACKENDS,
+    LB_STRATEGY,
+    LB_MAX_FAILURES,
+    LB_EJECT_SECONDS,
+    LB_MAX_EJECT_SECONDS,
+    LB_SLOW_START_SECONDS,
+    HEALTH_CHECK_INTERVAL,
+    HEALTH_CHECK_TIMEOUT,
+    RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_MAX_BYTES,
+    COALESCE_ENABLED,
+    WS_MAX_FRAME_SIZE,
+    WS_MAX_QUEUE,
+    RATE_LIMIT_ENABLED,
+    RATE_LIMITS,
+    MAX_CONCURRENT_REQUESTS,
+    MAX_QUEUED_REQUESTS,
+    SHED_RETRY_AFTER,
+    DASHBOARD_BRANCHES,
+    ROUTE_POLICIES,
+    DEFAULT_TIMEOUT,
+    CONNECT_TIMEOUT,
+    UPSTREAM_RETRIES,
+    HEDGE_PERCENTILE,
+    HEDGE_MIN_DELAY,
+    HEDGE_DEFAULT_DELAY,
+    RETRY_BUDGET_RATIO,
+    RETRY_BUDGET_MIN_PER_SECOND,
+    COMPRESSION_ENABLED,
+    COMPRESSION_MIN_BYTES,
+    COMPRESSION_MAX_BYTES,
+    COMPRESSION_THREADPOOL_BYTES,
+    COMPRESSION_WORKERS,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_BROTLI_QUALITY,
+    CAPTURE_ENABLED,
+    CAPTURE_PATH,
+    CAPTURE_SAMPLE_RATE,
+    CAPTURE_MAX_BYTES,
+    CAPTURE_BACKUPS,
+    CAPTURE_MAX_BODY_BYTES,
+    METRICS_TOKEN,
+)
+from token_cache import TokenCache
+from token_verifier import (
+    JWKSVerifier,
+    RevocationFilter,
+    KeysUnavailable,
+    TokenExpired,
+    TokenInvalid,
+    claims_to_user,
+)
+from upstreams import UpstreamPool, Backend, run_health_checks
+from response_cache import ResponseCache, CachedResponse, etag_matches
+from coalescing import SingleFlight
+from ws_proxy import (
+    ConnectionStats,
+    WebSocketRegistry,
+    connect_upstream,
+    relay,
+    to_ws_url,
+)
+from rate_limit import (
+    TokenBucketLimiter,
+    ConcurrencyLimiter,
+    Overloaded,
+    FailureBackoff,
+    retry_after_header,
+)
+from route_policy import RoutePolicy, RoutePolicyTable
+from metrics import Registry, httpx_pool_stats
+from timing import RequestTiming
+from hedging import LatencyTracker, RetryBudget
+from capture import TrafficCapture
+from compression import available_encodings, negotiate, is_compressible, compress
 
 # --------------------------------------------------
 # Logging
@@ -22,112 +128,819 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Admin registration listing pages via this header
+    expose_headers=["X-Next-Cursor"],
+)
+
+# --------------------------------------------------
+# Route policies (auth, upstream, timeouts, caching, limits)
+# --------------------------------------------------
+route_policies = RoutePolicyTable(
+    ROUTE_POLICIES, RoutePolicy(timeout=DEFAULT_TIMEOUT, retries=UPSTREAM_RETRIES)
 )
 
 # --------------------------------------------------
-# Services
+# Upstream pools
 # --------------------------------------------------
-SERVICE_URLS = {
-    "user": "http://localhost:8006",
-    "match": "http://localhost:8002",
-    "booking": "http://localhost:8003",
-    "venue": "http://localhost:8004",
-    "chat": "http://localhost:8001",
+upstreams = {
+    name: UpstreamPool(
+        name,
+        urls,
+        strategy=LB_STRATEGY,
+        max_failures=LB_MAX_FAILURES,
+        eject_seconds=LB_EJECT_SECONDS,
+        max_eject=LB_MAX_EJECT_SECONDS,
+        slow_start=LB_SLOW_START_SECONDS,
+    )
+    for name, urls in SERVICE_BACKENDS.items()
 }
 
+# Per-pool latency windows that set the hedging delay
+upstream_latencies = {name: LatencyTracker(HEDGE_PERCENTILE) for name in upstreams}
+
+# Shared by every pool so retries can't amplify an outage
+retry_budget = RetryBudget(RETRY_BUDGET_RATIO, RETRY_BUDGET_MIN_PER_SECOND)
+
+# Upstream statuses that count against a backend's health
+UPSTREAM_FAILURE_STATUSES = frozenset({502, 503, 504})
+
+# Remaining time budget (seconds) forwarded to services; see */deadline.py
+DEADLINE_HEADER = "x-request-timeout"
+
 # --------------------------------------------------
-# Public routes (NO AUTH)
+# Hop-by-hop headers (never forwarded)
 # --------------------------------------------------
-PUBLIC_PREFIXES = (
-    "/auth/login",
-    "/auth/signup",
-    "/health",
-    "/docs",
-    "/openapi.json",
-    "/chat/match",
-    "/chat/sessions",
-)
+HOP_BY_HOP_HEADERS = frozenset({
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "upgrade",
+})
 
 # --------------------------------------------------
 # HTTP Client
 # --------------------------------------------------
 client = httpx.AsyncClient(
-    timeout=httpx.Timeout(30.0, connect=10.0)
+    timeout=httpx.Timeout(DEFAULT_TIMEOUT, connect=CONNECT_TIMEOUT)
+)
+
+# --------------------------------------------------
+# Metrics
+# --------------------------------------------------
+metrics = Registry()
+request_latency = metrics.histogram(
+    "gateway_request_duration_seconds",
+    "Time from request arrival to response headers, per route",
+    labels=("route", "method"),
+)
+requests_total = metrics.counter(
+    "gateway_requests_total", "Requests handled, per route and status", labels=("route", "status"),
+)
+requests_in_flight = metrics.gauge("gateway_requests_in_flight", "Requests currently being handled")
+upstream_latency = metrics.histogram(
+    "gateway_upstream_duration_seconds",
+    "Time from sending an upstream request to its response headers",
+    labels=("upstream",),
+)
+upstream_errors = metrics.counter(
+    "gateway_upstream_errors_total",
+    "Upstream failures by kind (connect, timeout, other, bad_status)",
+    labels=("upstream", "kind"),
+)
+auth_latency = metrics.histogram(
+    "gateway_auth_duration_seconds",
+    "Time spent verifying bearer tokens",
+    labels=("result",),
+)
+auth_rejections = metrics.counter(
+    "gateway_auth_rejections_total",
+    "Rejected bearer tokens (invalid = verified and failed, cached = negative "
+    "cache hit, backoff = source blocked after repeated failures)",
+    labels=("reason",),
+)
+upstream_retries = metrics.counter(
+    "gateway_upstream_retries_total",
+    "Upstream requests retried on another backend after a connect error",
+    labels=("upstream",),
+)
+upstream_hedges = metrics.counter(
+    "gateway_upstream_hedges_total",
+    "Hedged upstream requests (sent, won = the hedge answered first)",
+    labels=("upstream", "result"),
+)
+retry_budget_exhausted = metrics.counter(
+    "gateway_retry_budget_exhausted_total",
+    "Retries or hedges skipped because the retry budget was empty",
+    labels=("upstream", "kind"),
+)
+metrics.gauge(
+    "gateway_retry_budget_tokens",
+    "Retries/hedges currently available in the global retry budget",
+    collect=lambda: [((), retry_budget.tokens)],
+)
+metrics.gauge(
+    "gateway_http_pool_connections",
+    "Upstream HTTP connection pool usage",
+    labels=("state",),
+    collect=lambda: [((state,), value) for state, value in httpx_pool_stats(client).items()],
+)
+metrics.gauge(
+    "gateway_upstream_outstanding",
+    "In-flight requests per upstream backend",
+    labels=("upstream", "backend"),
+    collect=lambda: [
+        ((name, b.url), b.outstanding)
+        for name, pool in upstreams.items()
+        for b in pool.backends
+    ],
+)
+
+
+def observe_upstream(
+    service: str,
+    started: float,
+    status_code: Optional[int] = None,
+    error: Optional[Exception] = None
+):
+    elapsed = time.perf_counter() - started
+    upstream_latency.observe(elapsed, service)
+    if error is None and status_code not in UPSTREAM_FAILURE_STATUSES:
+        upstream_latencies[service].observe(elapsed)
+    if error is not None:
+        if isinstance(error, httpx.TimeoutException):
+            kind = "timeout"
+        elif isinstance(error, httpx.ConnectError):
+            kind = "connect"
+        else:
+            kind = "other"
+        upstream_errors.inc(service, kind)
+    elif status_code in UPSTREAM_FAILURE_STATUSES:
+        upstream_errors.inc(service, "bad_status")
+
+
+# --------------------------------------------------
+# Verified token cache
+# --------------------------------------------------
+token_cache = TokenCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
+
+jwks_verifier = JWKSVerifier(
+    JWKS_URL,
+    ttl=JWKS_CACHE_TTL,
+    min_refresh_interval=JWKS_MIN_REFRESH_INTERVAL,
+    legacy_secret=SECRET_KEY if ACCEPT_LEGACY_TOKENS else None,
+    revocations=RevocationFilter(
+        REVOCATIONS_URL,
+        REVOCATION_CHECK_URL,
+        refresh_interval=REVOCATIONS_REFRESH_INTERVAL,
+    ),
 )
 
+# Rejected tokens -> {"status_code", "detail"}, replayed without re-verifying
+rejected_token_cache = TokenCache(maxsize=NEGATIVE_TOKEN_CACHE_SIZE, ttl=NEGATIVE_TOKEN_CACHE_TTL)
+auth_backoff = FailureBackoff(
+    threshold=AUTH_BACKOFF_THRESHOLD,
+    base=AUTH_BACKOFF_BASE,
+    max_delay=AUTH_BACKOFF_MAX,
+    reset_after=AUTH_BACKOFF_RESET,
+)
+
+# --------------------------------------------------
+# Response cache
+# --------------------------------------------------
+response_cache = ResponseCache(
+    max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=RESPONSE_CACHE_MAX_BYTES,
+)
+
+UNSAFE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+# --------------------------------------------------
+# Request coalescing
+# --------------------------------------------------
+single_flight = SingleFlight()
+
+
+class UpstreamResult(NamedTuple):
+    """A fully buffered upstream response that can be shared between requests."""
+    status_code: int
+    headers: list
+    body: bytes
+
+
+# --------------------------------------------------
+# Admission control
+# --------------------------------------------------
+rate_limiter = TokenBucketLimiter(RATE_LIMITS if RATE_LIMIT_ENABLED else {})
+concurrency_limiter = ConcurrencyLimiter(MAX_CONCURRENT_REQUESTS, MAX_QUEUED_REQUESTS)
+
+# --------------------------------------------------
+# Response compression
+# --------------------------------------------------
+COMPRESSION_ENCODINGS = available_encodings()
+
+# Dedicated threads so large bodies don't compete with sync endpoints
+compression_executor = ThreadPoolExecutor(
+    max_workers=COMPRESSION_WORKERS, thread_name_prefix="gateway-compress"
+)
+
+
+def compression_encoding(request: Request, headers, length: Optional[int]) -> Optional[str]:
+    """The encoding compression_middleware applies to a response with these
+    headers and body length, or None if it is sent as-is."""
+    if not COMPRESSION_ENABLED or request.method == "HEAD":
+        return None
+    if (
+        "content-encoding" in headers
+        or not is_compressible(headers.get("content-type", ""))
+        # Unknown length means a streamed body; relay it as-is
+        or length is None
+        or not COMPRESSION_MIN_BYTES <= length <= COMPRESSION_MAX_BYTES
+    ):
+        return None
+    return negotiate(request.headers.get("accept-encoding"), COMPRESSION_ENCODINGS)
+
+
+def weak_etag(etag: str) -> str:
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+# --------------------------------------------------
+# Traffic capture (opt-in)
+# --------------------------------------------------
+traffic_capture = TrafficCapture(
+    CAPTURE_PATH,
+    sample_rate=CAPTURE_SAMPLE_RATE,
+    max_bytes=CAPTURE_MAX_BYTES,
+    backups=CAPTURE_BACKUPS,
+    max_body_bytes=CAPTURE_MAX_BODY_BYTES,
+) if CAPTURE_ENABLED else None
+
+# --------------------------------------------------
+# WebSocket connections
+# --------------------------------------------------
+websockets_registry = WebSocketRegistry()
+
 # --------------------------------------------------
 # Helpers
 # --------------------------------------------------
-def is_public(path: str, method: str = "GET") -> bool:
-    # Check basic public prefixes
-    if any(path.startswith(p) for p in PUBLIC_PREFIXES):
-        return True
-    
-    # Allow GET requests to venues for browsing (but not POST/PUT/DELETE)
-    if path.startswith("/venues") and method == "GET":
-        return True
-    
-    return False
+def upstream_timeout(request: Request, cap: Optional[float] = None) -> httpx.Timeout:
+    """httpx timeout for the time left before the request's deadline."""
+    budget = request.state.deadline - time.monotonic()
+    if cap is not None:
+        budget = min(budget, cap)
+    if budget <= 0:
+        raise HTTPException(status_code=504, detail="Gateway deadline exceeded")
+    return httpx.Timeout(budget, connect=min(CONNECT_TIMEOUT, budget))
+
+
+def build_upstream_request(
+    request: Request,
+    backend: Backend,
+    method: str,
+    path: str,
+    headers: dict,
+    params,
+    content=None,
+    cap: Optional[float] = None
+) -> httpx.Request:
+    """An httpx request to the backend, bounded by the request's deadline.
+
+    Built per attempt, so retries and hedges get the budget that is left.
+    """
+    timeout = upstream_timeout(request, cap)
+    headers = dict(headers)
+    headers[DEADLINE_HEADER] = f"{timeout.read:.3f}"
+    timing = getattr(request.state, "timing", None)
+    return client.build_request(
+        method,
+        f"{backend.url}{path}",
+        headers=headers,
+        params=params,
+        content=content,
+        timeout=timeout,
+        extensions={"trace": timing.upstream_trace()} if timing else {}
+    )
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit_key(request: Request) -> str:
+    user = getattr(request.state, "user", None)
+    if user and user.get("user_id"):
+        return f"user:{user['user_id']}"
+    return f"ip:{client_ip(request)}"
+
+
+async def admit(request: Request, call_next):
+    """Apply per-key rate limits and the global concurrency cap, then forward."""
+    if request.url.path.startswith("/health"):
+        return await call_next(request)
+
+    retry_after = rate_limiter.check(request.state.policy.rate_limit, rate_limit_key(request))
+    if retry_after is not None:
+        return JSONResponse(
+            {"detail": "Too many requests"},
+            status_code=429,
+            headers={"Retry-After": retry_after_header(retry_after)}
+        )
+
+    try:
+        await concurrency_limiter.acquire()
+    except Overloaded:
+        return JSONResponse(
+            {"detail": "Gateway overloaded"},
+            status_code=503,
+            headers={"Retry-After": retry_after_header(SHED_RETRY_AFTER)}
+        )
+
+    try:
+        return await call_next(request)
+    finally:
+        concurrency_limiter.release()
+
 
+async def verify_token_locally(token: str) -> dict:
+    """Verify a token in-process against user_service's published keys
+    and revocation filter.
 
-async def verify_token(token: str) -> dict:
+    Runs in a thread: the verifier occasionally calls user_service (stale
+    keys, unknown kid, revocation filter hit), and RSA verification is
+    CPU work anyway.
+    """
+    try:
+        claims = await asyncio.get_running_loop().run_in_executor(None, jwks_verifier.verify, token)
+    except TokenExpired:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except TokenInvalid:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    except KeysUnavailable:
+        raise HTTPException(status_code=503, detail="Auth service unavailable")
+
+    # jti/sid let cached claims be checked against later revocations
+    return {**claims_to_user(claims), "jti": claims.get("jti"), "sid": claims.get("sid"), "token_valid": True}
+
+
+async def verify_token_remote(token: str) -> dict:
+    pool = upstreams["user"]
+    backend = pool.choose()
+    pool.acquire(backend)
+    ok = False
+    started = time.perf_counter()
     try:
         res = await client.post(
-            f"{SERVICE_URLS['user']}/auth/verify-token",
+            f"{backend.url}/auth/verify-token",
             headers={"Authorization": f"Bearer {token}"}
         )
+        observe_upstream(pool.name, started, status_code=res.status_code)
+        ok = res.status_code not in UPSTREAM_FAILURE_STATUSES
 
         if res.status_code != 200:
             raise HTTPException(status_code=401, detail="Invalid token")
 
+        # Includes jti/sid, so cached entries are re-checked against the
+        # revocation filter the same way as locally verified ones
         return res.json()
 
     except httpx.RequestError as e:
+        observe_upstream(pool.name, started, error=e)
         logger.error(f"Auth service down: {e}")
         raise HTTPException(status_code=503, detail="Auth service unavailable")
+    finally:
+        pool.release(backend, ok)
+
+
+def token_expiry(token: str) -> Optional[float]:
+    # Signature has already been checked at this point; we only need `exp`
+    try:
+        payload = jwt.decode(token, options={"verify_signature": False})
+    except jwt.InvalidTokenError:
+        return None
+    exp = payload.get("exp")
+    return float(exp) if exp is not None else None
+
+
+async def verify_token(token: str, source: Optional[str] = None) -> dict:
+    """Claims for a valid token, from cache when possible.
+
+    A known-good token is accepted unless it has since been revoked, and
+    any other token is verified. Tokens rejected recently are refused from
+    the negative cache; a ``source`` (client address) that keeps replaying
+    them gets 429 instead. Only those replays are blocked: behind a shared
+    address one client's bad tokens never stop another's valid ones.
+    """
+    cached = token_cache.get(token)
+    if cached is not None:
+        revocations = jwks_verifier.revocations
+        if revocations.needs_refresh():
+            # In the background; refresh() returns at once if one is running
+            asyncio.get_running_loop().run_in_executor(None, revocations.refresh)
+        # A filter hit falls through to full verification, which confirms it
+        if not revocations.might_be_revoked([cached.get("jti"), cached.get("sid")]):
+            return cached
+
+    rejected = rejected_token_cache.get(token)
+    if rejected is not None:
+        if source is not None:
+            wait = auth_backoff.check(source)
+            if wait is not None:
+                auth_rejections.inc("backoff")
+                raise HTTPException(
+                    status_code=429,
+                    detail="Too many failed authentication attempts",
+                    headers={"Retry-After": retry_after_header(wait)}
+                )
+            auth_backoff.failure(source)
+        auth_rejections.inc("cached")
+        raise HTTPException(status_code=401, detail=rejected["detail"])
+
+    try:
+        if LOCAL_TOKEN_VERIFY:
+            claims = await verify_token_locally(token)
+        else:
+            claims = await verify_token_remote(token)
+    except HTTPException as e:
+        # 503s say nothing about the token itself
+        if e.status_code == 401:
+            auth_rejections.inc("invalid")
+            rejected_token_cache.put(token, {"detail": e.detail})
+            if source is not None:
+                auth_backoff.failure(source)
+        raise
+
+    if source is not None:
+        auth_backoff.success(source)
+    token_cache.put(token, claims, exp=token_expiry(token))
+    return claims
 
 
 async def proxy_request(
-    service_url: str,
     request: Request,
     path_override: Optional[str] = None
 ):
+    path = path_override or request.url.path
+    policy: RoutePolicy = request.state.policy
+    service = policy.upstream
+
+    if request.method == "GET":
+        if RESPONSE_CACHE_ENABLED and policy.cache_ttl is not None:
+            return await proxy_request_cached(service, request, path, policy.cache_ttl)
+        if COALESCE_ENABLED and policy.coalesce:
+            result = await fetch_coalesced(service, request, path)
+            return buffered_response(result.status_code, result.headers, result.body)
+
+    pool = upstreams[service]
     try:
-        url = f"{service_url}{path_override or request.url.path}"
+        if STREAM_PROXY:
+            return await proxy_request_streaming(pool, request, path)
+        return await proxy_request_buffered(pool, request, path)
+    finally:
+        if request.method in UNSAFE_METHODS and len(response_cache):
+            # Writes under e.g. /venues drop every cached /venues read
+            response_cache.invalidate_prefix("/" + path.lstrip("/").split("/", 1)[0])
 
-        headers = {
-            k: v for k, v in request.headers.items()
-            if k.lower() not in {"host", "content-length"}
-        }
 
-        body = await request.body()
+def buffered_response(status_code: int, headers: list, body: bytes, override: Optional[dict] = None) -> Response:
+    """Replay buffered upstream headers field by field, so repeated ones
+    (Set-Cookie, Vary) stay separate; ``override`` replaces any of the
+    same name."""
+    override = override or {}
+    replaced = {k.lower() for k in override}
+    fields = [(k, v) for k, v in headers if k.lower() not in replaced] + list(override.items())
+    response = Response(content=body, status_code=status_code)
+    response.raw_headers += [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in fields]
+    return response
 
-        resp = await client.request(
-            request.method,
-            url,
-            headers=headers,
-            params=request.query_params,
-            content=body if body else None
-        )
 
-        # ---- SAFE JSON HANDLING ----
-        content_type = resp.headers.get("content-type", "")
-        if "application/json" in content_type:
-            try:
-                content = resp.json()
-            except Exception:
-                content = {"detail": resp.text}
-            return JSONResponse(content, status_code=resp.status_code)
-
-        return Response(
-            content=resp.content,
-            status_code=resp.status_code,
-            media_type=content_type
-        )
+def cached_response(entry: CachedResponse, request: Request, hit: bool) -> Response:
+    cache_headers = {
+        "ETag": entry.etag,
+        "Cache-Control": f"public, max-age={entry.max_age()}",
+        "X-Cache": "HIT" if hit else "MISS",
+    }
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        # Confirm the representation the 200 would have carried: the
+        # compressed one has a weak ETag and varies on Accept-Encoding
+        if compression_encoding(request, dict(entry.headers), len(entry.body)):
+            cache_headers["ETag"] = weak_etag(entry.etag)
+            vary = [v for k, v in entry.headers if k.lower() == "vary"]
+            cache_headers["Vary"] = ", ".join(vary + ["Accept-Encoding"])
+        return Response(status_code=304, headers=cache_headers)
+
+    return buffered_response(entry.status_code, entry.headers, entry.body, override=cache_headers)
+
+
+async def proxy_request_cached(service: str, request: Request, path: str, ttl: float):
+    """Serve a cacheable GET from the gateway cache, filling it on a miss."""
+    key = response_cache.key(path, request.url.query)
+    entry = response_cache.get(key)
+    if entry is not None:
+        return cached_response(entry, request, hit=True)
+
+    if COALESCE_ENABLED:
+        result = await fetch_coalesced(service, request, path)
+    else:
+        result = await fetch_buffered(service, request, path)
+
+    entry = CachedResponse(result.status_code, result.headers, result.body, ttl)
+    if result.status_code == 200:
+        response_cache.put(key, entry)
+    return cached_response(entry, request, hit=False)
+
+
+def coalescing_key(request: Request, path: str) -> str:
+    # Responses may depend on the caller, so the verified subject is part of
+    # the identity for authenticated requests
+    user = getattr(request.state, "user", None)
+    subject = user.get("user_id", "") if user else ""
+    return f"{request.method} {response_cache.key(path, request.url.query)} {subject}"
+
 
+async def fetch_coalesced(service: str, request: Request, path: str) -> UpstreamResult:
+    return await single_flight.do(
+        coalescing_key(request, path),
+        lambda: fetch_buffered(service, request, path)
+    )
+
+
+async def fetch_buffered(
+    service: str,
+    request: Request,
+    path: str,
+    params=None,
+    cap: Optional[float] = None
+) -> UpstreamResult:
+    """GET a path from the service and buffer the (decoded) response.
+
+    Query parameters default to the incoming request's.
+    """
+    pool = upstreams[service]
+    headers = {
+        k: v for k, v in request.headers.items()
+        if k.lower() not in HOP_BY_HOP_HEADERS
+        and k.lower() not in {"host", "if-none-match", "if-modified-since"}
+    }
+    params = request.query_params if params is None else params
+
+    backend, resp = await send_upstream(
+        pool,
+        request,
+        lambda b: build_upstream_request(request, b, "GET", path, headers, params, cap=cap),
+        hedge=request.method == "GET" and request.state.policy.hedge
+    )
+    await read_upstream_body(pool, backend, request, resp)
+
+    return UpstreamResult(resp.status_code, buffered_headers(resp), resp.content)
+
+
+def buffered_headers(resp: httpx.Response) -> list:
+    """End-to-end headers of a buffered upstream response.
+
+    httpx has already decoded the body, so framing/encoding headers no
+    longer apply. multi_items() keeps repeated headers apart.
+    """
+    return [
+        (k, v) for k, v in resp.headers.multi_items()
+        if k.lower() not in HOP_BY_HOP_HEADERS
+        and k.lower() not in {
+            "content-length", "content-encoding", "transfer-encoding", "date", "server"
+        }
+    ]
+
+
+async def read_upstream_body(pool: UpstreamPool, backend: Backend, request: Request, resp: httpx.Response):
+    """Buffer a streamed upstream response and hand the backend back to the pool."""
+    ok = resp.status_code not in UPSTREAM_FAILURE_STATUSES
+    started = time.perf_counter()
+    try:
+        await resp.aread()
     except httpx.RequestError as e:
-        logger.error(f"Upstream error: {e}")
+        ok = False
+        logger.error(f"Upstream error ({backend.url}): {e}")
         raise HTTPException(status_code=503, detail="Service unavailable")
+    finally:
+        await resp.aclose()
+        pool.release(backend, ok)
+    if hasattr(request.state, "timing"):
+        request.state.timing.add("upstream-body", time.perf_counter() - started)
+
+
+# --------------------------------------------------
+# Upstream sends (retries and hedging)
+# --------------------------------------------------
+# Nothing reached the upstream, so these are safe to retry for any method
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+async def send_upstream(
+    pool: UpstreamPool,
+    request: Request,
+    build: Callable[[Backend], httpx.Request],
+    hedge: bool = False
+) -> Tuple[Backend, httpx.Response]:
+    """Send a request to the pool and return once response headers arrive.
+
+    Connect errors are retried on another backend, up to the route policy's
+    ``retries``. With ``hedge``, a second copy goes to another backend if the
+    first has not answered within the pool's hedging delay, and whichever
+    responds first wins. Retries and hedges both draw on the global retry
+    budget.
+
+    The returned backend is still acquired; the caller releases it once the
+    response body has been consumed.
+    """
+    retry_budget.deposit()
+    retries_left = request.state.policy.retries
+    failed = None
+
+    while True:
+        backend = pool.choose(exclude=failed)
+        try:
+            if hedge:
+                return await send_hedged(pool, build, backend)
+            return backend, await send_once(pool, build, backend)
+        except RETRYABLE_ERRORS as e:
+            error = e
+            if retries_left > 0 and len(pool.backends) > 1:
+                if retry_budget.withdraw():
+                    retries_left -= 1
+                    failed = backend
+                    upstream_retries.inc(pool.name)
+                    continue
+                retry_budget_exhausted.inc(pool.name, "retry")
+        except httpx.RequestError as e:
+            error = e
+        logger.error(f"Upstream error ({backend.url}): {error}")
+        raise HTTPException(status_code=503, detail="Service unavailable")
+
+
+async def send_once(
+    pool: UpstreamPool,
+    build: Callable[[Backend], httpx.Request],
+    backend: Backend
+) -> httpx.Response:
+    upstream_request = build(backend)
+    pool.acquire(backend)
+    started = time.perf_counter()
+    try:
+        resp = await client.send(upstream_request, stream=True)
+    except httpx.RequestError as e:
+        observe_upstream(pool.name, started, error=e)
+        pool.release(backend, ok=False)
+        raise
+    except BaseException:
+        # Lost hedge or client gone: no verdict on the backend's health
+        pool.release(backend, ok=None)
+        raise
+    observe_upstream(pool.name, started, status_code=resp.status_code)
+    return resp
+
+
+def hedge_delay(pool: UpstreamPool) -> float:
+    percentile = upstream_latencies[pool.name].value()
+    if percentile is None:
+        return HEDGE_DEFAULT_DELAY
+    return max(HEDGE_MIN_DELAY, percentile)
+
+
+async def send_hedged(
+    pool: UpstreamPool,
+    build: Callable[[Backend], httpx.Request],
+    backend: Backend
+) -> Tuple[Backend, httpx.Response]:
+    primary = asyncio.ensure_future(send_once(pool, build, backend))
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay(pool))
+    except BaseException:
+        primary.cancel()
+        raise
+    if done:
+        return backend, primary.result()
+
+    hedge_backend = pool.choose(exclude=backend)
+    if hedge_backend is backend:
+        return backend, await primary
+    if not retry_budget.withdraw():
+        retry_budget_exhausted.inc(pool.name, "hedge")
+        return backend, await primary
+
+    upstream_hedges.inc(pool.name, "sent")
+    secondary = asyncio.ensure_future(send_once(pool, build, hedge_backend))
+    attempts = {primary: backend, secondary: hedge_backend}
+
+    pending = set(attempts)
+    winner = None
+    error = None
+    try:
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                elif winner is None:
+                    winner = task
+                else:
+                    # Both answered in the same loop iteration
+                    await task.result().aclose()
+                    pool.release(attempts[task], ok=True)
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if winner is None:
+        raise error
+    if winner is secondary:
+        upstream_hedges.inc(pool.name, "won")
+    return attempts[winner], winner.result()
+
+
+def request_body_stream(request: Request):
+    capture = getattr(request.state, "capture", None)
+    if capture is None:
+        return request.stream()
+    return traffic_capture.tee(capture, request.stream())
+
+
+async def proxy_request_streaming(pool: UpstreamPool, request: Request, path: str):
+    """Pass request and response bodies through without buffering or decoding."""
+    headers = {
+        k: v for k, v in request.headers.items()
+        if k.lower() not in HOP_BY_HOP_HEADERS
+        and k.lower() not in {"host", "transfer-encoding"}
+    }
+
+    # Only attach a body stream when the client actually sent one, otherwise
+    # httpx would add chunked framing to bodiless GETs
+    has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+
+    backend, resp = await send_upstream(
+        pool,
+        request,
+        lambda b: build_upstream_request(
+            request, b, request.method, path, headers, request.query_params,
+            content=request_body_stream(request) if has_body else None
+        ),
+        # A streamed request body can only be sent once
+        hedge=request.method == "GET" and not has_body and request.state.policy.hedge
+    )
+    ok = resp.status_code not in UPSTREAM_FAILURE_STATUSES
+
+    async def close_upstream():
+        # The backend stays "outstanding" until its body has been relayed
+        await resp.aclose()
+        pool.release(backend, ok)
+
+    response = StreamingResponse(
+        resp.aiter_raw(),
+        status_code=resp.status_code,
+        background=BackgroundTask(close_upstream)
+    )
+    # Raw bytes are forwarded untouched, so content-length, transfer-encoding
+    # and content-encoding stay valid as sent by the upstream
+    response.raw_headers = [
+        (k, v) for k, v in resp.headers.raw
+        if k.decode("latin-1").lower() not in HOP_BY_HOP_HEADERS
+        and k.decode("latin-1").lower() not in {"date", "server"}
+    ]
+    return response
+
+
+async def proxy_request_buffered(pool: UpstreamPool, request: Request, path: str):
+    headers = {
+        k: v for k, v in request.headers.items()
+        if k.lower() not in {"host", "content-length"}
+    }
+
+    body = await request.body()
+    capture = getattr(request.state, "capture", None)
+    if capture is not None and body:
+        capture.add_body(body, traffic_capture.max_body_bytes)
+
+    backend, resp = await send_upstream(
+        pool,
+        request,
+        lambda b: build_upstream_request(
+            request, b, request.method, path, headers, request.query_params,
+            content=body if body else None
+        ),
+        hedge=request.method == "GET" and request.state.policy.hedge
+    )
+    await read_upstream_body(pool, backend, request, resp)
+
+    # ---- SAFE JSON HANDLING ----
+    # Valid bodies go out byte for byte, so upstream ETags still hold
+    content = resp.content
+    if "application/json" in resp.headers.get("content-type", ""):
+        try:
+            resp.json()
+        except ValueError:
+            content = json.dumps({"detail": resp.text}).encode()
+
+    # Content-Range, ETag, Cache-Control, X-Next-Cursor, Set-Cookie, ...
+    return buffered_response(resp.status_code, buffered_headers(resp), content)
 
 
 # --------------------------------------------------
@@ -138,9 +951,15 @@ async def auth_middleware(request: Request, call_next):
     path = request.url.path
     method = request.method
 
-    # Skip auth for OPTIONS, public routes, and admin routes
-    if method == "OPTIONS" or is_public(path, method) or path.startswith("/admin"):
+    # One trie lookup resolves auth, upstream, timeout, caching and limits
+    policy = route_policies.resolve(path)
+    request.state.policy = policy
+    request.state.deadline = time.monotonic() + policy.timeout
+
+    if method == "OPTIONS":
         return await call_next(request)
+    if policy.is_public(method):
+        return await admit(request, call_next)
 
     auth = request.headers.get("Authorization")
     if not auth or not auth.startswith("Bearer "):
@@ -151,12 +970,101 @@ async def auth_middleware(request: Request, call_next):
 
     token = auth.split(" ", 1)[1]
 
+    started = time.perf_counter()
     try:
-        request.state.user = await verify_token(token)
+        request.state.user = await verify_token(token, source=client_ip(request))
     except HTTPException as e:
-        return JSONResponse({"detail": e.detail}, status_code=e.status_code)
+        auth_latency.observe(time.perf_counter() - started, "rejected")
+        return JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+    elapsed = time.perf_counter() - started
+    auth_latency.observe(elapsed, "ok")
+    request.state.timing.add("auth", elapsed)
 
-    return await call_next(request)
+    return await admit(request, call_next)
+
+
+# --------------------------------------------------
+# Middleware (COMPRESSION) - wraps auth, inside metrics
+# --------------------------------------------------
+@app.middleware("http")
+async def compression_middleware(request: Request, call_next):
+    response = await call_next(request)
+    if response.status_code in (204, 304):
+        return response
+
+    headers = response.headers
+    length = headers.get("content-length")
+    encoding = compression_encoding(request, headers, None if length is None else int(length))
+    if encoding is None:
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+
+    started = time.perf_counter()
+    compress_body = functools.partial(
+        compress, body, encoding, COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY
+    )
+    if len(body) >= COMPRESSION_THREADPOOL_BYTES:
+        compressed = await asyncio.get_running_loop().run_in_executor(
+            compression_executor, compress_body
+        )
+    else:
+        compressed = compress_body()
+    request.state.timing.add("compress", time.perf_counter() - started)
+
+    out = Response(content=compressed, status_code=response.status_code)
+    out.raw_headers = [
+        (k, v) for k, v in response.raw_headers
+        if k.lower() not in {b"content-length", b"etag", b"vary"}
+    ] + [(b"content-length", str(len(compressed)).encode()), (b"content-encoding", encoding.encode())]
+    out.headers["Vary"] = ", ".join(
+        v for v in (headers.get("vary"), "Accept-Encoding") if v
+    )
+    etag = headers.get("etag")
+    if etag:
+        # The bytes differ from the identity representation, so the
+        # validator can only be weak (still matches If-None-Match)
+        out.headers["ETag"] = weak_etag(etag)
+    return out
+
+
+# --------------------------------------------------
+# Middleware (METRICS) - registered last, so it wraps auth
+# --------------------------------------------------
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    started = time.perf_counter()
+    request.state.timing = RequestTiming()
+    request.state.capture = traffic_capture.sample() if traffic_capture else None
+    requests_in_flight.inc()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        # Covers time to response headers; streamed bodies are still in flight
+        response.headers["Server-Timing"] = request.state.timing.header(
+            time.perf_counter() - started
+        )
+        return response
+    finally:
+        requests_in_flight.dec()
+        policy = getattr(request.state, "policy", None)
+        route = policy.route if policy else "unmatched"
+        elapsed = time.perf_counter() - started
+        request_latency.observe(elapsed, route, request.method)
+        requests_total.inc(route, str(status_code))
+        if request.state.capture is not None:
+            traffic_capture.record(
+                request.state.capture,
+                request.method,
+                request.url.path,
+                request.url.query,
+                request.headers.get("content-type"),
+                status_code,
+                elapsed,
+                route,
+                policy.upstream if policy else None,
+            )
 
 
 # --------------------------------------------------
@@ -167,22 +1075,116 @@ async def health():
     return {"gateway": "healthy"}
 
 
+def metrics_scrape_allowed(request: Request) -> bool:
+    if METRICS_TOKEN:
+        auth = request.headers.get("authorization", "")
+        return hmac.compare_digest(auth.encode(), f"Bearer {METRICS_TOKEN}".encode())
+    try:
+        return ipaddress.ip_address(client_ip(request)).is_loopback
+    except ValueError:
+        return False
+
+
+@app.get("/metrics")
+async def prometheus_metrics(request: Request):
+    if not metrics_scrape_allowed(request):
+        raise HTTPException(status_code=403, detail="Metrics scrape not allowed")
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/health/upstreams")
+async def upstream_health():
+    return {name: pool.as_dict() for name, pool in upstreams.items()}
+
+
+@app.get("/health/coalescing")
+async def coalescing_stats():
+    return single_flight.stats()
+
+
+@app.get("/health/websockets")
+async def websocket_stats():
+    return websockets_registry.as_dict()
+
+
+@app.get("/health/websockets/connections")
+async def websocket_connections(request: Request):
+    # Not public (see ROUTE_POLICIES): callers only see their own connections
+    return websockets_registry.connections(request.state.user["user_id"])
+
+
+@app.get("/health/admission")
+async def admission_stats():
+    return {
+        "rate_limited": rate_limiter.rejected,
+        "in_flight": concurrency_limiter.in_flight,
+        "queued": concurrency_limiter.waiting,
+        "shed": concurrency_limiter.shed,
+        "auth_backoff_sources": len(auth_backoff),
+        "auth_backoff_blocked": auth_backoff.blocked,
+        "rejected_tokens_cached": len(rejected_token_cache),
+    }
+
+
 # --------------------------------------------------
 # ROUTES
 # --------------------------------------------------
+@app.get("/dashboard")
+async def dashboard(request: Request):
+    """Profile, matches, bookings and queue status for the caller in one call.
+
+    Branches run concurrently, each with its own timeout. A failed branch
+    comes back as null with its error listed under "errors" instead of
+    failing the whole response.
+    """
+    user_id = request.state.user["user_id"]
+
+    async def branch(service: str, path: str, timeout: float):
+        result = await asyncio.wait_for(
+            fetch_buffered(service, request, path, params={}, cap=timeout),
+            timeout
+        )
+        if result.status_code != 200:
+            raise HTTPException(status_code=result.status_code, detail=f"HTTP {result.status_code}")
+        return json.loads(result.body)
+
+    results = await asyncio.gather(
+        *(
+            branch(service, path.format(user_id=user_id), timeout)
+            for _, service, path, timeout in DASHBOARD_BRANCHES
+        ),
+        return_exceptions=True
+    )
+
+    payload = {"user_id": user_id, "errors": {}}
+    for (key, _, _, _), result in zip(DASHBOARD_BRANCHES, results):
+        if isinstance(result, BaseException):
+            if isinstance(result, asyncio.TimeoutError):
+                error = "timeout"
+            elif isinstance(result, HTTPException):
+                error = result.detail
+            else:
+                logger.error(f"Dashboard branch {key} failed: {result!r}")
+                error = "unavailable"
+            payload[key] = None
+            payload["errors"][key] = error
+        else:
+            payload[key] = result
+
+    return payload
+
+
 @app.api_route("/auth/{path:path}", methods=["GET", "POST"])
 async def auth_routes(path: str, request: Request):
     return await proxy_request(
-        SERVICE_URLS["user"],
         request,
         f"/auth/{path}"
     )
 
 
-@app.api_route("/users/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
+@app.api_route("/users/{path:path}", methods=["GET", "HEAD", "POST", "PUT", "DELETE"])
 async def user_routes(path: str, request: Request):
     return await proxy_request(
-        SERVICE_URLS["user"],
         request,
         f"/users/{path}"
     )
@@ -191,7 +1193,6 @@ async def user_routes(path: str, request: Request):
 @app.api_route("/admin/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def admin_routes(path: str, request: Request):
     return await proxy_request(
-        SERVICE_URLS["user"],
         request,
         f"/admin/{path}"
     )
@@ -200,7 +1201,6 @@ async def admin_routes(path: str, request: Request):
 @app.api_route("/matches/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def match_routes(path: str, request: Request):
     return await proxy_request(
-        SERVICE_URLS["match"],
         request,
         f"/matches/{path}"
     )
@@ -209,7 +1209,6 @@ async def match_routes(path: str, request: Request):
 @app.api_route("/bookings/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def booking_routes(path: str, request: Request):
     return await proxy_request(
-        SERVICE_URLS["booking"],
         request,
         f"/bookings/{path}"
     )
@@ -218,7 +1217,6 @@ async def booking_routes(path: str, request: Request):
 @app.api_route("/venues/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def venue_routes(path: str, request: Request):
     return await proxy_request(
-        SERVICE_URLS["venue"],
         request,
         f"/venues/{path}"
     )
@@ -227,18 +1225,100 @@ async def venue_routes(path: str, request: Request):
 @app.api_route("/chat/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def chat_routes(path: str, request: Request):
     return await proxy_request(
-        SERVICE_URLS["chat"],
         request,
         f"/{path}"
     )
 
 
+@app.websocket("/chat/ws/{session_id}/{user_id}")
+async def chat_websocket(websocket: WebSocket, session_id: str, user_id: str):
+    # HTTP middleware does not run for WebSockets, so authenticate here, once.
+    # Browsers can't set headers on WebSocket upgrades, hence ?token=
+    token = websocket.query_params.get("token")
+    auth = websocket.headers.get("Authorization")
+    if not token and auth and auth.startswith("Bearer "):
+        token = auth.split(" ", 1)[1]
+    if not token:
+        await websocket.close(code=1008, reason="Authorization required")
+        return
+
+    try:
+        user = await verify_token(token)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+
+    if user.get("user_id") != user_id:
+        await websocket.close(code=1008, reason="Unauthorized")
+        return
+
+    pool = upstreams[route_policies.resolve(websocket.url.path).upstream]
+    backend = pool.choose()
+    path = f"/ws/{session_id}/{user_id}"
+
+    # chat_service verifies the token itself when CHAT_REQUIRE_TOKEN is set;
+    # kept out of ``path`` so it doesn't end up in the logs below
+    query = urllib.parse.urlencode({"token": token})
+
+    pool.acquire(backend)
+    try:
+        upstream = await connect_upstream(
+            f"{to_ws_url(backend.url)}{path}?{query}",
+            max_size=WS_MAX_FRAME_SIZE,
+            max_queue=WS_MAX_QUEUE,
+        )
+    except OSError as e:
+        pool.release(backend, ok=False)
+        logger.error(f"Upstream error ({backend.url}): {e}")
+        await websocket.close(code=1011, reason="Chat service unavailable")
+        return
+    except Exception as e:
+        # Handshake rejected by the chat service (unknown/inactive session)
+        pool.release(backend, ok=True)
+        logger.info(f"Chat upstream rejected {path}: {e}")
+        await websocket.close(code=1008, reason="Chat session not available")
+        return
+
+    await websocket.accept()
+
+    stats = ConnectionStats(path, user_id, backend.url)
+    websockets_registry.open(stats)
+    try:
+        await relay(websocket, upstream, stats)
+    finally:
+        websockets_registry.close(stats)
+        pool.release(backend, ok=True)
+        logger.info(
+            f"WebSocket {path} closed: "
+            f"{stats.frames_in}/{stats.frames_out} frames in/out, "
+            f"{stats.bytes_in}/{stats.bytes_out} bytes in/out"
+        )
+
+
 # --------------------------------------------------
-# Shutdown
+# Startup / Shutdown
 # --------------------------------------------------
+@app.on_event("startup")
+async def startup():
+    if traffic_capture:
+        traffic_capture.start()
+    if LOCAL_TOKEN_VERIFY:
+        await asyncio.get_running_loop().run_in_executor(None, jwks_verifier.warm)
+    else:
+        # Cached claims are still checked against revocations
+        await asyncio.get_running_loop().run_in_executor(None, jwks_verifier.revocations.refresh)
+    app.state.health_checker = asyncio.create_task(
+        run_health_checks(upstreams, client, HEALTH_CHECK_INTERVAL, HEALTH_CHECK_TIMEOUT)
+    )
+
+
 @app.on_event("shutdown")
 async def shutdown():
+    app.state.health_checker.cancel()
     await client.aclose()
+    compression_executor.shutdown(wait=False)
+    if traffic_capture:
+        traffic_capture.stop()
 
 
 if __name__ == "__main__":
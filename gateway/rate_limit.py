@@ -0,0 +1,158 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+class TokenBucketLimiter:
+    """In-memory token buckets, sharded by key hash.
+
+    Each shard is a small LRU of ``key -> (tokens, last_refill)`` so idle
+    keys are evicted a shard at a time instead of scanning one huge dict.
+    The gateway runs on a single event loop, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, Tuple[float, float]],
+        shards: int = 16,
+        max_keys_per_shard: int = 4096,
+    ):
+        # group -> (refill rate per second, burst capacity)
+        self.limits = limits
+        self.max_keys_per_shard = max_keys_per_shard
+        self._shards: List["OrderedDict[str, Tuple[float, float]]"] = [
+            OrderedDict() for _ in range(shards)
+        ]
+        self.rejected = 0
+
+    def check(self, group: str, key: str) -> Optional[float]:
+        """Take one token. Returns None if allowed, else seconds until retry."""
+        limit = self.limits.get(group)
+        if limit is None:
+            return None
+        rate, burst = limit
+
+        bucket_key = f"{group}:{key}"
+        shard = self._shards[hash(bucket_key) % len(self._shards)]
+        now = time.monotonic()
+
+        tokens, last = shard.get(bucket_key, (burst, now))
+        tokens = min(burst, tokens + (now - last) * rate)
+
+        if tokens >= 1.0:
+            shard[bucket_key] = (tokens - 1.0, now)
+            shard.move_to_end(bucket_key)
+            if len(shard) > self.max_keys_per_shard:
+                shard.popitem(last=False)
+            return None
+
+        shard[bucket_key] = (tokens, now)
+        shard.move_to_end(bucket_key)
+        self.rejected += 1
+        return (1.0 - tokens) / rate if rate > 0 else 60.0
+
+
+class Overloaded(Exception):
+    pass
+
+
+class ConcurrencyLimiter:
+    """Global cap on in-flight requests with a bounded wait queue.
+
+    Requests beyond ``max_concurrent`` wait for a slot; once ``max_queue``
+    requests are already waiting, new ones are shed immediately instead of
+    joining a queue they would only time out in.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.in_flight = 0
+        self.waiting = 0
+        self.shed = 0
+
+    async def acquire(self):
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.shed += 1
+            raise Overloaded()
+
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+
+class FailureBackoff:
+    """Exponential backoff for sources that keep failing authentication.
+
+    The first ``threshold`` failures are free; every failure after that
+    blocks the source for ``base * 2**n`` seconds, capped at ``max_delay``.
+    A source's count is forgotten after ``reset_after`` seconds without a
+    failure, or immediately on a success. Tracked sources live in a bounded
+    LRU so a flood of distinct sources can't grow it without limit.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 5,
+        base: float = 1.0,
+        max_delay: float = 300.0,
+        reset_after: float = 600.0,
+        max_sources: int = 65536,
+    ):
+        self.threshold = threshold
+        self.base = base
+        self.max_delay = max_delay
+        self.reset_after = reset_after
+        self.max_sources = max_sources
+        # source -> (consecutive failures, blocked until, last failure)
+        self._sources: "OrderedDict[str, Tuple[int, float, float]]" = OrderedDict()
+        self.blocked = 0
+
+    def check(self, source: str) -> Optional[float]:
+        """None if the source may try again, else seconds until it may."""
+        entry = self._sources.get(source)
+        if entry is None:
+            return None
+        _, blocked_until, _ = entry
+        wait = blocked_until - time.monotonic()
+        if wait <= 0:
+            return None
+        self.blocked += 1
+        return wait
+
+    def failure(self, source: str):
+        now = time.monotonic()
+        failures, _, last = self._sources.get(source, (0, 0.0, now))
+        if now - last > self.reset_after:
+            failures = 0
+        failures += 1
+
+        blocked_until = 0.0
+        if failures > self.threshold:
+            delay = min(self.max_delay, self.base * 2 ** (failures - self.threshold - 1))
+            blocked_until = now + delay
+
+        self._sources[source] = (failures, blocked_until, now)
+        self._sources.move_to_end(source)
+        if len(self._sources) > self.max_sources:
+            self._sources.popitem(last=False)
+
+    def success(self, source: str):
+        self._sources.pop(source, None)
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
@@ -0,0 +1,201 @@
+"""Replay traffic captured by the gateway (GATEWAY_CAPTURE=1) against a gateway.
+
+Requests are sent at their recorded spacing divided by ``--speed`` (or as
+fast as ``--concurrency`` allows with ``--speed 0``), in the recorded order.
+Latency percentiles and throughput are reported per route. With
+``--baseline`` the run is compared against an earlier ``--save`` and the
+exit status is non-zero if it regressed.
+
+    python replay.py gateway_capture.log* --target http://localhost:8000 \\
+        --token "$TOKEN" --speed 2 --save run.json
+    python replay.py gateway_capture.log* --baseline run.json --max-regression 0.1
+
+Only GET/HEAD requests are replayed unless ``--include-writes`` is given.
+Captured writes carry their redacted body when the gateway kept one;
+otherwise they are sent without a body.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+SAFE_METHODS = frozenset({"GET", "HEAD"})
+
+
+def load_records(paths: List[str], include_writes: bool, limit: Optional[int]) -> List[dict]:
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if include_writes or record.get("method") in SAFE_METHODS:
+                    records.append(record)
+    # Rotated files overlap in no particular order; timestamps are authoritative
+    records.sort(key=lambda r: r["ts"])
+    return records[:limit] if limit else records
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def replay(
+    records: List[dict],
+    target: str,
+    token: Optional[str],
+    speed: float,
+    concurrency: int,
+    timeout: float,
+) -> Dict[str, dict]:
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    semaphore = asyncio.Semaphore(concurrency)
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=target, timeout=timeout, limits=limits) as client:
+
+        async def send(record: dict):
+            route = record.get("route") or record["path"]
+            body = record.get("body")
+            try:
+                started = time.perf_counter()
+                resp = await client.request(
+                    record["method"],
+                    record["path"] + (f"?{record['query']}" if record.get("query") else ""),
+                    headers=headers,
+                    json=body if body is not None else None,
+                )
+                latencies[route].append(time.perf_counter() - started)
+                if resp.status_code >= 500:
+                    errors[route] += 1
+            except httpx.HTTPError:
+                errors[route] += 1
+            finally:
+                semaphore.release()
+
+        tasks = []
+        first_ts = records[0]["ts"] if records else 0.0
+        run_started = time.perf_counter()
+        for record in records:
+            if speed > 0:
+                due = (record["ts"] - first_ts) / speed
+                delay = due - (time.perf_counter() - run_started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await semaphore.acquire()
+            tasks.append(asyncio.create_task(send(record)))
+        await asyncio.gather(*tasks)
+        wall = time.perf_counter() - run_started
+
+    report = {}
+    for route in sorted(set(latencies) | set(errors)):
+        ordered = sorted(latencies[route])
+        report[route] = {
+            "count": len(ordered),
+            "errors": errors[route],
+            "p50_ms": percentile(ordered, 0.50) * 1000,
+            "p90_ms": percentile(ordered, 0.90) * 1000,
+            "p99_ms": percentile(ordered, 0.99) * 1000,
+        }
+    total = sum(r["count"] for r in report.values())
+    report["*"] = {
+        "count": total,
+        "errors": sum(r["errors"] for r in report.values()),
+        "rps": total / wall if wall > 0 else 0.0,
+        "p50_ms": percentile(sorted(v for vs in latencies.values() for v in vs), 0.50) * 1000,
+        "p99_ms": percentile(sorted(v for vs in latencies.values() for v in vs), 0.99) * 1000,
+    }
+    return report
+
+
+def print_report(report: Dict[str, dict]):
+    print(f"{'route':<40} {'count':>7} {'errors':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9}")
+    for route, r in report.items():
+        if route == "*":
+            continue
+        print(
+            f"{route:<40} {r['count']:>7} {r['errors']:>7} "
+            f"{r['p50_ms']:>9.1f} {r['p90_ms']:>9.1f} {r['p99_ms']:>9.1f}"
+        )
+    total = report["*"]
+    print(
+        f"\n{total['count']} requests, {total['errors']} errors, {total['rps']:.1f} req/s, "
+        f"p50 {total['p50_ms']:.1f} ms, p99 {total['p99_ms']:.1f} ms"
+    )
+
+
+def regressions(report: Dict[str, dict], baseline: Dict[str, dict], max_regression: float) -> List[str]:
+    found = []
+    for route, base in baseline.items():
+        current = report.get(route)
+        if not current or not base.get("count"):
+            continue
+        if base["p99_ms"] > 0 and current["p99_ms"] > base["p99_ms"] * (1 + max_regression):
+            found.append(f"{route}: p99 {base['p99_ms']:.1f} -> {current['p99_ms']:.1f} ms")
+    if "rps" in baseline.get("*", {}) and "*" in report:
+        base_rps, rps = baseline["*"]["rps"], report["*"]["rps"]
+        if rps < base_rps * (1 - max_regression):
+            found.append(f"throughput {base_rps:.1f} -> {rps:.1f} req/s")
+    return found
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replay captured gateway traffic")
+    parser.add_argument("captures", nargs="+", help="Capture files (rotated files may be listed together)")
+    parser.add_argument("--target", default="http://localhost:8000")
+    parser.add_argument("--token", help="Bearer token sent with every request")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Multiple of the recorded rate; 0 = as fast as possible")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--limit", type=int, help="Replay only the first N requests")
+    parser.add_argument("--include-writes", action="store_true")
+    parser.add_argument("--save", help="Write the report as JSON")
+    parser.add_argument("--baseline", help="Compare against a report saved with --save")
+    parser.add_argument("--max-regression", type=float, default=0.1,
+                        help="Allowed p99/throughput regression vs --baseline (fraction)")
+    args = parser.parse_args(argv)
+
+    records = load_records(args.captures, args.include_writes, args.limit)
+    if not records:
+        print("No replayable requests found", file=sys.stderr)
+        return 1
+
+    report = asyncio.run(
+        replay(records, args.target, args.token, args.speed, args.concurrency, args.timeout)
+    )
+    print_report(report)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        found = regressions(report, baseline, args.max_regression)
+        if found:
+            print("\nRegressions vs baseline:")
+            for line in found:
+                print(f"  {line}")
+            return 2
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+
+class CachedResponse:
+    __slots__ = ("status_code", "headers", "body", "etag", "expires_at")
+
+    def __init__(self, status_code: int, headers: List[Tuple[str, str]], body: bytes, ttl: float):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.expires_at = time.monotonic() + ttl
+
+    def max_age(self) -> int:
+        return max(0, int(self.expires_at - time.monotonic()))
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of upstream GET responses.
+
+    Which routes are cached, and for how long, is decided by the route
+    policy table. The cache is bounded both by entry count and by the total
+    size of cached bodies.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 32 * 1024 * 1024,
+        max_entry_bytes: int = 1024 * 1024,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+
+    @staticmethod
+    def key(path: str, query: str) -> str:
+        # Normalise parameter order so ?a=1&b=2 and ?b=2&a=1 share an entry
+        params = "&".join(sorted(query.split("&"))) if query else ""
+        return f"{path}?{params}"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: CachedResponse):
+        if len(entry.body) > self.max_entry_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = entry
+        self.size += len(entry.body)
+
+        while self._entries and (
+            len(self._entries) > self.max_entries or self.size > self.max_bytes
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def invalidate_prefix(self, prefix: str):
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            self._remove(key)
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self.size -= len(entry.body)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [t.strip() for t in if_none_match.split(",")]
+    # Weak comparison is the rule for If-None-Match (RFC 9110 13.1.2)
+    etag = etag.removeprefix("W/")
+    return any(c.removeprefix("W/") == etag for c in candidates)
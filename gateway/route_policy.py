@@ -0,0 +1,111 @@
+from dataclasses import dataclass, replace
+from typing import Dict, FrozenSet, Optional
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    """Everything the gateway needs to know about how to handle a route."""
+
+    # Pattern of the rule this policy came from (low-cardinality metrics label)
+    route: str = "/"
+    upstream: Optional[str] = None
+    # Methods that skip token verification ("*" = all methods)
+    public_methods: FrozenSet[str] = frozenset()
+    timeout: float = 30.0
+    retries: int = 0
+    cache_ttl: Optional[float] = None
+    coalesce: bool = False
+    # Hedge GETs to a second backend when the first is slow
+    hedge: bool = False
+    rate_limit: str = "default"
+
+    def is_public(self, method: str) -> bool:
+        return "*" in self.public_methods or method in self.public_methods
+
+
+class _Node:
+    __slots__ = ("children", "wildcard", "prefix_policy", "exact_policy")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.wildcard: Optional["_Node"] = None
+        # Applies to this path and everything below it
+        self.prefix_policy: Optional[RoutePolicy] = None
+        # Applies to this exact path only
+        self.exact_policy: Optional[RoutePolicy] = None
+
+
+def _segments(path: str):
+    return path.strip("/").split("/") if path.strip("/") else []
+
+
+class RoutePolicyTable:
+    """Route policies compiled into a path-segment trie.
+
+    Rules map a path pattern to policy overrides:
+
+      - ``/venues`` applies to ``/venues`` and every path below it
+      - ``{name}`` segments match any single segment
+      - a trailing ``$`` restricts the rule to that exact path
+
+    Literal segments take precedence over ``{name}`` segments (there is no
+    backtracking).
+
+    Each rule inherits every field it does not set from the closest
+    enclosing prefix rule, so resolving a request path is a single walk
+    down the trie with no merging at request time.
+    """
+
+    def __init__(self, rules: Dict[str, dict], default: RoutePolicy = RoutePolicy()):
+        self.root = _Node()
+        self.root.prefix_policy = default
+
+        # Shorter patterns first, so parents are compiled before children
+        for pattern in sorted(rules, key=lambda p: (len(_segments(p.rstrip("$"))), p.endswith("$"))):
+            self._insert(pattern, rules[pattern])
+
+    def _insert(self, pattern: str, overrides: dict):
+        exact = pattern.endswith("$")
+        raw = pattern.rstrip("$")
+        # "/venues/" is the list endpoint, distinct from "/venues"
+        segments = _segments(raw) + ([""] if raw.endswith("/") and raw != "/" else [])
+
+        node = self.root
+        inherited = self.root.prefix_policy
+        for segment in segments:
+            if segment.startswith("{") and segment.endswith("}"):
+                if node.wildcard is None:
+                    node.wildcard = _Node()
+                node = node.wildcard
+            else:
+                node = node.children.setdefault(segment, _Node())
+            if node.prefix_policy is not None:
+                inherited = node.prefix_policy
+
+        if "public_methods" in overrides:
+            overrides = dict(overrides, public_methods=frozenset(overrides["public_methods"]))
+        policy = replace(inherited, route=pattern, **overrides)
+
+        if exact:
+            node.exact_policy = policy
+        else:
+            node.prefix_policy = policy
+
+    def resolve(self, path: str) -> RoutePolicy:
+        segments = _segments(path)
+        if path.endswith("/") and path != "/":
+            segments.append("")
+
+        node = self.root
+        policy = self.root.prefix_policy
+        for segment in segments:
+            child = node.children.get(segment)
+            if child is None:
+                child = node.wildcard
+            if child is None:
+                return policy
+            node = child
+            if node.prefix_policy is not None:
+                policy = node.prefix_policy
+
+        return node.exact_policy or policy
@@ -0,0 +1,117 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.responses import JSONResponse
+
+import main
+from rate_limit import ConcurrencyLimiter, Overloaded, TokenBucketLimiter, retry_after_header
+
+
+# ------------------------------------------------------------------
+# Token buckets
+# ------------------------------------------------------------------
+def test_burst_then_refill(clock):
+    limiter = TokenBucketLimiter({"auth": (1.0, 3.0)})
+    assert [limiter.check("auth", "ip:1") for _ in range(3)] == [None, None, None]
+    assert limiter.check("auth", "ip:1") == pytest.approx(1.0)
+    assert limiter.rejected == 1
+
+    clock.now += 0.5
+    assert limiter.check("auth", "ip:1") == pytest.approx(0.5)
+    clock.now += 0.5
+    assert limiter.check("auth", "ip:1") is None
+
+
+def test_buckets_are_per_key_and_group(clock):
+    limiter = TokenBucketLimiter({"auth": (1.0, 1.0), "default": (1.0, 1.0)})
+    assert limiter.check("auth", "ip:1") is None
+    assert limiter.check("auth", "ip:1") is not None
+    assert limiter.check("auth", "ip:2") is None
+    assert limiter.check("default", "ip:1") is None
+
+
+def test_unknown_group_is_unlimited(clock):
+    limiter = TokenBucketLimiter({})
+    assert all(limiter.check("auth", "ip:1") is None for _ in range(100))
+
+
+def test_idle_keys_are_evicted_per_shard(clock):
+    limiter = TokenBucketLimiter({"auth": (1.0, 1.0)}, shards=1, max_keys_per_shard=2)
+    limiter.check("auth", "ip:1")
+    limiter.check("auth", "ip:2")
+    limiter.check("auth", "ip:3")
+    # ip:1 was evicted, so it starts again with a full bucket
+    assert limiter.check("auth", "ip:1") is None
+    assert limiter.check("auth", "ip:3") is not None
+
+
+def test_retry_after_header_rounds_up():
+    assert retry_after_header(0.01) == "1"
+    assert retry_after_header(1.2) == "2"
+
+
+# ------------------------------------------------------------------
+# Concurrency cap and shedding
+# ------------------------------------------------------------------
+def test_requests_queue_then_shed():
+    async def scenario():
+        limiter = ConcurrencyLimiter(max_concurrent=2, max_queue=1)
+        await limiter.acquire()
+        await limiter.acquire()
+
+        queued = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert (limiter.in_flight, limiter.waiting) == (2, 1)
+
+        with pytest.raises(Overloaded):
+            await limiter.acquire()
+        assert limiter.shed == 1
+
+        limiter.release()
+        await queued
+        assert (limiter.in_flight, limiter.waiting) == (2, 0)
+
+    asyncio.run(scenario())
+
+
+# ------------------------------------------------------------------
+# Through the gateway
+# ------------------------------------------------------------------
+@pytest.fixture
+def gateway(monkeypatch):
+    async def upstream(request, path_override=None):
+        await asyncio.sleep(0.05)
+        return JSONResponse([])
+
+    monkeypatch.setattr(main, "proxy_request", upstream)
+
+    def get_many(count, path="/venues/"):
+        async def send():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+                return await asyncio.gather(*(client.get(path) for _ in range(count)))
+        return asyncio.run(send())
+
+    return get_many
+
+
+def test_rate_limited_requests_get_429_with_retry_after(gateway, monkeypatch):
+    monkeypatch.setattr(main, "rate_limiter", TokenBucketLimiter({"default": (0.5, 2.0)}))
+    responses = gateway(3)
+    assert [r.status_code for r in responses].count(429) == 1
+    limited = next(r for r in responses if r.status_code == 429)
+    assert limited.headers["Retry-After"] == "2"
+
+
+def test_overload_is_shed_with_503(gateway, monkeypatch):
+    monkeypatch.setattr(main, "rate_limiter", TokenBucketLimiter({}))
+    monkeypatch.setattr(main, "concurrency_limiter", ConcurrencyLimiter(max_concurrent=1, max_queue=1))
+    statuses = sorted(r.status_code for r in gateway(4))
+    assert statuses == [200, 200, 503, 503]
+    assert main.concurrency_limiter.shed == 2
+
+
+def test_health_endpoints_bypass_admission(gateway, monkeypatch):
+    monkeypatch.setattr(main, "rate_limiter", TokenBucketLimiter({"default": (0.001, 1.0)}))
+    assert all(r.status_code == 200 for r in gateway(5, "/health"))
@@ -0,0 +1,110 @@
+from fastapi import HTTPException
+
+from rate_limit import FailureBackoff
+
+IP = "203.0.113.7"
+
+
+def status(result):
+    return result.status_code if isinstance(result, HTTPException) else 200
+
+
+def test_rejected_token_is_answered_from_the_negative_cache(auth):
+    bad = auth.token(forged=True)
+    assert status(auth.verify(bad)) == 401
+    assert status(auth.verify(bad)) == 401
+    assert auth.verifier.calls == 1
+
+    # Forgotten after the negative TTL, then verified again
+    auth.clock.now += 31
+    assert status(auth.verify(bad)) == 401
+    assert auth.verifier.calls == 2
+
+
+def test_replaying_a_rejected_token_backs_off(auth):
+    bad = auth.token(forged=True)
+    # Threshold 3: the verification and two replays are free, the third
+    # replay starts a 1s block
+    assert [status(auth.verify(bad, IP)) for _ in range(4)] == [401, 401, 401, 401]
+
+    blocked = auth.verify(bad, IP)
+    assert blocked.status_code == 429
+    assert blocked.headers["Retry-After"] == "1"
+
+    auth.clock.now += 1
+    assert status(auth.verify(bad, IP)) == 401
+    # That failure doubled the block
+    auth.clock.now += 1
+    assert status(auth.verify(bad, IP)) == 429
+
+
+def test_backoff_only_blocks_replays(auth):
+    bad = auth.token(forged=True)
+    for _ in range(5):
+        auth.verify(bad, IP)
+    assert status(auth.verify(bad, IP)) == 429
+
+    # Same address, different client with a valid token
+    good = auth.token(sub="user-2")
+    assert auth.verify(good, IP)["user_id"] == "user-2"
+    # ...which clears the address
+    assert status(auth.verify(bad, IP)) == 401
+
+
+def test_backoff_is_per_source(auth):
+    bad = auth.token(forged=True)
+    for _ in range(5):
+        auth.verify(bad, IP)
+    assert status(auth.verify(bad, IP)) == 429
+    assert status(auth.verify(bad, "198.51.100.1")) == 401
+
+
+def test_unavailable_verifier_is_not_held_against_the_token(auth, monkeypatch):
+    import main
+    from token_verifier import KeysUnavailable
+
+    def down(token):
+        raise KeysUnavailable("no keys")
+
+    monkeypatch.setattr(auth.verifier, "verify", down)
+    token = auth.token()
+    assert status(auth.verify(token, IP)) == 503
+    assert main.rejected_token_cache.get(token) is None
+    assert len(main.auth_backoff) == 0
+
+
+def test_failure_backoff_schedule(clock):
+    backoff = FailureBackoff(threshold=2, base=1.0, max_delay=4.0, reset_after=60.0)
+    delays = []
+    for _ in range(6):
+        backoff.failure("ip")
+        delays.append(backoff.check("ip"))
+    assert delays == [None, None, 1.0, 2.0, 4.0, 4.0]
+    assert backoff.blocked == 4
+
+
+def test_failure_backoff_resets(clock):
+    backoff = FailureBackoff(threshold=1, base=1.0, max_delay=60.0, reset_after=60.0)
+    backoff.failure("ip")
+    backoff.failure("ip")
+    assert backoff.check("ip") == 1.0
+
+    backoff.success("ip")
+    assert backoff.check("ip") is None
+    assert len(backoff) == 0
+
+    backoff.failure("ip")
+    backoff.failure("ip")
+    clock.now += 61
+    # A quiet spell forgets earlier failures
+    backoff.failure("ip")
+    assert backoff.check("ip") is None
+
+
+def test_failure_backoff_tracks_a_bounded_number_of_sources(clock):
+    backoff = FailureBackoff(threshold=0, max_sources=3)
+    for i in range(10):
+        backoff.failure(f"ip-{i}")
+    assert len(backoff) == 3
+    assert backoff.check("ip-0") is None
+    assert backoff.check("ip-9") is not None
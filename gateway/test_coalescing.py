@@ -0,0 +1,156 @@
+import asyncio
+import gc
+
+import pytest
+
+from coalescing import SingleFlight
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "body"
+
+        results = await asyncio.gather(*(flight.do("k", fetch) for _ in range(5)))
+        return flight, calls, results
+
+    flight, calls, results = run(scenario())
+    assert calls == 1
+    assert results == ["body"] * 5
+    assert flight.stats() == {"leaders": 1, "collapsed": 4, "in_flight": 0}
+
+
+def test_error_reaches_every_waiter_and_is_not_cached():
+    async def scenario():
+        flight = SingleFlight()
+        attempts = 0
+
+        async def failing():
+            nonlocal attempts
+            attempts += 1
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        results = await asyncio.gather(
+            *(flight.do("k", failing) for _ in range(3)), return_exceptions=True
+        )
+        assert flight.in_flight == 0
+
+        # The next call runs again instead of replaying the old failure
+        with pytest.raises(RuntimeError):
+            await flight.do("k", failing)
+        return results, attempts
+
+    results, attempts = run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert attempts == 2
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fetch():
+            await release.wait()
+            return "body"
+
+        first = asyncio.ensure_future(flight.do("k", fetch))
+        second = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return first, await second, flight
+
+    first, second_result, flight = run(scenario())
+    assert first.cancelled()
+    assert second_result == "body"
+    assert flight.in_flight == 0
+
+
+def test_error_with_no_waiters_left_is_retrieved():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        waiter = asyncio.ensure_future(flight.do("k", failing))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0.05)
+        # An unretrieved exception is reported when its task is collected
+        gc.collect()
+        return flight
+
+    errors = []
+    loop = asyncio.new_event_loop()
+    loop.set_exception_handler(lambda _, context: errors.append(context))
+    try:
+        flight = loop.run_until_complete(scenario())
+    finally:
+        loop.close()
+    assert flight.in_flight == 0
+    assert errors == []
+
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def fetch(value):
+            await asyncio.sleep(0.01)
+            return value
+
+        return await asyncio.gather(
+            flight.do("a", lambda: fetch("a")),
+            flight.do("b", lambda: fetch("b")),
+        ), flight
+
+    results, flight = run(scenario())
+    assert results == ["a", "b"]
+    assert flight.leaders == 2
+    assert flight.collapsed == 0
+
+
+def test_coalesced_responses_keep_repeated_headers(monkeypatch):
+    import httpx
+
+    import main
+
+    async def upstream(service, request, path, *args, **kwargs):
+        return main.UpstreamResult(200, [
+            ("content-type", "application/json"),
+            ("set-cookie", "a=1; Path=/"),
+            ("set-cookie", "b=2; Path=/"),
+            ("vary", "Origin"),
+            ("vary", "Cookie"),
+        ], b"[]")
+
+    monkeypatch.setattr(main, "fetch_coalesced", upstream)
+    monkeypatch.setattr(main, "COALESCE_ENABLED", True)
+
+    async def get():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            # Coalesced but not cached (see ROUTE_POLICIES)
+            return await client.get("/venues/7/timeslots/3", headers={"accept-encoding": "identity"})
+
+    res = run(get())
+    assert res.status_code == 200
+    assert res.headers.get_list("set-cookie") == ["a=1; Path=/", "b=2; Path=/"]
+    assert res.headers.get_list("vary") == ["Origin", "Cookie"]
+    assert res.headers["content-length"] == "2"
@@ -0,0 +1,60 @@
+import hedging
+from hedging import RetryBudget
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def budget(monkeypatch, **kwargs):
+    clock = FakeClock()
+    monkeypatch.setattr(hedging.time, "monotonic", clock)
+    return RetryBudget(**kwargs), clock
+
+
+def test_starts_full_and_exhausts(monkeypatch):
+    retries, _ = budget(monkeypatch, ratio=0.1, min_per_second=0.0, max_tokens=3.0)
+    assert [retries.withdraw() for _ in range(4)] == [True, True, True, False]
+    assert retries.exhausted == 1
+    assert not retries.withdraw()
+    assert retries.exhausted == 2
+
+
+def test_deposits_buy_retries_at_the_configured_ratio(monkeypatch):
+    retries, _ = budget(monkeypatch, ratio=0.25, min_per_second=0.0, max_tokens=3.0)
+    while retries.withdraw():
+        pass
+
+    for _ in range(3):
+        retries.deposit()
+    assert not retries.withdraw()
+    retries.deposit()
+    assert retries.withdraw()
+    assert not retries.withdraw()
+
+
+def test_tokens_are_capped(monkeypatch):
+    retries, _ = budget(monkeypatch, ratio=1.0, min_per_second=0.0, max_tokens=2.0)
+    for _ in range(10):
+        retries.deposit()
+    assert retries.tokens == 2.0
+    assert [retries.withdraw() for _ in range(3)] == [True, True, False]
+
+
+def test_idle_time_refills_the_minimum_allowance(monkeypatch):
+    retries, clock = budget(monkeypatch, ratio=0.1, min_per_second=1.0, max_tokens=3.0)
+    while retries.withdraw():
+        pass
+
+    clock.now += 0.5
+    assert not retries.withdraw()
+    clock.now += 0.5
+    assert retries.withdraw()
+
+    # A long quiet spell refills no more than max_tokens
+    clock.now += 3600
+    assert [retries.withdraw() for _ in range(4)] == [True, True, True, False]
@@ -0,0 +1,41 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+
+
+def scrape(client_host="127.0.0.1", **headers):
+    async def send():
+        transport = httpx.ASGITransport(app=main.app, client=(client_host, 40000))
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            return await client.get("/metrics", headers=headers)
+    return asyncio.run(send())
+
+
+def test_loopback_may_scrape_without_a_token(monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", None)
+    res = scrape("127.0.0.1")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert scrape("::1").status_code == 200
+
+
+def test_remote_clients_are_refused_without_a_token(monkeypatch):
+    monkeypatch.setattr(main, "METRICS_TOKEN", None)
+    assert scrape("10.0.0.5").status_code == 403
+    assert scrape("10.0.0.5", authorization="Bearer anything").status_code == 403
+
+
+@pytest.mark.parametrize("client_host, headers, allowed", [
+    ("10.0.0.5", {"authorization": "Bearer scrape-secret"}, True),
+    ("10.0.0.5", {"authorization": "Bearer wrong"}, False),
+    ("10.0.0.5", {}, False),
+    # With a token set, loopback needs it too
+    ("127.0.0.1", {}, False),
+])
+def test_scrape_token(monkeypatch, client_host, headers, allowed):
+    monkeypatch.setattr(main, "METRICS_TOKEN", "scrape-secret")
+    res = scrape(client_host, **headers)
+    assert (res.status_code == 200) is allowed
@@ -0,0 +1,58 @@
+import httpx
+
+from main import buffered_headers, buffered_response
+
+
+def upstream_response(headers):
+    return httpx.Response(200, headers=headers)
+
+
+def test_end_to_end_headers_are_kept():
+    resp = upstream_response([
+        ("Content-Type", "application/json"),
+        ("Content-Range", "bytes 0-1/2"),
+        ("Accept-Ranges", "bytes"),
+        ("ETag", '"abc"'),
+        ("Cache-Control", "private, no-cache"),
+        ("X-Next-Cursor", "xyz"),
+        ("Set-Cookie", "a=1"),
+        ("Set-Cookie", "b=2"),
+    ])
+    assert [(k.lower(), v) for k, v in buffered_headers(resp)] == [
+        ("content-type", "application/json"),
+        ("content-range", "bytes 0-1/2"),
+        ("accept-ranges", "bytes"),
+        ("etag", '"abc"'),
+        ("cache-control", "private, no-cache"),
+        ("x-next-cursor", "xyz"),
+        ("set-cookie", "a=1"),
+        ("set-cookie", "b=2"),
+    ]
+
+
+def test_framing_and_hop_by_hop_headers_are_dropped():
+    resp = upstream_response([
+        ("Content-Encoding", "gzip"),
+        ("Transfer-Encoding", "chunked"),
+        ("Connection", "keep-alive"),
+        ("Keep-Alive", "timeout=5"),
+        ("Date", "Mon, 01 Jan 2026 00:00:00 GMT"),
+        ("Server", "uvicorn"),
+        ("X-Kept", "1"),
+    ])
+    assert [k.lower() for k, _ in buffered_headers(resp)] == ["x-kept"]
+
+
+def test_replay_sets_length_and_applies_overrides():
+    response = buffered_response(
+        200,
+        [("vary", "Origin"), ("vary", "Cookie"), ("etag", '"upstream"')],
+        b"hello",
+        override={"ETag": '"gateway"'},
+    )
+    assert response.raw_headers == [
+        (b"content-length", b"5"),
+        (b"vary", b"Origin"),
+        (b"vary", b"Cookie"),
+        (b"etag", b'"gateway"'),
+    ]
@@ -0,0 +1,67 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import main
+from response_cache import etag_matches
+
+BODY = json.dumps([{"id": i, "name": "venue " * 10} for i in range(50)]).encode()
+
+
+@pytest.mark.parametrize("if_none_match, etag, matches", [
+    (None, '"a"', False),
+    ('"a"', '"a"', True),
+    ('W/"a"', '"a"', True),
+    ('"a"', 'W/"a"', True),
+    ('W/"a"', 'W/"a"', True),
+    ('"b", W/"a"', '"a"', True),
+    ('"b"', '"a"', False),
+    ("*", '"a"', True),
+])
+def test_etag_matches_compares_weakly(if_none_match, etag, matches):
+    assert etag_matches(if_none_match, etag) is matches
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    async def upstream(service, request, path, *args, **kwargs):
+        return main.UpstreamResult(200, [("content-type", "application/json")], BODY)
+
+    monkeypatch.setattr(main, "fetch_coalesced", upstream)
+    monkeypatch.setattr(main, "fetch_buffered", upstream)
+    main.response_cache.invalidate_prefix("/venues")
+
+    def get(path, **headers):
+        async def send():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+                return await client.get(path, headers=headers)
+        return asyncio.run(send())
+
+    return get
+
+
+@pytest.mark.skipif(not main.COMPRESSION_ENABLED, reason="compression disabled")
+def test_304_carries_the_etag_of_the_compressed_representation(gateway):
+    first = gateway("/venues/", **{"accept-encoding": "gzip"})
+    assert first.headers["content-encoding"] == "gzip"
+    etag = first.headers["etag"]
+    assert etag.startswith("W/")
+
+    again = gateway("/venues/", **{"accept-encoding": "gzip", "if-none-match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+    assert again.headers["vary"] == "Accept-Encoding"
+
+
+def test_304_for_identity_keeps_the_strong_etag(gateway):
+    first = gateway("/venues/", **{"accept-encoding": "identity"})
+    etag = first.headers["etag"]
+    assert not etag.startswith("W/")
+
+    # A weak validator from a compressed response still matches
+    again = gateway("/venues/", **{"accept-encoding": "identity", "if-none-match": f"W/{etag}"})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
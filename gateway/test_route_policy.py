@@ -0,0 +1,72 @@
+from route_policy import RoutePolicy, RoutePolicyTable
+
+RULES = {
+    "/users": {"upstream": "user"},
+    "/users/media": {"public_methods": {"GET", "HEAD"}},
+    "/venues": {"upstream": "venue", "public_methods": {"GET"}, "timeout": 5.0},
+    "/venues/$": {"cache_ttl": 30.0},
+    "/venues/{venue_id}$": {"cache_ttl": 60.0},
+    "/venues/{venue_id}/timeslots$": {"cache_ttl": 10.0},
+    "/venues/stats": {"hedge": True},
+    "/auth/logout$": {"public_methods": "*"},
+}
+
+
+def table():
+    return RoutePolicyTable(RULES, default=RoutePolicy(upstream="default", timeout=30.0))
+
+
+def test_longest_prefix_wins():
+    policies = table()
+    assert policies.resolve("/users/42").route == "/users"
+    assert policies.resolve("/users/media/photos/abc.jpg").route == "/users/media"
+    assert policies.resolve("/users/media").route == "/users/media"
+
+
+def test_unmatched_path_gets_default():
+    policy = table().resolve("/nowhere/at/all")
+    assert policy.route == "/"
+    assert policy.upstream == "default"
+
+
+def test_children_inherit_unset_fields_from_enclosing_prefix():
+    policy = table().resolve("/users/media/photos/abc.jpg")
+    assert policy.upstream == "user"
+    assert policy.is_public("HEAD")
+    assert not policy.is_public("POST")
+
+    detail = table().resolve("/venues/7")
+    assert detail.upstream == "venue"
+    assert detail.timeout == 5.0
+    assert detail.cache_ttl == 60.0
+
+
+def test_exact_rules_only_match_their_own_path():
+    policies = table()
+    assert policies.resolve("/venues/7/timeslots").cache_ttl == 10.0
+    below = policies.resolve("/venues/7/timeslots/3")
+    assert below.route == "/venues"
+    assert below.cache_ttl is None
+
+    assert policies.resolve("/auth/logout").is_public("POST")
+    assert not policies.resolve("/auth/logout-all").is_public("POST")
+
+
+def test_trailing_slash_is_distinct_from_bare_prefix():
+    policies = table()
+    assert policies.resolve("/venues/").cache_ttl == 30.0
+    assert policies.resolve("/venues").cache_ttl is None
+
+
+def test_literal_segment_takes_precedence_over_wildcard():
+    policies = table()
+    assert policies.resolve("/venues/stats").route == "/venues/stats"
+    assert policies.resolve("/venues/stats").hedge
+    assert policies.resolve("/venues/8").route == "/venues/{venue_id}$"
+
+
+def test_rule_order_does_not_matter():
+    reversed_rules = dict(reversed(list(RULES.items())))
+    policies = RoutePolicyTable(reversed_rules)
+    assert policies.resolve("/users/media/x").upstream == "user"
+    assert policies.resolve("/venues/7").timeout == 5.0
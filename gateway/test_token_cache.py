@@ -0,0 +1,81 @@
+from fastapi import HTTPException
+
+from token_cache import TokenCache
+
+
+def test_valid_token_is_verified_once_then_served_from_cache(auth):
+    token = auth.token(sid="session-1")
+    first = auth.verify(token)
+    assert first["user_id"] == "user-1"
+    assert (first["jti"], first["sid"]) == ("user-1-token", "session-1")
+
+    assert auth.verify(token) == first
+    assert auth.verifier.calls == 1
+
+
+def test_cached_claims_end_at_the_token_exp(auth):
+    token = auth.token(lifetime=60)
+    auth.verify(token)
+
+    auth.clock.now += 59
+    assert auth.verify(token)["user_id"] == "user-1"
+    assert auth.verifier.calls == 1
+
+    # Past exp the cache no longer vouches for it, even inside its TTL
+    auth.clock.now += 2
+    rejected = auth.verify(token)
+    assert isinstance(rejected, HTTPException)
+    assert (rejected.status_code, rejected.detail) == (401, "Token expired")
+    assert auth.verifier.calls == 2
+
+
+def test_long_lived_tokens_are_reverified_after_the_ttl(auth):
+    token = auth.token(lifetime=3600)
+    auth.verify(token)
+    auth.clock.now += 301
+    assert auth.verify(token)["user_id"] == "user-1"
+    assert auth.verifier.calls == 2
+
+
+def test_revoked_token_is_not_served_from_cache(auth):
+    token = auth.token()
+    auth.verify(token)
+    auth.verifier.revoked.add("user-1-token")
+    rejected = auth.verify(token)
+    assert isinstance(rejected, HTTPException)
+    assert rejected.status_code == 401
+
+
+def test_cache_keys_are_digests_not_tokens(clock):
+    cache = TokenCache(maxsize=10, ttl=60)
+    cache.put("raw.token.value", {"sub": "u"})
+    assert "raw.token.value" not in repr(cache._entries)
+    assert cache.get("raw.token.value") == {"sub": "u"}
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TokenCache(maxsize=2, ttl=60)
+    cache.put("a", {"sub": "a"})
+    cache.put("b", {"sub": "b"})
+    cache.get("a")
+    cache.put("c", {"sub": "c"})
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == {"sub": "a"}
+
+
+def test_ttl_and_exp_bound_entries(clock):
+    cache = TokenCache(maxsize=10, ttl=60)
+    cache.put("short", {"sub": "s"}, exp=clock.now + 10)
+    cache.put("long", {"sub": "l"}, exp=clock.now + 3600)
+    clock.now += 11
+    assert cache.get("short") is None
+    assert cache.get("long") == {"sub": "l"}
+    clock.now += 50
+    assert cache.get("long") is None
+
+
+def test_disabled_cache_stores_nothing(clock):
+    cache = TokenCache(maxsize=0, ttl=60)
+    cache.put("a", {"sub": "a"})
+    assert cache.get("a") is None
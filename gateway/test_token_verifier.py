@@ -0,0 +1,147 @@
+import io
+import json
+import logging
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+import token_verifier
+from token_verifier import JWKSVerifier, KeysUnavailable, TokenExpired, TokenInvalid
+
+OLD_SECRET = "dev-secret-key-change-in-production"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeJWKS:
+    """Stands in for user_service's /.well-known/jwks.json."""
+
+    def __init__(self):
+        self.keys = {}
+        self.fetches = 0
+        self.down = False
+
+    def add_key(self, kid):
+        self.keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def token(self, kid, **claims):
+        claims.setdefault("sub", "user-1")
+        claims.setdefault("exp", int(time.time()) + 900)
+        return jwt.encode(claims, self.keys[kid], algorithm="RS256", headers={"kid": kid})
+
+    def urlopen(self, url, timeout=None):
+        self.fetches += 1
+        if self.down:
+            raise OSError("connection refused")
+        jwks = {"keys": []}
+        for kid, key in self.keys.items():
+            jwk = jwt.algorithms.RSAAlgorithm.to_jwk(key.public_key(), as_dict=True)
+            jwk.update({"kid": kid, "alg": "RS256"})
+            jwks["keys"].append(jwk)
+        return io.BytesIO(json.dumps(jwks).encode())
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(token_verifier.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def jwks(monkeypatch):
+    jwks = FakeJWKS()
+    jwks.add_key("k1")
+    monkeypatch.setattr(token_verifier.urllib.request, "urlopen", jwks.urlopen)
+    return jwks
+
+
+def verifier(**kwargs):
+    return JWKSVerifier("http://user/.well-known/jwks.json", ttl=300.0, min_refresh_interval=30.0, **kwargs)
+
+
+def test_keys_are_fetched_lazily_and_cached(clock, jwks):
+    tokens = verifier()
+    assert jwks.fetches == 0
+    assert tokens.verify(jwks.token("k1"))["sub"] == "user-1"
+    assert tokens.verify(jwks.token("k1", sub="user-2"))["sub"] == "user-2"
+    assert jwks.fetches == 1
+
+
+def test_rotated_key_is_picked_up_on_first_use(clock, jwks):
+    tokens = verifier()
+    tokens.verify(jwks.token("k1"))
+    clock.now += 60
+
+    jwks.add_key("k2")
+    assert tokens.verify(jwks.token("k2"))["sub"] == "user-1"
+    assert jwks.fetches == 2
+    # The previous key stays usable while it is still published
+    tokens.verify(jwks.token("k1"))
+    assert jwks.fetches == 2
+
+
+def test_unknown_kids_refresh_at_most_once_per_interval(clock, jwks):
+    tokens = verifier()
+    tokens.verify(jwks.token("k1"))
+    clock.now += 60
+
+    forged = jwt.encode({"sub": "x"}, OLD_SECRET, algorithm="HS256", headers={"kid": "made-up"})
+    for _ in range(5):
+        with pytest.raises(TokenInvalid):
+            tokens.verify(forged)
+    assert jwks.fetches == 2
+
+    clock.now += 30
+    with pytest.raises(TokenInvalid):
+        tokens.verify(forged)
+    assert jwks.fetches == 3
+
+
+def test_key_set_is_refetched_after_ttl(clock, jwks):
+    tokens = verifier()
+    tokens.verify(jwks.token("k1"))
+    clock.now += 301
+    tokens.verify(jwks.token("k1"))
+    assert jwks.fetches == 2
+
+
+def test_cached_keys_survive_a_failed_refresh(clock, jwks):
+    tokens = verifier()
+    tokens.verify(jwks.token("k1"))
+    jwks.down = True
+    clock.now += 301
+    assert tokens.verify(jwks.token("k1"))["sub"] == "user-1"
+    assert tokens.refresh_failures == 1
+
+
+def test_no_keys_at_all_is_unavailable_not_invalid(clock, jwks):
+    jwks.down = True
+    with pytest.raises(KeysUnavailable):
+        verifier().verify(jwks.token("k1"))
+
+
+def test_expired_token(clock, jwks):
+    with pytest.raises(TokenExpired):
+        verifier().verify(jwks.token("k1", exp=int(time.time()) - 60))
+
+
+def test_legacy_tokens_need_the_secret_and_are_logged(clock, jwks, caplog):
+    legacy = jwt.encode({"sub": "old-user", "exp": int(time.time()) + 60}, OLD_SECRET, algorithm="HS256")
+    with pytest.raises(TokenInvalid):
+        verifier().verify(legacy)
+    with pytest.raises(TokenInvalid):
+        verifier(legacy_secret="guessed-" * 4).verify(legacy)
+
+    with caplog.at_level(logging.WARNING, logger="token_verifier"):
+        assert verifier(legacy_secret=OLD_SECRET).verify(legacy)["sub"] == "old-user"
+    assert "legacy" in caplog.text
+    assert jwks.fetches == 0
@@ -0,0 +1,143 @@
+import asyncio
+
+import httpx
+import pytest
+
+from upstreams import UpstreamPool, probe_pool
+
+URLS = ["http://a:8000", "http://b:8000", "http://c:8000"]
+
+
+def pool(**kwargs):
+    options = dict(max_failures=3, eject_seconds=10.0, max_eject=40.0, slow_start=30.0)
+    options.update(kwargs)
+    return UpstreamPool("svc", URLS, **options)
+
+
+def backend(upstream, url):
+    return next(b for b in upstream.backends if b.url == url)
+
+
+def fail(upstream, b, times):
+    for _ in range(times):
+        upstream.acquire(b)
+        upstream.release(b, ok=False)
+
+
+def test_requires_backends():
+    with pytest.raises(ValueError):
+        UpstreamPool("svc", [])
+
+
+def test_least_outstanding_spreads_load(clock):
+    upstream = pool()
+    picks = []
+    for _ in range(6):
+        b = upstream.choose()
+        upstream.acquire(b)
+        picks.append(b.url)
+    assert sorted(picks) == sorted(URLS * 2)
+
+
+def test_consecutive_failures_eject_a_backend(clock):
+    upstream = pool()
+    a = backend(upstream, "http://a:8000")
+    fail(upstream, a, 2)
+    upstream.acquire(a)
+    upstream.release(a, ok=True)
+    fail(upstream, a, 2)
+    assert not a.is_ejected(clock.now)  # the success reset the count
+
+    fail(upstream, a, 1)
+    assert a.is_ejected(clock.now)
+    assert all(upstream.choose() is not a for _ in range(20))
+
+
+def test_cancelled_requests_say_nothing_about_health(clock):
+    upstream = pool()
+    a = backend(upstream, "http://a:8000")
+    for _ in range(10):
+        upstream.acquire(a)
+        upstream.release(a, ok=None)
+    assert a.consecutive_failures == 0
+    assert a.outstanding == 0
+
+
+def test_ejection_time_doubles_up_to_the_cap(clock):
+    upstream = pool()
+    a = backend(upstream, "http://a:8000")
+    durations = []
+    for _ in range(4):
+        upstream.eject(a)
+        durations.append(a.ejected_until - clock.now)
+        clock.now = a.ejected_until
+    assert durations == [10.0, 20.0, 40.0, 40.0]
+
+
+def test_all_ejected_fails_open(clock):
+    upstream = pool()
+    for b in upstream.backends:
+        upstream.eject(b)
+    assert upstream.choose() in upstream.backends
+
+
+def test_readmitted_backend_ramps_up(clock):
+    upstream = pool()
+    a = backend(upstream, "http://a:8000")
+    upstream.eject(a)
+    clock.now += 5
+    upstream.readmit(a)
+    assert not a.is_ejected(clock.now)
+
+    assert a.weight(clock.now, 30.0) == pytest.approx(0.1)
+    clock.now += 15
+    assert a.weight(clock.now, 30.0) == pytest.approx(0.5)
+    # At half weight it looks twice as busy as an idle peer
+    assert a.score(clock.now, 30.0) == pytest.approx(2.0)
+    clock.now += 15
+    assert a.weight(clock.now, 30.0) == 1.0
+
+
+def test_slow_start_limits_share_of_new_requests(clock):
+    upstream = pool()
+    a = backend(upstream, "http://a:8000")
+    upstream.eject(a)
+    upstream.readmit(a)
+    clock.now += 3  # weight 0.1
+
+    counts = {url: 0 for url in URLS}
+    for _ in range(60):
+        b = upstream.choose()
+        upstream.acquire(b)
+        counts[b.url] += 1
+    assert counts["http://a:8000"] < counts["http://b:8000"] / 3
+
+
+def probe(upstream, healthy_urls):
+    def handler(request):
+        url = f"{request.url.scheme}://{request.url.host}:{request.url.port}"
+        return httpx.Response(200 if url in healthy_urls else 503)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            await probe_pool(upstream, client, timeout=1.0)
+
+    asyncio.run(run())
+
+
+def test_health_checks_eject_and_readmit(clock):
+    upstream = pool()
+    a = backend(upstream, "http://a:8000")
+    for _ in range(3):
+        probe(upstream, URLS[1:])
+    assert a.is_ejected(clock.now)
+
+    probe(upstream, URLS)
+    assert not a.is_ejected(clock.now)
+    assert a.readmitted_at == clock.now
+    assert a.ejections == 1
+
+    # Once fully ramped up, earlier ejections no longer lengthen the next one
+    clock.now += 31
+    probe(upstream, URLS)
+    assert a.ejections == 0
@@ -0,0 +1,43 @@
+from ws_proxy import ConnectionStats, WebSocketRegistry, to_ws_url
+
+
+def open_connection(registry, user_id, session="s1"):
+    stats = ConnectionStats(f"/chat/ws/{session}/{user_id}", user_id, "http://chat:8001")
+    registry.open(stats)
+    return stats
+
+
+def test_summary_has_counts_only():
+    registry = WebSocketRegistry()
+    alice = open_connection(registry, "alice")
+    open_connection(registry, "bob")
+    alice.record_in("hello")
+    alice.record_out(b"\x00\x01")
+    registry.close(alice)
+
+    summary = registry.as_dict()
+    assert summary == {"active": 1, "total_connections": 2, "total_frames": 2, "total_bytes": 7}
+    assert "alice" not in str(summary) and "bob" not in str(summary)
+
+
+def test_connections_are_filtered_to_the_caller():
+    registry = WebSocketRegistry()
+    open_connection(registry, "alice", "s1")
+    open_connection(registry, "alice", "s2")
+    open_connection(registry, "bob", "s1")
+
+    mine = registry.connections("alice")
+    assert sorted(c["path"] for c in mine) == ["/chat/ws/s1/alice", "/chat/ws/s2/alice"]
+    assert registry.connections("carol") == []
+
+
+def test_frame_sizes_count_encoded_bytes():
+    registry = WebSocketRegistry()
+    stats = open_connection(registry, "alice")
+    stats.record_in("héllo")
+    assert stats.bytes_in == len("héllo".encode())
+
+
+def test_to_ws_url():
+    assert to_ws_url("http://chat:8001") == "ws://chat:8001"
+    assert to_ws_url("https://chat.example.com") == "wss://chat.example.com"
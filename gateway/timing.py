@@ -0,0 +1,41 @@
+import time
+from typing import Dict
+
+
+class RequestTiming:
+    """Per-request latency breakdown, reported in the Server-Timing header.
+
+    Upstream phases come from httpx/httpcore trace events, so connection
+    setup (only present when a new connection was opened) is separated from
+    time-to-first-byte.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def upstream_trace(self):
+        """httpx ``trace`` extension callback recording connect and TTFB."""
+        marks: Dict[str, float] = {}
+
+        async def trace(event_name: str, info: dict):
+            now = time.perf_counter()
+            if event_name.endswith("connect_tcp.started"):
+                marks["connect"] = now
+            elif event_name.endswith(("connect_tcp.complete", "start_tls.complete")):
+                if "connect" in marks:
+                    self.phases["upstream-connect"] = now - marks["connect"]
+            elif event_name.endswith("send_request_headers.started"):
+                marks["sent"] = now
+            elif event_name.endswith("receive_response_headers.complete"):
+                if "sent" in marks:
+                    self.add("upstream-ttfb", now - marks.pop("sent"))
+
+        return trace
+
+    def header(self, total: float) -> str:
+        parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.phases.items()]
+        parts.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(parts)
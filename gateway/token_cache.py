@@ -0,0 +1,57 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class TokenCache:
+    """LRU cache of verified token claims.
+
+    Entries are keyed by a SHA-256 digest of the token (raw tokens are never
+    kept in memory) and expire at the earlier of the cache TTL and the
+    token's own ``exp`` claim.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self.digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, claims = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return claims
+
+    def put(self, token: str, claims: dict, exp: Optional[float] = None):
+        if self.maxsize <= 0:
+            return
+
+        expires_at = time.time() + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+
+        key = self.digest(token)
+        self._entries[key] = (expires_at, claims)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger("api-gateway")
+
+
+class Backend:
+    """One upstream process, with passive health state."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.readmitted_at: Optional[float] = None
+
+    def is_ejected(self, now: float) -> bool:
+        return now < self.ejected_until
+
+    def weight(self, now: float, slow_start: float) -> float:
+        """Traffic share while being re-admitted after an ejection.
+
+        Ramps linearly from 10% to 100% over ``slow_start`` seconds so a
+        backend that just came back is not flooded immediately.
+        """
+        if self.readmitted_at is None or slow_start <= 0:
+            return 1.0
+        elapsed = now - self.readmitted_at
+        if elapsed >= slow_start:
+            self.readmitted_at = None
+            return 1.0
+        return max(0.1, elapsed / slow_start)
+
+    def score(self, now: float, slow_start: float) -> float:
+        return (self.outstanding + 1) / self.weight(now, slow_start)
+
+    def as_dict(self, now: float) -> dict:
+        return {
+            "url": self.url,
+            "outstanding": self.outstanding,
+            "consecutive_failures": self.consecutive_failures,
+            "ejected": self.is_ejected(now),
+            "ejections": self.ejections,
+        }
+
+
+class UpstreamPool:
+    """Backends for a single service, balanced by outstanding requests.
+
+    Strategies:
+      - ``least_outstanding``: pick the backend with the lowest weighted
+        in-flight count
+      - ``p2c``: power-of-two-choices over the same score
+
+    A backend is ejected after ``max_failures`` consecutive failures; the
+    ejection time doubles for every repeat ejection up to ``max_eject``.
+    If every backend is ejected the pool fails open and uses all of them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        urls: List[str],
+        strategy: str = "least_outstanding",
+        max_failures: int = 5,
+        eject_seconds: float = 10.0,
+        max_eject: float = 300.0,
+        slow_start: float = 30.0,
+    ):
+        if not urls:
+            raise ValueError(f"No backends configured for service '{name}'")
+        self.name = name
+        self.backends = [Backend(u) for u in urls]
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self.max_eject = max_eject
+        self.slow_start = slow_start
+        self._rr = 0
+
+    # ---------------- selection ----------------
+    def choose(self, exclude: Optional[Backend] = None) -> Backend:
+        now = time.monotonic()
+        candidates = [
+            b for b in self.backends
+            if not b.is_ejected(now) and b is not exclude
+        ]
+        if not candidates:
+            candidates = [b for b in self.backends if b is not exclude] or self.backends
+
+        if len(candidates) == 1:
+            return candidates[0]
+
+        if self.strategy == "p2c":
+            a, b = random.sample(candidates, 2)
+            return a if a.score(now, self.slow_start) <= b.score(now, self.slow_start) else b
+
+        # Rotate the starting point so ties don't always go to the first backend
+        self._rr = (self._rr + 1) % len(candidates)
+        rotated = candidates[self._rr:] + candidates[:self._rr]
+        return min(rotated, key=lambda b: b.score(now, self.slow_start))
+
+    # ---------------- passive health ----------------
+    def acquire(self, backend: Backend):
+        backend.outstanding += 1
+
+    def release(self, backend: Backend, ok: Optional[bool]):
+        """Finish a request; ``ok=None`` (e.g. a cancelled hedge) says nothing about health."""
+        backend.outstanding = max(0, backend.outstanding - 1)
+        if ok is None:
+            return
+        if ok:
+            self.report_success(backend)
+        else:
+            self.report_failure(backend)
+
+    def report_success(self, backend: Backend):
+        backend.consecutive_failures = 0
+
+    def report_failure(self, backend: Backend):
+        backend.consecutive_failures += 1
+        if backend.consecutive_failures >= self.max_failures:
+            self.eject(backend)
+
+    def eject(self, backend: Backend):
+        now = time.monotonic()
+        if backend.is_ejected(now):
+            return
+        duration = min(self.eject_seconds * (2 ** backend.ejections), self.max_eject)
+        backend.ejections += 1
+        backend.ejected_until = now + duration
+        backend.readmitted_at = backend.ejected_until
+        logger.warning(f"Ejected {self.name} backend {backend.url} for {duration:.0f}s")
+
+    def readmit(self, backend: Backend):
+        now = time.monotonic()
+        if not backend.is_ejected(now):
+            return
+        backend.ejected_until = 0.0
+        backend.readmitted_at = now
+        backend.consecutive_failures = 0
+        logger.info(f"Re-admitted {self.name} backend {backend.url}")
+
+    def as_dict(self) -> dict:
+        now = time.monotonic()
+        return {
+            "strategy": self.strategy,
+            "backends": [b.as_dict(now) for b in self.backends],
+        }
+
+
+# --------------------------------------------------
+# Active health checking
+# --------------------------------------------------
+async def probe_pool(pool: UpstreamPool, client: httpx.AsyncClient, timeout: float):
+    async def probe(backend: Backend):
+        try:
+            res = await client.get(f"{backend.url}/health", timeout=timeout)
+            healthy = res.status_code < 500
+        except httpx.RequestError:
+            healthy = False
+
+        if healthy:
+            now = time.monotonic()
+            if backend.is_ejected(now):
+                pool.readmit(backend)
+            elif backend.weight(now, pool.slow_start) == 1.0:
+                # Fully recovered: forget earlier ejections for backoff purposes
+                backend.ejections = 0
+            pool.report_success(backend)
+        else:
+            pool.report_failure(backend)
+
+    await asyncio.gather(*(probe(b) for b in pool.backends))
+
+
+async def run_health_checks(
+    pools: Dict[str, UpstreamPool],
+    client: httpx.AsyncClient,
+    interval: float,
+    timeout: float,
+):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.gather(*(probe_pool(p, client, timeout) for p in pools.values()))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Upstream health check failed")
@@ -0,0 +1,155 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import Dict, Union
+
+import websockets
+from fastapi import WebSocket
+from starlette.websockets import WebSocketDisconnect
+
+logger = logging.getLogger("api-gateway")
+
+_connection_ids = itertools.count(1)
+
+
+def _frame_size(data: Union[str, bytes]) -> int:
+    if isinstance(data, bytes):
+        return len(data)
+    # str.isascii() is O(1) in CPython, so the common case avoids an encode
+    return len(data) if data.isascii() else len(data.encode())
+
+
+class ConnectionStats:
+    """Byte/frame counters for one proxied WebSocket connection."""
+
+    def __init__(self, path: str, user_id: str, upstream: str):
+        self.id = next(_connection_ids)
+        self.path = path
+        self.user_id = user_id
+        self.upstream = upstream
+        self.opened_at = time.time()
+        self.frames_in = 0
+        self.frames_out = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def record_in(self, data: Union[str, bytes]):
+        self.frames_in += 1
+        self.bytes_in += _frame_size(data)
+
+    def record_out(self, data: Union[str, bytes]):
+        self.frames_out += 1
+        self.bytes_out += _frame_size(data)
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "path": self.path,
+            "user_id": self.user_id,
+            "upstream": self.upstream,
+            "duration_seconds": round(time.time() - self.opened_at, 3),
+            "frames_in": self.frames_in,
+            "frames_out": self.frames_out,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+
+class WebSocketRegistry:
+    """Tracks open proxied connections plus lifetime totals."""
+
+    def __init__(self):
+        self.active: Dict[int, ConnectionStats] = {}
+        self.total_connections = 0
+        self.total_frames = 0
+        self.total_bytes = 0
+
+    def open(self, stats: ConnectionStats):
+        self.active[stats.id] = stats
+        self.total_connections += 1
+
+    def close(self, stats: ConnectionStats):
+        self.active.pop(stats.id, None)
+        self.total_frames += stats.frames_in + stats.frames_out
+        self.total_bytes += stats.bytes_in + stats.bytes_out
+
+    def as_dict(self) -> dict:
+        """Counts only; safe to publish."""
+        return {
+            "active": len(self.active),
+            "total_connections": self.total_connections,
+            "total_frames": self.total_frames,
+            "total_bytes": self.total_bytes,
+        }
+
+    def connections(self, user_id: str) -> list:
+        """Per-connection detail for one user's own connections."""
+        return [s.as_dict() for s in self.active.values() if s.user_id == user_id]
+
+
+def to_ws_url(http_url: str) -> str:
+    # http -> ws, https -> wss
+    return "ws" + http_url[4:] if http_url.startswith("http") else http_url
+
+
+async def connect_upstream(url: str, max_size: int, max_queue: int):
+    """Open the upstream connection before accepting the client.
+
+    ``max_queue`` bounds how many frames the upstream connection buffers
+    while the client is slow; once full, reads from the upstream socket
+    stop and TCP flow control pushes back on the chat service.
+    """
+    return await websockets.connect(url, max_size=max_size, max_queue=max_queue)
+
+
+async def relay(client: WebSocket, upstream, stats: ConnectionStats):
+    """Pump frames in both directions until either side closes.
+
+    Each direction awaits the send before reading the next frame, so a slow
+    receiver throttles the sender instead of frames piling up in memory.
+    Frames are forwarded as the same str/bytes objects that were received.
+    """
+
+    async def client_to_upstream():
+        while True:
+            message = await client.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            data = message.get("text")
+            if data is None:
+                data = message.get("bytes")
+            if data is None:
+                continue
+            stats.record_in(data)
+            await upstream.send(data)
+
+    async def upstream_to_client():
+        async for data in upstream:
+            stats.record_out(data)
+            if isinstance(data, str):
+                await client.send_text(data)
+            else:
+                await client.send_bytes(data)
+
+    tasks = [
+        asyncio.ensure_future(client_to_upstream()),
+        asyncio.ensure_future(upstream_to_client()),
+    ]
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc and not isinstance(exc, (WebSocketDisconnect, websockets.exceptions.ConnectionClosed)):
+                logger.warning(f"WebSocket relay error on {stats.path}: {exc!r}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        await upstream.close()
+        try:
+            await client.close(code=upstream.close_code or 1000)
+        except RuntimeError:
+            # Client already disconnected
+            pass
@@ -0,0 +1,65 @@
+"""Bloom filter used for the access token revocation list.
+
+user_service builds it from the revoked token ids and publishes it; every
+token verifier loads it and checks tokens against it in memory. A lookup
+costs one SHA-256 and ``hashes`` bit probes however many ids are in the
+filter. "Not present" is exact; "present" may be a false positive at the
+configured rate, so positives are confirmed against user_service.
+
+The same file is copied into each service; the hashing must stay identical.
+"""
+import base64
+import hashlib
+import math
+from typing import Iterable
+
+
+class BloomFilter:
+    def __init__(self, size_bits: int, hashes: int, bits: bytearray = None):
+        self.size_bits = size_bits
+        self.hashes = hashes
+        self.bits = bits if bits is not None else bytearray((size_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, false_positive_rate: float) -> "BloomFilter":
+        capacity = max(capacity, 1)
+        size_bits = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        hashes = max(1, round(size_bits / capacity * math.log(2)))
+        return cls(size_bits, hashes)
+
+    @classmethod
+    def build(cls, items: Iterable[str], capacity: int, false_positive_rate: float) -> "BloomFilter":
+        bloom = cls.for_capacity(capacity, false_positive_rate)
+        for item in items:
+            bloom.add(item)
+        return bloom
+
+    def _positions(self, item: str):
+        # Double hashing (Kirsch-Mitzenmacher): k probes from one digest
+        digest = hashlib.sha256(item.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def to_dict(self) -> dict:
+        return {
+            "size_bits": self.size_bits,
+            "hashes": self.hashes,
+            "bits": base64.b64encode(bytes(self.bits)).decode(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BloomFilter":
+        bits = bytearray(base64.b64decode(data["bits"]))
+        size_bits, hashes = int(data["size_bits"]), int(data["hashes"])
+        if len(bits) != (size_bits + 7) // 8 or hashes < 1:
+            raise ValueError("Malformed bloom filter")
+        return cls(size_bits, hashes, bits)
@@ -16,7 +16,7 @@ class UserPreference(Base):
     __tablename__ = "user_preferences"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, unique=True, index=True)
+    user_id = Column(String, unique=True, index=True)
     gender = Column(String, index=True)  # male, female, other
     seeking_gender = Column(String)  # male, female, other
     age_min = Column(Integer)
@@ -30,8 +30,8 @@ class Match(Base):
     __tablename__ = "matches"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_1_id = Column(Integer, index=True)
-    user_2_id = Column(Integer, index=True)
+    user_1_id = Column(String, index=True)
+    user_2_id = Column(String, index=True)
     status = Column(Enum(MatchStatus), default=MatchStatus.PENDING, index=True)
     user_1_approved = Column(Boolean, default=False)
     user_2_approved = Column(Boolean, default=False)
@@ -44,7 +44,7 @@ class MatchingQueue(Base):
     __tablename__ = "matching_queue"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, unique=True, index=True)
+    user_id = Column(String, unique=True, index=True)
     gender = Column(String, index=True)
     seeking_gender = Column(String, index=True)
     position_in_queue = Column(Integer)
@@ -56,7 +56,7 @@ class RejectedMatch(Base):
     __tablename__ = "rejected_matches"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_1_id = Column(Integer, index=True)
-    user_2_id = Column(Integer, index=True)
+    user_1_id = Column(String, index=True)
+    user_2_id = Column(String, index=True)
     rejection_reason = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func
 from datetime import datetime
 from database import get_db
+from deadline import check_deadline
 from models.matching import UserPreference, Match, MatchStatus, MatchingQueue, RejectedMatch
 from schemas.matching import (
     UserPreferenceCreate,
@@ -35,7 +36,7 @@ def create_preference(preference: UserPreferenceCreate, db: Session = Depends(ge
     return db_preference
 
 @router.get("/preferences/{user_id}", response_model=UserPreferenceResponse)
-def get_preference(user_id: int, db: Session = Depends(get_db)):
+def get_preference(user_id: str, db: Session = Depends(get_db)):
     """Get user's matching preferences"""
     preference = db.query(UserPreference).filter(UserPreference.user_id == user_id).first()
     if not preference:
@@ -43,7 +44,7 @@ def get_preference(user_id: int, db: Session = Depends(get_db)):
     return preference
 
 @router.put("/preferences/{user_id}", response_model=UserPreferenceResponse)
-def update_preference(user_id: int, preference: UserPreferenceUpdate, db: Session = Depends(get_db)):
+def update_preference(user_id: str, preference: UserPreferenceUpdate, db: Session = Depends(get_db)):
     """Update user's matching preferences"""
     db_preference = db.query(UserPreference).filter(UserPreference.user_id == user_id).first()
     if not db_preference:
@@ -88,6 +89,7 @@ def find_match(request: MatchCreate, db: Session = Depends(get_db)):
     ).all()
     rejected_ids = [r.user_2_id if r.user_1_id == request.user_id else r.user_1_id for r in rejected_user_ids]
     
+    check_deadline()
     compatible_users = db.query(UserPreference).filter(
         and_(
             UserPreference.user_id != request.user_id,
@@ -124,6 +126,7 @@ def find_match(request: MatchCreate, db: Session = Depends(get_db)):
         }
     
     # Select user with longest wait time (fairness)
+    check_deadline()
     matched_user = min(compatible_users, key=lambda u: db.query(MatchingQueue).filter(
         MatchingQueue.user_id == u.user_id
     ).first().waiting_since if db.query(MatchingQueue).filter(
@@ -136,6 +139,7 @@ def find_match(request: MatchCreate, db: Session = Depends(get_db)):
         user_2_id=matched_user.user_id,
         status=MatchStatus.PENDING
     )
+    check_deadline()
     db.add(match)
     db.commit()
     db.refresh(match)
@@ -143,7 +147,7 @@ def find_match(request: MatchCreate, db: Session = Depends(get_db)):
     return match
 
 @router.post("/approve", response_model=MatchResponse)
-def approve_match(approval: MatchApproval, user_id: int, db: Session = Depends(get_db)):
+def approve_match(approval: MatchApproval, user_id: str, db: Session = Depends(get_db)):
     """Approve or reject a match"""
     match = db.query(Match).filter(Match.id == approval.match_id).first()
     
@@ -178,7 +182,7 @@ def approve_match(approval: MatchApproval, user_id: int, db: Session = Depends(g
     return match
 
 @router.get("/user/{user_id}", response_model=List[MatchResponse])
-def get_user_matches(user_id: int, db: Session = Depends(get_db)):
+def get_user_matches(user_id: str, db: Session = Depends(get_db)):
     """Get all matches for a user"""
     matches = db.query(Match).filter(
         or_(
@@ -199,7 +203,7 @@ def get_match(match_id: int, db: Session = Depends(get_db)):
 # ==================== WAITING QUEUE MANAGEMENT ====================
 
 @router.get("/queue/status/{user_id}")
-def get_queue_status(user_id: int, db: Session = Depends(get_db)):
+def get_queue_status(user_id: str, db: Session = Depends(get_db)):
     """Get user's position in waiting queue"""
     queue_entry = db.query(MatchingQueue).filter(MatchingQueue.user_id == user_id).first()
     
@@ -251,7 +255,7 @@ def get_available_matches_for_gender(gender: str, db: Session = Depends(get_db))
     }
 
 @router.delete("/queue/{user_id}")
-def leave_queue(user_id: int, db: Session = Depends(get_db)):
+def leave_queue(user_id: str, db: Session = Depends(get_db)):
     """Remove user from waiting queue"""
     queue_entry = db.query(MatchingQueue).filter(MatchingQueue.user_id == user_id).first()
     
@@ -1,9 +1,17 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, BeforeValidator
+from typing import Optional, List, Annotated
 from datetime import datetime
 
+def user_id_to_str(value):
+    """User ids are strings; rows written before that hold INTEGERs."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+    return value
+
+UserId = Annotated[str, BeforeValidator(user_id_to_str)]
+
 class UserPreferenceCreate(BaseModel):
-    user_id: int
+    user_id: UserId
     gender: str
     seeking_gender: str
     age_min: int
@@ -21,7 +29,7 @@ class UserPreferenceUpdate(BaseModel):
 
 class UserPreferenceResponse(BaseModel):
     id: int
-    user_id: int
+    user_id: UserId
     gender: str
     seeking_gender: str
     age_min: int
@@ -34,7 +42,7 @@ class UserPreferenceResponse(BaseModel):
         from_attributes = True
 
 class MatchCreate(BaseModel):
-    user_id: int
+    user_id: UserId
 
 class MatchApproval(BaseModel):
     match_id: int
@@ -42,8 +50,8 @@ class MatchApproval(BaseModel):
 
 class MatchResponse(BaseModel):
     id: int
-    user_1_id: int
-    user_2_id: Optional[int]
+    user_1_id: UserId
+    user_2_id: Optional[UserId]
     status: str
     user_1_approved: bool
     user_2_approved: bool
@@ -54,7 +62,7 @@ class MatchResponse(BaseModel):
         from_attributes = True
 
 class UserMatchInfo(BaseModel):
-    user_id: int
+    user_id: UserId
     gender: str
     age_min: int
     age_max: int
@@ -66,7 +74,7 @@ class UserMatchInfo(BaseModel):
 
 class MatchingQueueResponse(BaseModel):
     id: int
-    user_id: int
+    user_id: UserId
     gender: str
     seeking_gender: str
     position_in_queue: int
@@ -85,8 +93,8 @@ class QueueStatusResponse(BaseModel):
 
 class RejectedMatchResponse(BaseModel):
     id: int
-    user_1_id: int
-    user_2_id: int
+    user_1_id: UserId
+    user_2_id: UserId
     rejection_reason: Optional[str]
     created_at: datetime
     
@@ -0,0 +1,68 @@
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import Integer, MetaData, create_engine
+from sqlalchemy.orm import Session
+
+from database import Base
+from models.matching import Match, MatchingQueue, UserPreference
+from schemas.matching import MatchCreate, MatchResponse, MatchingQueueResponse, UserPreferenceResponse
+
+USER_ID_COLUMNS = {"user_id", "user_1_id", "user_2_id"}
+
+
+@pytest.fixture
+def legacy_db():
+    """A database created before user ids became strings (INTEGER columns)."""
+    legacy = MetaData()
+    for table in Base.metadata.sorted_tables:
+        copy = table.to_metadata(legacy)
+        for column in copy.columns:
+            if column.name in USER_ID_COLUMNS:
+                column.type = Integer()
+    engine = create_engine("sqlite://")
+    legacy.create_all(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO matches (id, user_1_id, user_2_id, status, user_1_approved, user_2_approved, created_at) "
+            "VALUES (1, 7, 12, 'MATCHED', 1, 1, '2024-05-01 10:00:00'), "
+            "(2, 8, NULL, 'WAITING', 0, 0, '2024-05-01 11:00:00')"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO user_preferences (id, user_id, gender, seeking_gender, age_min, age_max, created_at) "
+            "VALUES (1, 7, 'female', 'male', 25, 35, '2024-05-01 09:00:00')"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO matching_queue (id, user_id, gender, seeking_gender, position_in_queue, waiting_since, created_at) "
+            "VALUES (1, 8, 'male', 'female', 1, '2024-05-01 11:00:00', '2024-05-01 11:00:00')"
+        )
+    with Session(engine) as session:
+        yield session
+
+
+def test_legacy_integer_rows_serialize_as_strings(legacy_db):
+    matched = legacy_db.get(Match, 1)
+    assert matched.user_1_id == 7  # SQLite hands back the stored INTEGER
+    response = MatchResponse.model_validate(matched)
+    assert (response.user_1_id, response.user_2_id) == ("7", "12")
+
+    waiting = MatchResponse.model_validate(legacy_db.get(Match, 2))
+    assert waiting.user_2_id is None
+
+    preference = UserPreferenceResponse.model_validate(legacy_db.get(UserPreference, 1))
+    assert preference.user_id == "7"
+    queued = MatchingQueueResponse.model_validate(legacy_db.get(MatchingQueue, 1))
+    assert queued.user_id == "8"
+
+
+def test_string_ids_match_legacy_integer_rows(legacy_db):
+    # INTEGER affinity converts the compared text, so lookups by str id still work
+    rows = legacy_db.query(Match).filter(Match.user_1_id == "7").all()
+    assert [m.id for m in rows] == [1]
+
+
+def test_user_ids_in_requests():
+    assert MatchCreate(user_id=42).user_id == "42"
+    assert MatchCreate(user_id="3f2c9e1a-uuid").user_id == "3f2c9e1a-uuid"
+    for bad in (True, 1.5, None):
+        with pytest.raises(ValidationError):
+            MatchCreate(user_id=bad)
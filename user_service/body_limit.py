@@ -0,0 +1,73 @@
+"""Request body caps for the upload routes, enforced before parsing.
+
+store_upload() caps each file while copying it into storage, but by then
+Starlette has already spooled the whole multipart body to disk. This
+middleware sits in front of that: a request whose Content-Length is over
+the route's cap is refused without reading the body, and a body sent
+without one (chunked) is counted as it arrives and cut off with 413 as soon
+as it passes the cap.
+"""
+import re
+from typing import Iterable, Optional, Pattern, Tuple
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from config import MAX_DOCUMENT_BYTES, MAX_FORM_FIELDS_BYTES, MAX_PHOTO_BYTES
+
+# (method, path pattern, max body bytes)
+UPLOAD_LIMITS: Tuple[Tuple[str, Pattern, int], ...] = (
+    # ID document + selfie
+    ("POST", re.compile(r"/auth/signup"), 2 * MAX_DOCUMENT_BYTES + MAX_FORM_FIELDS_BYTES),
+    ("POST", re.compile(r"/users/[^/]+/photos"), MAX_PHOTO_BYTES + MAX_FORM_FIELDS_BYTES),
+)
+
+
+def _too_large(limit: int) -> str:
+    return f"Request body exceeds {limit} bytes"
+
+
+class BodySizeLimit:
+    """ASGI middleware; ``limits`` defaults to UPLOAD_LIMITS."""
+
+    def __init__(self, app, limits: Iterable[Tuple[str, Pattern, int]] = UPLOAD_LIMITS):
+        self.app = app
+        self.limits = tuple(limits)
+
+    def limit_for(self, method: str, path: str) -> Optional[int]:
+        for limit_method, pattern, limit in self.limits:
+            if method == limit_method and pattern.fullmatch(path):
+                return limit
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        limit = self.limit_for(scope["method"], scope["path"])
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        declared = dict(scope["headers"]).get(b"content-length")
+        if declared is not None:
+            try:
+                too_large = int(declared) > limit
+            except ValueError:
+                too_large = False  # left to the server to reject
+            if too_large:
+                response = JSONResponse({"detail": _too_large(limit)}, status_code=413)
+                return await response(scope, receive, send)
+
+        received = 0
+
+        async def counted_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside the form parser; FastAPI passes
+                    # HTTPException through, so the client gets the 413
+                    raise HTTPException(status_code=413, detail=_too_large(limit))
+            return message
+
+        await self.app(scope, counted_receive, send)
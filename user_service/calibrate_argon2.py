@@ -0,0 +1,64 @@
+"""
+Pick argon2 cost parameters for this host.
+
+Raises time_cost (at a fixed memory cost) until one hash takes at least the
+target latency, then prints the environment settings to use:
+
+    python calibrate_argon2.py --target-ms 250 --memory-mib 64
+
+Parallelism defaults to 1: logins are already spread over cores by the
+password hashing pool (passwords.py), so extra argon2 lanes per hash would
+only compete with other logins for the same cores.
+"""
+import argparse
+import os
+import statistics
+import time
+
+from passwords import make_context
+
+
+def measure(time_cost: int, memory_kib: int, parallelism: int, samples: int) -> float:
+    context = make_context(time_cost, memory_kib, parallelism)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash("calibration-password")
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Target time per hash")
+    parser.add_argument("--memory-mib", type=int, default=64, help="Memory cost per hash")
+    parser.add_argument("--parallelism", type=int, default=1)
+    parser.add_argument("--samples", type=int, default=5, help="Hashes timed per setting")
+    parser.add_argument("--max-time-cost", type=int, default=50)
+    args = parser.parse_args()
+
+    memory_kib = args.memory_mib * 1024
+    target = args.target_ms / 1000
+
+    chosen, chosen_latency = None, None
+    for time_cost in range(1, args.max_time_cost + 1):
+        latency = measure(time_cost, memory_kib, args.parallelism, args.samples)
+        print(f"time_cost={time_cost:<3} memory={args.memory_mib} MiB  {latency * 1000:7.1f} ms")
+        chosen, chosen_latency = time_cost, latency
+        if latency >= target:
+            break
+
+    if chosen_latency < target:
+        print(f"\nTarget not reached at time_cost={chosen}; raise --memory-mib or --max-time-cost.")
+
+    cores = os.cpu_count() or 1
+    print(f"\nRecommended ({chosen_latency * 1000:.0f} ms per hash, "
+          f"~{cores / chosen_latency:.0f} logins/s on {cores} cores):")
+    print(f"  ARGON2_TIME_COST={chosen}")
+    print(f"  ARGON2_MEMORY_COST={memory_kib}")
+    print(f"  ARGON2_PARALLELISM={args.parallelism}")
+    print(f"  PASSWORD_HASH_WORKERS={cores}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,68 @@
+import os
+
 DATABASE_URL = "sqlite:///./users.db"
 UPLOAD_DIR = "uploads"
+
+# Access token signing keys (signing_keys.py). New keys are published
+# JWT_KEY_PUBLISH_AHEAD_MINUTES before first use, which must exceed the
+# verifiers' JWKS_CACHE_TTL; retired keys stay published for
+# JWT_KEY_RETAIN_MINUTES, which must exceed the access token lifetime.
+JWT_KEY_DIR = os.getenv("JWT_KEY_DIR", "keys")
+JWT_KEY_ROTATION_DAYS = float(os.getenv("JWT_KEY_ROTATION_DAYS", "30"))
+JWT_KEY_PUBLISH_AHEAD_MINUTES = float(os.getenv("JWT_KEY_PUBLISH_AHEAD_MINUTES", "10"))
+JWT_KEY_RETAIN_MINUTES = float(os.getenv("JWT_KEY_RETAIN_MINUTES", "180"))
+JWT_KEY_SIZE = int(os.getenv("JWT_KEY_SIZE", "2048"))
+
+# Revoked access tokens and sessions (revocation.py) are published as a
+# Bloom filter, rebuilt from the database at most every REVOCATION_REBUILD_SECONDS
+REVOCATION_REBUILD_SECONDS = float(os.getenv("REVOCATION_REBUILD_SECONDS", "30"))
+REVOCATION_FALSE_POSITIVE_RATE = float(os.getenv("REVOCATION_FALSE_POSITIVE_RATE", "0.001"))
+# Filters are sized for at least this many ids so small lists don't resize constantly
+REVOCATION_MIN_CAPACITY = int(os.getenv("REVOCATION_MIN_CAPACITY", "1000"))
+
+# Upload size caps, enforced while the file is copied into storage
+MAX_PHOTO_BYTES = int(os.getenv("MAX_PHOTO_BYTES", str(10 * 1024 * 1024)))
+MAX_DOCUMENT_BYTES = int(os.getenv("MAX_DOCUMENT_BYTES", str(10 * 1024 * 1024)))
+# Allowance on top of the files for multipart framing and text fields; the
+# whole request body is capped before it is parsed (body_limit.py)
+MAX_FORM_FIELDS_BYTES = int(os.getenv("MAX_FORM_FIELDS_BYTES", str(64 * 1024)))
+
+# Batch profile lookups (POST /users/batch)
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", "200"))
+
+# Bulk approve/reject (admin.py); kept under SQLite's bound-parameter limit
+BULK_REVIEW_MAX_IDS = int(os.getenv("BULK_REVIEW_MAX_IDS", "900"))
+
+# Profile cache (profile_cache.py): "memory" (per worker), "redis", "none",
+# or "package.module:Class" for a custom CacheBackend
+PROFILE_CACHE_BACKEND = os.getenv("PROFILE_CACHE_BACKEND", "memory")
+PROFILE_CACHE_URL = os.getenv("PROFILE_CACHE_URL", "redis://localhost:6379/0")
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "60"))
+
+# Behind nginx: internal location that maps to UPLOAD_DIR (e.g. "/_uploads").
+# When set, files are handed to nginx via X-Accel-Redirect and sent with sendfile.
+MEDIA_ACCEL_REDIRECT = os.getenv("MEDIA_ACCEL_REDIRECT")
+
+# Photo derivatives: variant name -> longest edge in pixels
+PHOTO_VARIANTS = {
+    "thumb": int(os.getenv("PHOTO_THUMB_PX", "160")),
+    "small": int(os.getenv("PHOTO_SMALL_PX", "480")),
+    "medium": int(os.getenv("PHOTO_MEDIUM_PX", "1080")),
+}
+PHOTO_VARIANT_QUALITY = int(os.getenv("PHOTO_VARIANT_QUALITY", "85"))
+PHOTO_WORKERS = int(os.getenv("PHOTO_WORKERS", "2"))
+# Originals whose derivatives are remembered in memory
+PHOTO_VARIANT_CACHE_SIZE = int(os.getenv("PHOTO_VARIANT_CACHE_SIZE", "4096"))
+
+# Argon2 cost; unset values keep passlib's defaults. Pick them for this host
+# with `python calibrate_argon2.py`. Existing hashes keep verifying because
+# each hash records its own parameters.
+ARGON2_TIME_COST = os.getenv("ARGON2_TIME_COST")
+ARGON2_MEMORY_COST = os.getenv("ARGON2_MEMORY_COST")  # KiB
+ARGON2_PARALLELISM = os.getenv("ARGON2_PARALLELISM")
+
+# Password hashing runs on a dedicated pool, off the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+# Hash/verify jobs allowed to wait for a worker before new ones get 503
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
@@ -0,0 +1,43 @@
+"""Shared setup for the unit tests (run with ``python -m pytest`` from here).
+
+users.db, uploads/ and keys/ are relative to the working directory, so the
+tests run in a scratch directory instead of touching the real ones.
+"""
+import os
+import tempfile
+
+import pytest
+
+os.chdir(tempfile.mkdtemp(prefix="user_service-tests-"))
+
+
+@pytest.fixture
+def db():
+    """A session on a freshly created schema."""
+    from database import Base, SessionLocal, engine
+    from models import user  # noqa: F401 (registers the tables)
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def http():
+    """``http(app, method, url, **kwargs)``: one request against an ASGI app."""
+    import asyncio
+
+    import httpx
+
+    def request(app, method, url, **kwargs):
+        async def send():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+                return await client.request(method, url, **kwargs)
+        return asyncio.run(send())
+
+    return request
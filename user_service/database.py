@@ -12,3 +12,12 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def ensure_indexes():
+    """Create indexes added to models after their tables already existed.
+
+    create_all only creates indexes together with a new table.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
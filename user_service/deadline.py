@@ -0,0 +1,52 @@
+"""Request deadlines propagated by the API gateway.
+
+The gateway sends the remaining time budget for a request in the
+``X-Request-Timeout`` header (seconds). Requests that arrive with no budget
+left are rejected up front, and long-running handlers call
+``check_deadline()`` between expensive steps so they stop working for a
+client that has already given up.
+"""
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+
+DEADLINE_HEADER = "X-Request-Timeout"
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left for the current request, or None if it has no deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_deadline():
+    left = remaining()
+    if left is not None and left <= 0:
+        raise HTTPException(status_code=504, detail="Request deadline exceeded")
+
+
+async def deadline_middleware(request: Request, call_next):
+    raw = request.headers.get(DEADLINE_HEADER)
+    if raw is None:
+        return await call_next(request)
+
+    try:
+        budget = float(raw)
+    except ValueError:
+        return await call_next(request)
+
+    if budget <= 0:
+        return JSONResponse({"detail": "Request deadline exceeded"}, status_code=504)
+
+    token = _deadline.set(time.monotonic() + budget)
+    try:
+        return await call_next(request)
+    finally:
+        _deadline.reset(token)
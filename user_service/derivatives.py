@@ -0,0 +1,96 @@
+"""Background generation of resized photo variants.
+
+Uploads return as soon as the original is stored; resizing runs afterwards
+in a process pool (Pillow holds the GIL for much of its work, so threads
+would compete with request handling). Results are recorded as PhotoVariant
+rows. A bounded in-memory map remembers which originals already have
+derivatives, so re-uploads of the same content skip the pool entirely.
+"""
+import asyncio
+import logging
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from config import PHOTO_VARIANTS, PHOTO_VARIANT_QUALITY, PHOTO_WORKERS, PHOTO_VARIANT_CACHE_SIZE
+from database import SessionLocal
+from imaging import render_variants
+from models.user import PhotoVariant
+
+logger = logging.getLogger(__name__)
+
+
+class DerivativeCache:
+    """LRU of original path -> rendered variant descriptions."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, List[dict]]" = OrderedDict()
+
+    def get(self, source_path: str) -> Optional[List[dict]]:
+        variants = self._entries.get(source_path)
+        if variants is not None:
+            self._entries.move_to_end(source_path)
+        return variants
+
+    def put(self, source_path: str, variants: List[dict]):
+        self._entries[source_path] = variants
+        self._entries.move_to_end(source_path)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+derivative_cache = DerivativeCache(PHOTO_VARIANT_CACHE_SIZE)
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: forking a process that runs an event loop and threads is unsafe
+        _executor = ProcessPoolExecutor(
+            max_workers=PHOTO_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def _save_variants(photo_id: int, variants: List[dict]):
+    db = SessionLocal()
+    try:
+        existing = {
+            v.name for v in db.query(PhotoVariant).filter(PhotoVariant.photo_id == photo_id)
+        }
+        for variant in variants:
+            if variant["name"] not in existing:
+                db.add(PhotoVariant(photo_id=photo_id, **variant))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def generate_variants(photo_id: int, source_path: str):
+    """Render and record the variants of a stored photo (run as a background task)."""
+    variants = derivative_cache.get(source_path)
+    if variants is None:
+        try:
+            variants = await asyncio.wrap_future(
+                _pool().submit(render_variants, source_path, PHOTO_VARIANTS, PHOTO_VARIANT_QUALITY)
+            )
+        except Exception:
+            logger.exception(f"Could not generate variants for {source_path}")
+            return
+        derivative_cache.put(source_path, variants)
+
+    await run_in_threadpool(_save_variants, photo_id, variants)
+
+
+def shutdown():
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
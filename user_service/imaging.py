@@ -0,0 +1,47 @@
+"""Image resizing, run inside the derivative worker processes.
+
+Kept free of database/app imports so spawned workers start quickly.
+"""
+import os
+from typing import Dict, List
+
+
+def variant_path(source_path: str, name: str) -> str:
+    # Stored next to the original: <sha256>.jpg -> <sha256>_thumb.jpg
+    base, _ = os.path.splitext(source_path)
+    return f"{base}_{name}.jpg"
+
+
+def render_variants(source_path: str, sizes: Dict[str, int], quality: int) -> List[dict]:
+    """Write a JPEG per variant (longest edge <= size) and describe each one.
+
+    Variants that already exist on disk (the original is content-addressed,
+    so the same bytes were processed before) are not rendered again.
+    """
+    from PIL import Image, ImageOps
+
+    results = []
+    with Image.open(source_path) as original:
+        # Phones store rotation in EXIF; bake it in before resizing
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        for name, edge in sorted(sizes.items(), key=lambda item: -item[1]):
+            path = variant_path(source_path, name)
+            if not os.path.exists(path):
+                resized = image.copy()
+                resized.thumbnail((edge, edge), Image.LANCZOS)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                resized.save(tmp_path, "JPEG", quality=quality, optimize=True, progressive=True)
+                os.replace(tmp_path, path)
+            with Image.open(path) as written:
+                width, height = written.size
+            results.append({
+                "name": name,
+                "filepath": path,
+                "width": width,
+                "height": height,
+                "size_bytes": os.path.getsize(path),
+            })
+    return results
@@ -1,16 +1,29 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from routers import users, photos, preferences, auth, admin
-from database import Base, engine
+from body_limit import BodySizeLimit
+from deadline import deadline_middleware
+from routers import users, photos, preferences, auth, admin, media
+from database import Base, engine, ensure_indexes
+from passwords import password_hasher
+from profile_cache import profile_cache
+from revocation import revocation_list
+from signing_keys import key_ring
+import derivatives
 
 # IMPORTANT: Import models before create_all
 from models import user as user_models  
 
 # Create tables
 Base.metadata.create_all(bind=engine)
+ensure_indexes()
+# Load (or create) the signing key now rather than on the first login
+key_ring.current()
 
 app = FastAPI(title="User Service (Modular)")
 
+# Refuse oversized uploads before Starlette spools them to disk (added
+# first so CORS headers still go on the 413)
+app.add_middleware(BodySizeLimit)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,12 +31,52 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Admin registration listing pages via this header
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Stop work on requests whose gateway deadline has passed
+app.middleware("http")(deadline_middleware)
+
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+# Public halves of the token signing keys, for verifiers in other services
+@app.get("/.well-known/jwks.json")
+def jwks(response: Response):
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return key_ring.jwks()
+
+# Revoked token ids as a Bloom filter, for verifiers in other services
+@app.get("/.well-known/revocations.json")
+def revocations(response: Response):
+    response.headers["Cache-Control"] = f"public, max-age={int(revocation_list.rebuild_every)}"
+    return revocation_list.published()
+
+@app.get("/health/revocations")
+def revocation_stats():
+    return revocation_list.stats()
+
+@app.get("/health/password-hasher")
+def password_hasher_stats():
+    return {
+        "workers": password_hasher.workers,
+        "pending": password_hasher.pending,
+        "max_queue": password_hasher.max_queue,
+        "rejected": password_hasher.rejected,
+    }
+
+@app.get("/health/profile-cache")
+def profile_cache_stats():
+    return profile_cache.stats()
+
+@app.on_event("shutdown")
+def shutdown():
+    password_hasher.shutdown()
+    derivatives.shutdown()
+
+app.include_router(media.router, prefix="/users", tags=["Media"])
 app.include_router(users.router, prefix="/users", tags=["Users"])
 app.include_router(photos.router, prefix="/users", tags=["Photos"])
 app.include_router(preferences.router, prefix="/users", tags=["Preferences"])
@@ -0,0 +1,126 @@
+"""Serving stored files: byte ranges, validators and zero-copy sends.
+
+``FileRangeResponse`` sends a whole file or a single byte range of it. When
+the ASGI server offers the ``http.response.zerocopysend`` extension the file
+descriptor is handed to the server (sendfile); otherwise the file is read in
+chunks on a worker thread. Behind nginx, setting MEDIA_ACCEL_REDIRECT makes
+the service answer with an X-Accel-Redirect header instead and nginx sends
+the file itself (with sendfile and range support).
+"""
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple
+
+import anyio
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+CHUNK_SIZE = 256 * 1024
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) inclusive for a single ``bytes=`` range.
+
+    Returns None when the header is absent or not something we serve as a
+    range (multiple ranges, other units, bad syntax): the full file is sent
+    instead, as RFC 9110 allows. Raises ValueError if the range can't be
+    satisfied.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_s, sep, end_s = header[6:].strip().partition("-")
+    if not sep or not (start_s or end_s):
+        return None
+    if (start_s and not start_s.isdigit()) or (end_s and not end_s.isdigit()):
+        return None
+    if size == 0:
+        raise ValueError("range not satisfiable")
+
+    if not start_s:
+        # Suffix range: the last N bytes
+        length = int(end_s)
+        if length == 0:
+            raise ValueError("range not satisfiable")
+        return max(0, size - length), size - 1
+
+    start = int(start_s)
+    end = int(end_s) if end_s else size - 1
+    if start >= size:
+        raise ValueError("range not satisfiable")
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def not_modified(if_none_match: Optional[str], if_modified_since: Optional[str], etag: str, mtime: float) -> bool:
+    if if_none_match:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+
+class FileRangeResponse(Response):
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        byte_range: Optional[Tuple[int, int]],
+        headers: dict,
+        media_type: Optional[str] = None,
+        head_only: bool = False,
+    ):
+        self.path = path
+        self.head_only = head_only
+        if byte_range is None:
+            self.offset, self.count = 0, size
+            status_code = 200
+        else:
+            start, end = byte_range
+            self.offset, self.count = start, end - start + 1
+            status_code = 206
+            headers = dict(headers, **{"Content-Range": f"bytes {start}-{end}/{size}"})
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.headers["Content-Length"] = str(self.count)
+        self.headers["Accept-Ranges"] = "bytes"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.head_only or self.count == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            fd = await anyio.to_thread.run_sync(os.open, self.path, os.O_RDONLY)
+            try:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": fd,
+                    "offset": self.offset,
+                    "count": self.count,
+                    "more_body": False,
+                })
+            finally:
+                os.close(fd)
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await file.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                # File shrank under us; close the body cleanly
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
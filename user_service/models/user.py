@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Integer, ForeignKey
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -26,6 +26,13 @@ class User(Base):
     photos = relationship("Photo", back_populates="user", cascade="all, delete")
     preferences = relationship("Preference", back_populates="user", uselist=False)
 
+    __table_args__ = (
+        # Keyset pagination of the admin registrations list, newest first,
+        # with and without a status filter
+        Index("ix_users_status_created_id", "registration_status", "created_at", "id"),
+        Index("ix_users_created_id", "created_at", "id"),
+    )
+
 class Photo(Base):
     __tablename__ = "photos"
 
@@ -34,6 +41,22 @@ class Photo(Base):
     filepath = Column(String)
 
     user = relationship("User", back_populates="photos")
+    variants = relationship("PhotoVariant", back_populates="photo", cascade="all, delete")
+
+class PhotoVariant(Base):
+    """A resized copy of a photo, generated in the background (see derivatives.py)."""
+    __tablename__ = "photo_variants"
+    __table_args__ = (UniqueConstraint("photo_id", "name"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    photo_id = Column(Integer, ForeignKey("photos.id"), index=True)
+    name = Column(String)          # "thumb", "small", "medium"
+    filepath = Column(String)
+    width = Column(Integer)
+    height = Column(Integer)
+    size_bytes = Column(Integer)
+
+    photo = relationship("Photo", back_populates="variants")
 
 class Preference(Base):
     __tablename__ = "preferences"
@@ -47,3 +70,30 @@ class Preference(Base):
     preferred_gender = Column(String)
 
     user = relationship("User", back_populates="preferences")
+
+class RefreshToken(Base):
+    """One refresh token; only its SHA-256 is stored.
+
+    Every refresh replaces the token with a new one in the same family. A
+    family is one login session, and its id is the ``sid`` claim of the
+    access tokens issued in it.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(String, primary_key=True)          # sha256 hex of the token
+    user_id = Column(String, ForeignKey("users.id"), index=True)
+    family_id = Column(String, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime)
+    used_at = Column(DateTime, nullable=True)      # exchanged for a new one
+    revoked_at = Column(DateTime, nullable=True)
+
+class RevokedToken(Base):
+    """A revoked access token ``jti`` or session ``sid`` (see revocation.py).
+
+    Kept until every access token it could match has expired.
+    """
+    __tablename__ = "revoked_tokens"
+
+    id = Column(String, primary_key=True)
+    expires_at = Column(DateTime, index=True)
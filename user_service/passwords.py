@@ -0,0 +1,103 @@
+"""Argon2 password hashing on a dedicated, bounded worker pool.
+
+argon2-cffi releases the GIL while hashing, so a thread pool sized to the
+core count runs hashes in parallel without the pickling and start-up cost
+of a process pool, and the event loop (and FastAPI's own threadpool) stays
+free for other requests. When more than ``max_queue`` jobs are already
+waiting, new ones are refused with ``HasherBusy`` instead of queueing
+behind work that would outlive the client's timeout.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from passlib.context import CryptContext
+
+from config import (
+    ARGON2_TIME_COST,
+    ARGON2_MEMORY_COST,
+    ARGON2_PARALLELISM,
+    PASSWORD_HASH_WORKERS,
+    PASSWORD_HASH_MAX_QUEUE,
+)
+from deadline import remaining
+
+
+def make_context(
+    time_cost: Optional[int] = None,
+    memory_cost: Optional[int] = None,
+    parallelism: Optional[int] = None,
+) -> CryptContext:
+    settings = {}
+    if time_cost is not None:
+        settings["argon2__rounds"] = int(time_cost)
+    if memory_cost is not None:
+        settings["argon2__memory_cost"] = int(memory_cost)
+    if parallelism is not None:
+        settings["argon2__parallelism"] = int(parallelism)
+    return CryptContext(schemes=["argon2"], deprecated="auto", **settings)
+
+
+pwd_context = make_context(ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM)
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    return pwd_context.verify(password, password_hash)
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class DeadlineExpired(Exception):
+    pass
+
+
+def _run_before(expires_at: Optional[float], fn, *args):
+    # Jobs that waited in the queue past the caller's deadline are skipped
+    if expires_at is not None and time.monotonic() >= expires_at:
+        raise DeadlineExpired()
+    return fn(*args)
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argon2")
+        # Only touched from the event loop thread
+        self.pending = 0
+        self.rejected = 0
+
+    async def _submit(self, fn, *args):
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HasherBusy()
+
+        left = remaining()
+        expires_at = time.monotonic() + left if left is not None else None
+
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, _run_before, expires_at, fn, *args
+            )
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(hash_password, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._submit(verify_password, password, password_hash)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
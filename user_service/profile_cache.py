@@ -0,0 +1,219 @@
+"""Read-through cache for profile lookups, with pluggable storage.
+
+Two kinds of entry are kept per user:
+
+  - ``profile:<id>``: the serialized UserOut JSON for ``GET /users/{id}``,
+    returned as-is on a hit (no query, no Pydantic)
+  - ``fields:<id>``: whichever columns batch lookups have loaded so far, so
+    callers asking for different projections share one entry
+
+Handlers that change a profile call ``invalidate``, which drops both.
+
+Storage is a ``CacheBackend`` holding bytes. The default in-process LRU+TTL
+backend is per worker; with several workers, set PROFILE_CACHE_BACKEND=redis
+(or a "module:Class" path to your own backend) so invalidations reach every
+worker.
+"""
+import importlib
+from abc import ABC, abstractmethod
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from config import PROFILE_CACHE_BACKEND, PROFILE_CACHE_SIZE, PROFILE_CACHE_TTL, PROFILE_CACHE_URL
+
+
+class CacheBackend(ABC):
+    """Bytes-valued key/value store with a fixed TTL."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes):
+        ...
+
+    @abstractmethod
+    def delete(self, *keys: str):
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+
+class NullBackend(CacheBackend):
+    """Caching disabled."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+    def stats(self):
+        return {"backend": "none"}
+
+
+class MemoryBackend(CacheBackend):
+    """Size-bounded LRU with a TTL, local to this process.
+
+    Sync endpoints run on several threadpool workers, so access is locked.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+class RedisBackend(CacheBackend):
+    """Shared cache for multi-worker deployments (needs the ``redis`` package)."""
+
+    def __init__(self, url: str, ttl: float, prefix: str = "user_service:"):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self._client.get(self.prefix + key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self._client.set(self.prefix + key, value, px=int(self.ttl * 1000))
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*(self.prefix + k for k in keys))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def make_backend(kind: str) -> CacheBackend:
+    if kind == "none":
+        return NullBackend()
+    if kind == "memory":
+        return MemoryBackend(PROFILE_CACHE_SIZE, PROFILE_CACHE_TTL)
+    if kind == "redis":
+        return RedisBackend(PROFILE_CACHE_URL, PROFILE_CACHE_TTL)
+    # "package.module:ClassName", constructed with no arguments
+    module, _, name = kind.partition(":")
+    return getattr(importlib.import_module(module), name)()
+
+
+class ProfileCache:
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    # ---- GET /users/{id} ----
+    def get_profile(self, user_id: str) -> Optional[bytes]:
+        return self.backend.get(f"profile:{user_id}")
+
+    def put_profile(self, user_id: str, body: bytes):
+        self.backend.set(f"profile:{user_id}", body)
+
+    # ---- batch lookups ----
+    def get(self, user_id: str, fields: Iterable[str]) -> Optional[dict]:
+        """Cached columns for a user, if every requested field is present."""
+        raw = self.backend.get(f"fields:{user_id}")
+        if raw is None:
+            return None
+        profile = json.loads(raw)
+        if not all(f in profile for f in fields):
+            return None
+        return profile
+
+    def merge(self, user_id: str, values: Dict[str, object]):
+        # Read-modify-write: a concurrent invalidation can be lost, which the
+        # TTL bounds
+        raw = self.backend.get(f"fields:{user_id}")
+        profile = json.loads(raw) if raw is not None else {}
+        profile.update(values)
+        self.backend.set(f"fields:{user_id}", json.dumps(profile).encode())
+
+    def invalidate(self, user_id: str):
+        self.backend.delete(f"profile:{user_id}", f"fields:{user_id}")
+
+    def invalidate_many(self, user_ids: Iterable[str]):
+        """One backend call (one lock, or one DEL) for a batch of users."""
+        keys = [k for uid in user_ids for k in (f"profile:{uid}", f"fields:{uid}")]
+        if keys:
+            self.backend.delete(*keys)
+
+    def stats(self) -> dict:
+        return self.backend.stats()
+
+
+profile_cache = ProfileCache(make_backend(PROFILE_CACHE_BACKEND))
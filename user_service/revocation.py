@@ -0,0 +1,123 @@
+"""Revoked access tokens, published as a Bloom filter.
+
+Access tokens are short-lived and verified without a database lookup. To
+end one early (logout, refresh token reuse), its ``jti`` or its session's
+``sid`` goes into the revoked_tokens table until every access token it
+could match has expired.
+
+The live ids are compiled into a Bloom filter. It is published at
+/.well-known/revocations.json, and every verifier checks tokens against it
+in memory. A filter hit is confirmed with an exact lookup. Other services
+do that through GET /auth/revocations/{id}.
+
+Each worker rebuilds its filter from the table at most every
+REVOCATION_REBUILD_SECONDS. A rebuild drops expired entries and picks up
+revocations made by other workers. Revocations made in this worker are
+added to its filter straight away.
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from bloom import BloomFilter
+from config import REVOCATION_REBUILD_SECONDS, REVOCATION_FALSE_POSITIVE_RATE, REVOCATION_MIN_CAPACITY
+from database import SessionLocal
+from models.user import RevokedToken
+
+class RevocationList:
+    def __init__(self, rebuild_every: float, false_positive_rate: float, min_capacity: int):
+        self.rebuild_every = rebuild_every
+        self.false_positive_rate = false_positive_rate
+        self.min_capacity = min_capacity
+        self._lock = threading.Lock()
+        self._filter: Optional[BloomFilter] = None
+        self._built_at = float("-inf")
+        self._generated_at: Optional[float] = None
+        self.count = 0
+        self.filter_hits = 0
+        self.false_positives = 0
+
+    def _rebuild(self):
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            db.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete(synchronize_session=False)
+            db.commit()
+            ids = [token_id for (token_id,) in db.query(RevokedToken.id)]
+        finally:
+            db.close()
+        # Headroom for ids added before the next rebuild
+        capacity = max(self.min_capacity, 2 * len(ids))
+        self._filter = BloomFilter.build(ids, capacity, self.false_positive_rate)
+        self.count = len(ids)
+        self._generated_at = time.time()
+
+    def filter(self) -> BloomFilter:
+        with self._lock:
+            now = time.monotonic()
+            if now - self._built_at >= self.rebuild_every:
+                self._rebuild()
+                self._built_at = now
+            return self._filter
+
+    def revoke(self, db: Session, token_ids: Iterable[str], expires_at: datetime):
+        """Record revocations in ``db``'s transaction; the caller commits."""
+        token_ids = [t for t in token_ids if t]
+        for token_id in token_ids:
+            existing = db.get(RevokedToken, token_id)
+            if existing is None:
+                db.add(RevokedToken(id=token_id, expires_at=expires_at))
+            elif existing.expires_at < expires_at:
+                existing.expires_at = expires_at
+        # Not self.filter(): a rebuild writes through its own connection, which
+        # would wait on the caller's open write transaction
+        with self._lock:
+            if self._filter is not None:
+                for token_id in token_ids:
+                    self._filter.add(token_id)
+
+    def is_revoked(self, token_ids: Iterable[Optional[str]]) -> bool:
+        candidates: List[str] = [t for t in token_ids if t and t in self.filter()]
+        if not candidates:
+            return False
+        self.filter_hits += 1
+        db = SessionLocal()
+        try:
+            revoked = db.query(RevokedToken.id).filter(
+                RevokedToken.id.in_(candidates),
+                RevokedToken.expires_at > datetime.utcnow(),
+            ).first() is not None
+        finally:
+            db.close()
+        if not revoked:
+            self.false_positives += 1
+        return revoked
+
+    def published(self) -> dict:
+        bloom = self.filter()
+        return {
+            "generated_at": self._generated_at,
+            "count": self.count,
+            "refresh_seconds": self.rebuild_every,
+            **bloom.to_dict(),
+        }
+
+    def stats(self) -> dict:
+        bloom = self.filter()
+        return {
+            "count": self.count,
+            "size_bytes": len(bloom.bits),
+            "hashes": bloom.hashes,
+            "filter_hits": self.filter_hits,
+            "false_positives": self.false_positives,
+        }
+
+
+revocation_list = RevocationList(
+    REVOCATION_REBUILD_SECONDS,
+    REVOCATION_FALSE_POSITIVE_RATE,
+    REVOCATION_MIN_CAPACITY,
+)
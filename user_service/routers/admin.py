@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_, update
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel
+from datetime import datetime
+import base64
+import json
 
-from database import get_db
+from config import BULK_REVIEW_MAX_IDS
+from database import get_db, SessionLocal
 from models.user import User
+from profile_cache import profile_cache
 from schemas.user import RegistrationOut
 
 router = APIRouter()
@@ -33,21 +40,209 @@ class RejectPayload(BaseModel):
     password: str
     reason: str
 
+# -------------------------------
+# Payloads for bulk review
+# -------------------------------
+class BulkApprovePayload(BaseModel):
+    email: str
+    password: str
+    ids: List[str]
+
+class BulkRejectItem(BaseModel):
+    id: str
+    reason: Optional[str] = None  # falls back to the payload's reason
+
+class BulkRejectPayload(BaseModel):
+    email: str
+    password: str
+    items: List[BulkRejectItem]
+    reason: Optional[str] = None
+
+# -------------------------------
+# Keyset pagination
+# -------------------------------
+# Registrations are listed newest first by (created_at, id); the cursor is
+# the last row's key, so each page is an index range scan on
+# ix_users_status_created_id / ix_users_created_id however deep it is.
+# Rows from before created_at had a default have NULL there; they sort last
+# and the cursor carries the NULL explicitly.
+MAX_PAGE_SIZE = 500
+EXPORT_BATCH_SIZE = 1000
+
+def encode_cursor(created_at: Optional[datetime], user_id: str) -> str:
+    raw = json.dumps([created_at.isoformat() if created_at else None, user_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, user_id = json.loads(raw)
+        if created_at is None:
+            return None, str(user_id)
+        return datetime.fromisoformat(created_at), str(user_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def registrations_page(db: Session, status: Optional[str], after: Optional[Tuple[Optional[datetime], str]], limit: int):
+    query = db.query(User)
+    if status:
+        query = query.filter(User.registration_status == status)
+    if after is not None:
+        created_at, user_id = after
+        if created_at is None:
+            # Already into the NULL rows at the end
+            query = query.filter(User.created_at.is_(None), User.id < user_id)
+        else:
+            query = query.filter(or_(
+                User.created_at < created_at,
+                and_(User.created_at == created_at, User.id < user_id),
+                User.created_at.is_(None),
+            ))
+    return query.order_by(User.created_at.desc().nulls_last(), User.id.desc()).limit(limit).all()
+
+def registration_dict(user: User) -> dict:
+    return RegistrationOut.model_validate(user).model_dump(mode="json")
+
 # -------------------------------
 # Admin APIs
 # -------------------------------
 
 @router.get("/registrations", response_model=List[RegistrationOut])
 def list_registrations(
+    response: Response,
     creds: AdminCreds = Body(...),  # credentials sent in JSON body
     status: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
+    """One page of registrations, newest first.
+
+    The body stays a plain list; when there are more rows, the cursor for
+    the next page is returned in the X-Next-Cursor header.
+    """
     admin_check(creds)  # ✅ check credentials inside endpoint
-    query = db.query(User)
-    if status:
-        query = query.filter(User.registration_status == status)
-    return query.order_by(User.created_at.desc()).all()
+    after = decode_cursor(cursor) if cursor else None
+    users = registrations_page(db, status, after, limit + 1)
+    if len(users) > limit:
+        users = users[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(users[-1].created_at, users[-1].id)
+    return users
+
+
+@router.get("/registrations/export")
+def export_registrations(
+    creds: AdminCreds = Body(...),
+    status: Optional[str] = None,
+):
+    """Every matching registration as NDJSON, streamed in keyset batches."""
+    admin_check(creds)
+
+    def rows():
+        # Own session: the response outlives the request's dependency scope
+        db = SessionLocal()
+        try:
+            after = None
+            while True:
+                users = registrations_page(db, status, after, EXPORT_BATCH_SIZE)
+                if not users:
+                    break
+                yield "".join(json.dumps(registration_dict(u)) + "\n" for u in users)
+                after = (users[-1].created_at, users[-1].id)
+                # Drop the batch from the identity map before the next one
+                db.expunge_all()
+        finally:
+            db.close()
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+
+def current_statuses(db: Session, ids: List[str]) -> Dict[str, str]:
+    rows = db.query(User.id, User.registration_status).filter(User.id.in_(ids)).all()
+    return {user_id: status for user_id, status in rows}
+
+def check_bulk_size(ids: List[str]):
+    if not ids:
+        raise HTTPException(status_code=400, detail="No ids given")
+    if len(ids) > BULK_REVIEW_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_REVIEW_MAX_IDS} ids per request")
+
+
+# Declared before /registrations/{user_id}/... so "bulk" isn't taken as an id
+
+@router.post("/registrations/bulk/approve")
+def bulk_approve_registrations(payload: BulkApprovePayload, db: Session = Depends(get_db)):
+    """Approve many registrations in one transaction.
+
+    Returns ``{"results": {id: outcome}}`` with outcome one of "approved",
+    "already_approved" or "not_found"; the request as a whole only fails on
+    bad credentials or an oversized batch.
+    """
+    admin_check(AdminCreds(email=payload.email, password=payload.password))
+    ids = list(dict.fromkeys(payload.ids))
+    check_bulk_size(ids)
+
+    statuses = current_statuses(db, ids)
+    pending = [i for i in ids if i in statuses and statuses[i] != "approved"]
+    if pending:
+        db.execute(
+            update(User)
+            .where(User.id.in_(pending), User.registration_status != "approved")
+            .values(registration_status="approved", verified=True,
+                    kyc_level="verified", rejection_reason=None),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        profile_cache.invalidate_many(pending)
+
+    results = {}
+    for user_id in ids:
+        if user_id not in statuses:
+            results[user_id] = "not_found"
+        elif statuses[user_id] == "approved":
+            results[user_id] = "already_approved"
+        else:
+            results[user_id] = "approved"
+    return {"results": results}
+
+
+@router.post("/registrations/bulk/reject")
+def bulk_reject_registrations(payload: BulkRejectPayload, db: Session = Depends(get_db)):
+    """Reject many registrations in one transaction, each with its own reason.
+
+    Items without a reason use the payload-level ``reason``. Ids are
+    grouped by reason, so a batch sharing one reason is a single UPDATE.
+    Outcomes are "rejected", "not_found" or "missing_reason".
+    """
+    admin_check(AdminCreds(email=payload.email, password=payload.password))
+    # Last entry wins for a repeated id
+    reasons = {item.id: item.reason or payload.reason for item in payload.items}
+    ids = list(reasons)
+    check_bulk_size(ids)
+
+    statuses = current_statuses(db, ids)
+    by_reason: Dict[str, List[str]] = {}
+    results = {}
+    for user_id in ids:
+        if user_id not in statuses:
+            results[user_id] = "not_found"
+        elif not reasons[user_id]:
+            results[user_id] = "missing_reason"
+        else:
+            by_reason.setdefault(reasons[user_id], []).append(user_id)
+            results[user_id] = "rejected"
+
+    if by_reason:
+        for reason, group in by_reason.items():
+            db.execute(
+                update(User)
+                .where(User.id.in_(group))
+                .values(registration_status="rejected", verified=False, rejection_reason=reason),
+                execution_options={"synchronize_session": False},
+            )
+        db.commit()
+        profile_cache.invalidate_many(u for group in by_reason.values() for u in group)
+    return {"results": results}
 
 
 @router.get("/registrations/{user_id}", response_model=RegistrationOut)
@@ -83,6 +278,7 @@ def approve_registration(
 
     db.commit()
     db.refresh(user)
+    profile_cache.invalidate(user_id)
     return user
 
 
@@ -105,4 +301,5 @@ def reject_registration(
 
     db.commit()
     db.refresh(user)
+    profile_cache.invalidate(user_id)
     return user
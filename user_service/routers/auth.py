@@ -1,42 +1,57 @@
 from fastapi import APIRouter, HTTPException, Depends, Request, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr
 from datetime import datetime, timedelta, timezone
+from typing import Optional
+import hashlib
 import jwt
 import os
+import secrets
 import uuid
-import shutil
 import logging
 
 from database import get_db
-from models.user import User
-from config import UPLOAD_DIR
+from models.user import User, RefreshToken
+from config import MAX_DOCUMENT_BYTES
+from deadline import check_deadline
+from passwords import password_hasher, HasherBusy, DeadlineExpired
+from revocation import revocation_list
+from signing_keys import key_ring, SIGNING_ALGORITHM
+from storage import store_upload, UploadTooLarge
 
 # ------------------------------------------------------------------
 # CONFIG
 # ------------------------------------------------------------------
-SECRET_KEY = os.getenv("USER_SERVICE_SECRET", "dev-secret-key")
-ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "120"))
+# Tokens are signed with the rotating RS256 keys in signing_keys.py and can
+# be verified anywhere from /.well-known/jwks.json. HS256 tokens issued with
+# the old shared secret are rejected unless ACCEPT_LEGACY_TOKENS=1 and the
+# secret is in USER_SERVICE_SECRET; each one accepted is logged.
+SECRET_KEY = os.getenv("USER_SERVICE_SECRET")
+ACCEPT_LEGACY_TOKENS = os.getenv("ACCEPT_LEGACY_TOKENS", "0") == "1"
+# Access tokens are short-lived; clients renew them at /auth/refresh with the
+# refresh token issued at login. Revocation is in revocation.py.
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 # ------------------------------------------------------------------
-# PASSWORD CONTEXT (ARGON2 — FIXED)
+# PASSWORD HASHING (ARGON2, on the bounded pool in passwords.py)
 # ------------------------------------------------------------------
-pwd_context = CryptContext(
-    schemes=["argon2"],
-    deprecated="auto",
-)
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-def verify_password(password: str, password_hash: str) -> bool:
-    return pwd_context.verify(password, password_hash)
+async def _password_job(job):
+    try:
+        return await job
+    except HasherBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many login attempts in progress, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    except DeadlineExpired:
+        raise HTTPException(status_code=504, detail="Request deadline exceeded")
 
 # ------------------------------------------------------------------
 # SCHEMAS
@@ -53,24 +68,95 @@ class LoginData(BaseModel):
 class TokenOut(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    expires_in: int                # access token lifetime, seconds
+    refresh_token: str
     user_id: str
     email: EmailStr
 
+class RefreshData(BaseModel):
+    refresh_token: str
+
 # ------------------------------------------------------------------
 # HELPERS
 # ------------------------------------------------------------------
-def create_access_token(user_id: str, email: str) -> str:
+def create_access_token(user_id: str, email: str, session_id: Optional[str] = None) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    payload = {"sub": user_id, "email": email, "exp": expire}
-    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+    # jti and sid let a single token or a whole session be revoked
+    payload = {"sub": user_id, "email": email, "exp": expire, "jti": uuid.uuid4().hex}
+    if session_id:
+        payload["sid"] = session_id
+    key = key_ring.current()
+    return jwt.encode(payload, key.private_key, algorithm=SIGNING_ALGORITHM, headers={"kid": key.kid})
+
+def decode_access_token(token: str) -> dict:
+    """Verified claims of an access token; raises jwt.InvalidTokenError."""
+    kid = jwt.get_unverified_header(token).get("kid")
+    if kid is None:
+        if not (ACCEPT_LEGACY_TOKENS and SECRET_KEY):
+            raise jwt.InvalidTokenError("Token has no kid")
+        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+        logger.warning(f"Accepted legacy HS256 token for user {payload.get('sub')}")
+        return payload
+    public_key = key_ring.public_key(kid)
+    if public_key is None:
+        raise jwt.InvalidTokenError("Unknown signing key")
+    payload = jwt.decode(token, public_key, algorithms=[SIGNING_ALGORITHM])
+    if revocation_list.is_revoked([payload.get("jti"), payload.get("sid")]):
+        raise jwt.InvalidTokenError("Token revoked")
+    return payload
+
+def bearer_claims(request: Request) -> dict:
+    auth = request.headers.get("Authorization")
+    if not auth or not auth.lower().startswith("bearer "):
+        raise HTTPException(status_code=401, detail="Missing bearer token")
+    try:
+        return decode_access_token(auth.split(" ", 1)[1])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+def _refresh_token_id(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def issue_tokens(db: Session, user: User, session_id: Optional[str] = None) -> TokenOut:
+    """A new refresh token (stored hashed) and access token for a session.
 
-def _persist_upload(file: UploadFile, target_dir: str) -> str:
-    os.makedirs(target_dir, exist_ok=True)
-    filename = f"{uuid.uuid4()}_{file.filename}"
-    filepath = os.path.join(target_dir, filename)
-    with open(filepath, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    return filepath
+    Without ``session_id`` a new session is started.
+    """
+    session_id = session_id or uuid.uuid4().hex
+    refresh_token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        id=_refresh_token_id(refresh_token),
+        user_id=user.id,
+        family_id=session_id,
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    db.commit()
+    return TokenOut(
+        access_token=create_access_token(user.id, user.email, session_id),
+        expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        refresh_token=refresh_token,
+        user_id=user.id,
+        email=user.email,
+    )
+
+def revoke_sessions(db: Session, session_ids, token_ids=()):
+    """End sessions: their refresh tokens stop working and the access tokens
+    already issued in them are revoked until they would have expired."""
+    session_ids = list(session_ids)
+    now = datetime.utcnow()
+    if session_ids:
+        db.query(RefreshToken).filter(
+            RefreshToken.family_id.in_(session_ids),
+            RefreshToken.revoked_at.is_(None),
+        ).update({"revoked_at": now}, synchronize_session=False)
+    revocation_list.revoke(
+        db,
+        [*session_ids, *token_ids],
+        expires_at=now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+    db.commit()
 
 # ------------------------------------------------------------------
 # ROUTES
@@ -90,13 +176,11 @@ async def signup(
 ):
     try:
         user_id = str(uuid.uuid4())
-        password_hash = hash_password(password)
-
-        id_dir = os.path.join(UPLOAD_DIR, "id_documents")
-        selfie_dir = os.path.join(UPLOAD_DIR, "selfies")
+        check_deadline()
+        password_hash = await _password_job(password_hasher.hash(password))
 
-        id_document_path = _persist_upload(id_document, id_dir)
-        selfie_path = _persist_upload(selfie, selfie_dir)
+        id_document_path = (await store_upload(id_document, "id_documents", MAX_DOCUMENT_BYTES)).path
+        selfie_path = (await store_upload(selfie, "selfies", MAX_DOCUMENT_BYTES)).path
 
         new_user = User(
             id=user_id,
@@ -114,6 +198,7 @@ async def signup(
             selfie_path=selfie_path,
         )
 
+        check_deadline()
         db.add(new_user)
         try:
             db.commit()
@@ -131,18 +216,24 @@ async def signup(
 
     except HTTPException:
         raise
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception:
         logger.exception("Signup failed")
         raise HTTPException(status_code=500, detail="Signup failed")
 
 @router.post("/login", response_model=TokenOut)
-def login(data: LoginData, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email).first()
+async def login(data: LoginData, db: Session = Depends(get_db)):
+    # Async so that no threadpool worker sits idle while argon2 runs
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.email == data.email).first()
+    )
 
     if not user or not user.password_hash:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    if not verify_password(data.password, user.password_hash):
+    check_deadline()
+    if not await _password_job(password_hasher.verify(data.password, user.password_hash)):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     if user.registration_status != "approved":
@@ -151,31 +242,71 @@ def login(data: LoginData, db: Session = Depends(get_db)):
             detail=f"Registration {user.registration_status or 'pending'}"
         )
 
-    token = create_access_token(user_id=user.id, email=user.email)
+    return await run_in_threadpool(issue_tokens, db, user)
 
-    return TokenOut(
-        access_token=token,
-        user_id=user.id,
-        email=user.email,
-    )
+@router.post("/refresh", response_model=TokenOut)
+def refresh(data: RefreshData, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new access token and refresh token.
 
-@router.post("/verify-token")
-def verify_token(request: Request):
-    auth = request.headers.get("Authorization")
+    Each refresh token works once. Presenting one that was already
+    exchanged means it was copied, so the whole session is revoked.
+    """
+    now = datetime.utcnow()
+    row = db.get(RefreshToken, _refresh_token_id(data.refresh_token))
+    if row is None or row.revoked_at is not None or row.expires_at <= now:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
 
-    if not auth or not auth.lower().startswith("bearer "):
-        raise HTTPException(status_code=401, detail="Missing bearer token")
+    # Conditional update, so only one of two concurrent refreshes wins
+    claimed = db.query(RefreshToken).filter(
+        RefreshToken.id == row.id,
+        RefreshToken.used_at.is_(None),
+    ).update({"used_at": now}, synchronize_session=False)
+    if not claimed:
+        logger.warning(f"Refresh token reuse for user {row.user_id}; revoking session {row.family_id}")
+        revoke_sessions(db, [row.family_id])
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
 
-    token = auth.split(" ", 1)[1]
+    user = db.get(User, row.user_id)
+    if user is None or user.registration_status != "approved":
+        revoke_sessions(db, [row.family_id])
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return {
-            "user_id": payload.get("sub"),
-            "email": payload.get("email"),
-            "token_valid": True,
-        }
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+    return issue_tokens(db, user, session_id=row.family_id)
+
+@router.post("/logout")
+def logout(data: RefreshData, db: Session = Depends(get_db)):
+    """End the session the refresh token belongs to."""
+    row = db.get(RefreshToken, _refresh_token_id(data.refresh_token))
+    if row is not None:
+        revoke_sessions(db, [row.family_id])
+    return {"revoked": row is not None}
+
+@router.post("/logout-all")
+def logout_all(request: Request, db: Session = Depends(get_db)):
+    """End every session of the caller, including the current one."""
+    claims = bearer_claims(request)
+    session_ids = [
+        family_id for (family_id,) in db.query(RefreshToken.family_id).filter(
+            RefreshToken.user_id == claims["sub"],
+            RefreshToken.revoked_at.is_(None),
+        ).distinct()
+    ]
+    revoke_sessions(db, session_ids, token_ids=[claims.get("jti")])
+    return {"revoked_sessions": len(session_ids)}
+
+@router.get("/revocations/{token_id}")
+def revocation_status(token_id: str):
+    """Exact check behind a hit in the published revocation filter."""
+    return {"id": token_id, "revoked": revocation_list.is_revoked([token_id])}
+
+@router.post("/verify-token")
+def verify_token(request: Request):
+    payload = bearer_claims(request)
+    return {
+        "user_id": payload.get("sub"),
+        "email": payload.get("email"),
+        # Lets callers that cache the result check it against the revocation list
+        "jti": payload.get("jti"),
+        "sid": payload.get("sid"),
+        "token_valid": True,
+    }
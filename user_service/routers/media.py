@@ -0,0 +1,142 @@
+from fastapi import APIRouter, HTTPException, Request, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+from typing import Optional
+import jwt
+import os
+
+from config import UPLOAD_DIR, MEDIA_ACCEL_REDIRECT
+from database import get_db
+from media import FileRangeResponse, parse_range, not_modified, http_date
+from models.user import User
+from routers.admin import AdminCreds, admin_check
+from routers.auth import decode_access_token
+from storage import object_from_name
+
+router = APIRouter()
+
+# Stored objects are content-addressed, so a URL's bytes never change
+PUBLIC_CACHE = "public, max-age=31536000, immutable"
+# ID documents and selfies are revalidated on every use, so losing access
+# (logout, rejection) also ends access to the browser's copy; the ETag
+# still spares re-sending the body while access lasts
+PRIVATE_CACHE = "private, no-cache"
+
+# namespace -> User column that links a private document to its owner
+PRIVATE_NAMESPACES = {
+    "id_documents": User.id_document_path,
+    "selfies": User.selfie_path,
+}
+PUBLIC_NAMESPACES = {"photos"}
+
+# The only types media is served as; anything else is a download. Stored
+# extensions are sniffed from content (storage.sniff_extension), but files
+# stored before that kept the client's extension.
+IMAGE_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+
+# -------------------------------
+# Authorization
+# -------------------------------
+def caller_id(request: Request) -> Optional[str]:
+    auth = request.headers.get("Authorization")
+    if not auth or not auth.lower().startswith("bearer "):
+        return None
+    try:
+        payload = decode_access_token(auth.split(" ", 1)[1])
+    except jwt.InvalidTokenError:
+        return None
+    return payload.get("sub")
+
+def is_admin(request: Request) -> bool:
+    email = request.headers.get("X-Admin-Email")
+    password = request.headers.get("X-Admin-Password")
+    if not email or not password:
+        return False
+    try:
+        return admin_check(AdminCreds(email=email, password=password))
+    except HTTPException:
+        return False
+
+def can_read_document(request: Request, namespace: str, path: str, db: Session) -> bool:
+    """ID documents and selfies are visible to their owner and to admins only."""
+    if is_admin(request):
+        return True
+    user_id = caller_id(request)
+    if user_id is None:
+        return False
+    column = PRIVATE_NAMESPACES[namespace]
+    return db.query(User.id).filter(User.id == user_id, column == path).first() is not None
+
+# -------------------------------
+# Serving
+# -------------------------------
+@router.api_route("/media/{namespace}/{name}", methods=["GET", "HEAD"])
+async def serve_media(namespace: str, name: str, request: Request, db: Session = Depends(get_db)):
+    path = object_from_name(namespace, name)
+    if path is None or (namespace not in PUBLIC_NAMESPACES and namespace not in PRIVATE_NAMESPACES):
+        raise HTTPException(status_code=404, detail="Not found")
+
+    if namespace in PRIVATE_NAMESPACES:
+        allowed = await run_in_threadpool(can_read_document, request, namespace, path, db)
+        if not allowed:
+            # Same answer as a missing file, so document URLs can't be probed
+            raise HTTPException(status_code=404, detail="Not found")
+
+    try:
+        st = await run_in_threadpool(os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Not found")
+
+    # The name is <sha256>[_variant]: a strong validator by construction
+    etag = f'"{os.path.splitext(name)[0]}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(st.st_mtime),
+        "Cache-Control": PUBLIC_CACHE if namespace in PUBLIC_NAMESPACES else PRIVATE_CACHE,
+        # Never let a browser decide an upload is HTML or script
+        "X-Content-Type-Options": "nosniff",
+    }
+    media_type = IMAGE_TYPES.get(os.path.splitext(name)[1].lower())
+    if media_type is None:
+        media_type = "application/octet-stream"
+        headers["Content-Disposition"] = "attachment"
+    if namespace in PRIVATE_NAMESPACES:
+        headers["Vary"] = "Authorization"
+
+    if not_modified(
+        request.headers.get("if-none-match"), request.headers.get("if-modified-since"), etag, st.st_mtime
+    ):
+        return Response(status_code=304, headers=headers)
+
+    if MEDIA_ACCEL_REDIRECT:
+        # nginx sends the file (sendfile, ranges) after we've authorized it
+        relative = os.path.relpath(path, UPLOAD_DIR).replace(os.sep, "/")
+        headers["X-Accel-Redirect"] = f"{MEDIA_ACCEL_REDIRECT.rstrip('/')}/{relative}"
+        return Response(headers=headers, media_type=media_type)
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    # A stale If-Range means the client's partial copy is useless: send it all
+    if if_range is None or if_range == etag:
+        try:
+            byte_range = parse_range(request.headers.get("range"), st.st_size)
+        except ValueError:
+            return Response(
+                status_code=416, headers=dict(headers, **{"Content-Range": f"bytes */{st.st_size}"})
+            )
+
+    return FileRangeResponse(
+        path,
+        st.st_size,
+        byte_range,
+        headers,
+        media_type=media_type,
+        head_only=request.method == "HEAD",
+    )
@@ -1,38 +1,73 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from sqlalchemy.orm import Session
-from config import UPLOAD_DIR
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, selectinload
+from config import MAX_PHOTO_BYTES
 from database import get_db
+from derivatives import generate_variants
 from models.user import User, Photo
-import uuid, os, shutil
+from profile_cache import profile_cache
+from storage import store_upload, media_url, UploadTooLarge
 
 router = APIRouter()
 
+def photo_out(photo: Photo) -> dict:
+    return {
+        "id": photo.id,
+        "photo_url": media_url(photo.filepath),
+        # Empty until the background resize has finished
+        "variants": {
+            v.name: {"url": media_url(v.filepath), "width": v.width, "height": v.height}
+            for v in photo.variants
+        },
+    }
+
 @router.post("/{user_id}/photos")
-def upload_photo(user_id: str, file: UploadFile = File(...), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
+async def upload_photo(
+    user_id: str,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+):
+    user = await run_in_threadpool(lambda: db.query(User).filter(User.id == user_id).first())
     if not user:
         raise HTTPException(404, "User not found")
 
-    if not os.path.exists(UPLOAD_DIR):
-        os.makedirs(UPLOAD_DIR)
+    try:
+        stored = await store_upload(file, "photos", MAX_PHOTO_BYTES)
+    except UploadTooLarge as e:
+        raise HTTPException(413, str(e))
+    filepath = stored.path
 
-    filename = f"{uuid.uuid4()}_{file.filename}"
-    filepath = os.path.join(UPLOAD_DIR, filename)
+    def save() -> Photo:
+        # Re-uploading the same image is a no-op
+        existing = db.query(Photo).filter(Photo.user_id == user_id, Photo.filepath == filepath).first()
+        if existing:
+            return existing
 
-    with open(filepath, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+        photo = Photo(user_id=user_id, filepath=filepath)
+        db.add(photo)
 
-    photo = Photo(user_id=user_id, filepath=filepath)
-    db.add(photo)
+        if user.profile_photo is None:
+            user.profile_photo = filepath
 
-    if user.profile_photo is None:
-        user.profile_photo = filepath
+        db.commit()
+        profile_cache.invalidate(user_id)
+        db.refresh(photo)
+        return photo
 
-    db.commit()
+    photo = await run_in_threadpool(save)
+    out = await run_in_threadpool(photo_out, photo)
+    if not out["variants"]:
+        background_tasks.add_task(generate_variants, photo.id, filepath)
 
-    return {"photo_url": filepath}
+    return out
 
 @router.get("/{user_id}/photos")
 def list_photos(user_id: str, db: Session = Depends(get_db)):
-    photos = db.query(Photo).filter(Photo.user_id == user_id).all()
-    return [p.filepath for p in photos]
+    photos = (
+        db.query(Photo)
+        .options(selectinload(Photo.variants))
+        .filter(Photo.user_id == user_id)
+        .all()
+    )
+    return [photo_out(p) for p in photos]
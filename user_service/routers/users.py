@@ -1,14 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
+from config import BATCH_MAX_IDS
 from database import get_db
 from models.user import User
-from schemas.user import UserCreate, UserUpdate, UserOut
+from profile_cache import profile_cache
+from schemas.user import UserCreate, UserUpdate, UserOut, BatchLookup
+from storage import media_url
 import uuid
 from passlib.hash import bcrypt
 
 router = APIRouter()
 
+# Columns a batch lookup may project (same exposure as GET /users/{id})
+PROFILE_FIELDS = tuple(UserOut.model_fields)
+
 @router.post("/", response_model=UserOut)
 def create_user(data: UserCreate, db: Session = Depends(get_db)):
     user_id = str(uuid.uuid4())
@@ -28,12 +34,57 @@ def create_user(data: UserCreate, db: Session = Depends(get_db)):
     db.refresh(new_user)
     return new_user
 
+@router.post("/batch")
+def batch_get_users(data: BatchLookup, db: Session = Depends(get_db)):
+    """Profiles for up to BATCH_MAX_IDS users in one query.
+
+    Only the requested columns are loaded and returned. Users found in the
+    profile cache with those fields are not queried at all.
+    """
+    ids = list(dict.fromkeys(data.ids))
+    if len(ids) > BATCH_MAX_IDS:
+        raise HTTPException(400, f"At most {BATCH_MAX_IDS} ids per request")
+
+    fields = data.fields or list(PROFILE_FIELDS)
+    unknown = [f for f in fields if f not in PROFILE_FIELDS]
+    if unknown:
+        raise HTTPException(400, f"Unknown fields: {', '.join(unknown)}")
+    fields = list(dict.fromkeys(["id", *fields]))
+
+    found = {}
+    misses = []
+    for user_id in ids:
+        cached = profile_cache.get(user_id, fields)
+        if cached is not None:
+            found[user_id] = {f: cached[f] for f in fields}
+        else:
+            misses.append(user_id)
+
+    if misses:
+        columns = [getattr(User, f) for f in fields]
+        for row in db.query(*columns).filter(User.id.in_(misses)):
+            profile = dict(zip(fields, row))
+            if profile.get("profile_photo"):
+                profile["profile_photo"] = media_url(profile["profile_photo"])
+            profile_cache.merge(profile["id"], profile)
+            found[profile["id"]] = profile
+
+    return {
+        "users": [found[i] for i in ids if i in found],
+        "missing": [i for i in ids if i not in found],
+    }
+
 @router.get("/{user_id}", response_model=UserOut)
 def get_user(user_id: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(404, "User not found")
-    return user
+    # Cached as serialized UserOut, so a hit skips the query and validation
+    body = profile_cache.get_profile(user_id)
+    if body is None:
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            raise HTTPException(404, "User not found")
+        body = UserOut.model_validate(user).model_dump_json().encode()
+        profile_cache.put_profile(user_id, body)
+    return Response(content=body, media_type="application/json")
 
 @router.put("/{user_id}", response_model=UserOut)
 def update_user(user_id: str, data: UserUpdate, db: Session = Depends(get_db)):
@@ -47,4 +98,5 @@ def update_user(user_id: str, data: UserUpdate, db: Session = Depends(get_db)):
 
     db.commit()
     db.refresh(user)
+    profile_cache.invalidate(user_id)
     return user
@@ -1,7 +1,13 @@
-from pydantic import BaseModel, EmailStr, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, EmailStr, ConfigDict, field_serializer
+from typing import List, Optional
 from datetime import datetime
 
+from storage import media_url
+
+
+def _media_url(path: Optional[str]) -> Optional[str]:
+    return media_url(path) if path else path
+
 class UserCreate(BaseModel):
     name: str
     email: EmailStr
@@ -30,6 +36,11 @@ class UserOut(BaseModel):
     rejection_reason: Optional[str]
     model_config = ConfigDict(from_attributes=True)
 
+    # Stored as filesystem paths; clients get the URL they're served from
+    @field_serializer("profile_photo")
+    def serialize_media(self, path: Optional[str]) -> Optional[str]:
+        return _media_url(path)
+
 
 class RegistrationOut(BaseModel):
     id: str
@@ -44,5 +55,15 @@ class RegistrationOut(BaseModel):
     selfie_path: Optional[str]
     registration_status: str
     rejection_reason: Optional[str]
-    created_at: datetime
+    created_at: Optional[datetime]  # NULL on rows older than its default
     model_config = ConfigDict(from_attributes=True)
+
+    @field_serializer("profile_photo", "id_document_path", "selfie_path")
+    def serialize_media(self, path: Optional[str]) -> Optional[str]:
+        return _media_url(path)
+
+
+class BatchLookup(BaseModel):
+    ids: List[str]
+    # Subset of UserOut fields to return; all of them when omitted
+    fields: Optional[List[str]] = None
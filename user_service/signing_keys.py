@@ -0,0 +1,165 @@
+"""Rotating RS256 keys for signing access tokens, published as a JWKS.
+
+Private keys live in JWT_KEY_DIR as ``<kid>.pem``; the kid starts with the
+key's creation time. Every JWT_KEY_ROTATION_DAYS a new key is generated. It
+is published straight away but only used for signing after
+JWT_KEY_PUBLISH_AHEAD_MINUTES, by which time verifiers caching the key set
+have picked it up. The key it replaces stays published for another
+JWT_KEY_RETAIN_MINUTES so tokens it signed keep verifying until they expire.
+
+Workers share the directory: each reloads it when its mtime changes, so a
+key generated by one worker is published (and used) by all of them.
+"""
+import logging
+import os
+import secrets
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from config import (
+    JWT_KEY_DIR,
+    JWT_KEY_ROTATION_DAYS,
+    JWT_KEY_PUBLISH_AHEAD_MINUTES,
+    JWT_KEY_RETAIN_MINUTES,
+    JWT_KEY_SIZE,
+)
+
+SIGNING_ALGORITHM = "RS256"
+
+logger = logging.getLogger(__name__)
+
+
+class SigningKey(NamedTuple):
+    kid: str
+    created: float
+    private_key: rsa.RSAPrivateKey
+
+    def public_jwk(self) -> dict:
+        jwk = jwt.algorithms.RSAAlgorithm.to_jwk(self.private_key.public_key(), as_dict=True)
+        jwk.update({"kid": self.kid, "use": "sig", "alg": SIGNING_ALGORITHM})
+        return jwk
+
+
+class KeyRing:
+    def __init__(
+        self,
+        directory: str,
+        rotate_after: float,
+        publish_ahead: float,
+        retain: float,
+        key_size: int = 2048,
+    ):
+        self.directory = directory
+        self.rotate_after = rotate_after
+        self.publish_ahead = publish_ahead
+        self.retain = retain
+        self.key_size = key_size
+        self._lock = threading.Lock()
+        self._keys: List[SigningKey] = []  # oldest first
+        self._by_kid: Dict[str, SigningKey] = {}
+        self._jwks: Optional[dict] = None
+        self._dir_mtime = None
+
+    # ---- loading ----
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.directory).st_mtime_ns
+        except FileNotFoundError:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            mtime = os.stat(self.directory).st_mtime_ns
+        if mtime == self._dir_mtime:
+            return
+        keys = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".pem"):
+                continue
+            kid = name[:-4]
+            try:
+                created = float(kid.split("-", 1)[0])
+                with open(os.path.join(self.directory, name), "rb") as f:
+                    private_key = serialization.load_pem_private_key(f.read(), password=None)
+            except (ValueError, OSError) as e:
+                logger.warning(f"Skipping signing key {name}: {e}")
+                continue
+            keys.append(SigningKey(kid, created, private_key))
+        keys.sort(key=lambda k: k.created)
+        self._keys = keys
+        self._by_kid = {k.kid: k for k in keys}
+        self._jwks = None
+        self._dir_mtime = mtime
+
+    def _generate(self) -> SigningKey:
+        now = time.time()
+        kid = f"{int(now)}-{secrets.token_hex(4)}"
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=self.key_size)
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        # Written aside and renamed so other workers never read a partial key
+        path = os.path.join(self.directory, f"{kid}.pem")
+        tmp = f"{path}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(pem)
+        os.replace(tmp, path)
+        logger.info(f"Generated signing key {kid}")
+        return SigningKey(kid, now, private_key)
+
+    def _prune(self):
+        """Delete keys superseded for longer than the retention period."""
+        now = time.time()
+        removed = False
+        for older, newer in zip(self._keys, self._keys[1:]):
+            if now - (newer.created + self.publish_ahead) > self.retain:
+                try:
+                    os.remove(os.path.join(self.directory, f"{older.kid}.pem"))
+                except FileNotFoundError:
+                    pass
+                removed = True
+        if removed:
+            self._reload_if_changed()
+
+    # ---- public API ----
+    def current(self) -> SigningKey:
+        """The key to sign with, staging its successor first if it is due."""
+        with self._lock:
+            self._reload_if_changed()
+            now = time.time()
+            if not self._keys or now - self._keys[-1].created >= self.rotate_after - self.publish_ahead:
+                self._generate()
+                self._reload_if_changed()
+            self._prune()
+            for key in reversed(self._keys):
+                if now - key.created >= self.publish_ahead:
+                    return key
+            # First start: nothing has been published for long yet
+            return self._keys[-1]
+
+    def public_key(self, kid: str):
+        with self._lock:
+            self._reload_if_changed()
+            key = self._by_kid.get(kid)
+        return key.private_key.public_key() if key else None
+
+    def jwks(self) -> dict:
+        self.current()
+        with self._lock:
+            if self._jwks is None:
+                self._jwks = {"keys": [k.public_jwk() for k in reversed(self._keys)]}
+            return self._jwks
+
+
+key_ring = KeyRing(
+    JWT_KEY_DIR,
+    rotate_after=JWT_KEY_ROTATION_DAYS * 86400,
+    publish_ahead=JWT_KEY_PUBLISH_AHEAD_MINUTES * 60,
+    retain=JWT_KEY_RETAIN_MINUTES * 60,
+    key_size=JWT_KEY_SIZE,
+)
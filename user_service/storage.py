@@ -0,0 +1,132 @@
+"""Content-addressed upload storage.
+
+Files are streamed to a temporary file in chunks while their SHA-256 is
+computed, then moved (atomically) to
+
+    <UPLOAD_DIR>/<namespace>/<h[0:2]>/<h[2:4]>/<sha256><ext>
+
+Two levels of sharding keep every directory small no matter how many files
+are stored, and identical uploads within a namespace resolve to the same
+path, so a duplicate only costs the temporary copy. Blocking file I/O runs
+in the threadpool, never on the event loop. ``<ext>`` is sniffed from the
+content and is only ever one of the image types in ``sniff_extension``.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from typing import NamedTuple
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+from config import UPLOAD_DIR
+
+CHUNK_SIZE = 256 * 1024
+
+# <sha256>[_<variant>][.<ext>], as written by store_upload and imaging.py
+_OBJECT_NAME = re.compile(r"^(?P<digest>[0-9a-f]{64})(?:_[a-z]+)?(?:\.[a-z0-9]{1,8})?$")
+
+# Where routers/media.py serves stored objects from
+MEDIA_URL_PREFIX = "/users/media"
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+class StoredFile(NamedTuple):
+    path: str
+    sha256: str
+    size: int
+    deduplicated: bool
+
+
+def sniff_extension(head: bytes) -> str:
+    """Image extension from a file's leading bytes, or "" if it isn't one we serve.
+
+    The client's filename and Content-Type are never trusted: a ".html" or
+    ".svg" "photo" would otherwise be served back with a scriptable type.
+    """
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return ".gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    return ""
+
+
+def object_path(namespace: str, digest: str, ext: str = "") -> str:
+    return os.path.join(UPLOAD_DIR, namespace, digest[:2], digest[2:4], digest + ext)
+
+
+def object_from_name(namespace: str, name: str):
+    """Path of a stored object from its URL name, or None if the name is not one of ours."""
+    match = _OBJECT_NAME.match(name)
+    if match is None:
+        return None
+    digest = match.group("digest")
+    return os.path.join(UPLOAD_DIR, namespace, digest[:2], digest[2:4], name)
+
+
+def media_url(filepath: str) -> str:
+    """Public URL for a stored path; paths from before content addressing are returned as-is."""
+    if filepath.startswith(f"{MEDIA_URL_PREFIX}/"):
+        return filepath
+    parts = os.path.normpath(filepath).split(os.sep)
+    if len(parts) >= 5 and _OBJECT_NAME.match(parts[-1]):
+        return f"{MEDIA_URL_PREFIX}/{parts[-4]}/{parts[-1]}"
+    return filepath
+
+
+def _commit(tmp_path: str, final_path: str) -> bool:
+    """Move the temp file into place; returns True if the content was already stored."""
+    if os.path.exists(final_path):
+        os.remove(tmp_path)
+        return True
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    os.replace(tmp_path, final_path)
+    return False
+
+
+async def store_upload(file: UploadFile, namespace: str, max_bytes: int) -> StoredFile:
+    """Copy an upload into the store, raising UploadTooLarge past ``max_bytes``."""
+    # Reject early when the multipart parser already knows the size
+    if getattr(file, "size", None) is not None and file.size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+
+    tmp_dir = os.path.join(UPLOAD_DIR, namespace, "tmp")
+    await run_in_threadpool(os.makedirs, tmp_dir, exist_ok=True)
+    fd, tmp_path = await run_in_threadpool(tempfile.mkstemp, dir=tmp_dir)
+    out = os.fdopen(fd, "wb")
+
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    try:
+        while True:
+            chunk = await file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            if len(head) < 16:
+                head += chunk[:16 - len(head)]
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            digest.update(chunk)
+            await run_in_threadpool(out.write, chunk)
+        await run_in_threadpool(out.close)
+    except BaseException:
+        out.close()
+        await run_in_threadpool(os.remove, tmp_path)
+        raise
+
+    sha256 = digest.hexdigest()
+    final_path = object_path(namespace, sha256, sniff_extension(head))
+    deduplicated = await run_in_threadpool(_commit, tmp_path, final_path)
+    return StoredFile(final_path, sha256, size, deduplicated)
@@ -0,0 +1,139 @@
+import pytest
+from fastapi import FastAPI
+
+from models.user import User
+from profile_cache import MemoryBackend, ProfileCache
+from routers import admin
+
+CREDS = {"email": admin.ADMIN_EMAIL, "password": admin.ADMIN_PASSWORD}
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/admin")
+    return app
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ProfileCache(MemoryBackend(maxsize=100, ttl=60))
+    monkeypatch.setattr(admin, "profile_cache", cache)
+    return cache
+
+
+def add_users(db, statuses):
+    for user_id, status in statuses.items():
+        db.add(User(
+            id=user_id, name=user_id, email=f"{user_id}@example.com", phone="555-0100",
+            gender="other", dob="1990-01-01", registration_status=status,
+        ))
+    db.commit()
+
+
+def user(db, user_id):
+    db.expire_all()
+    return db.query(User).filter(User.id == user_id).one()
+
+
+# ------------------------------------------------------------------
+# Approve
+# ------------------------------------------------------------------
+def test_approve_outcomes(db, http, app, cache):
+    add_users(db, {"p1": "pending", "r1": "rejected", "a1": "approved"})
+    res = http(app, "POST", "/admin/registrations/bulk/approve",
+               json={**CREDS, "ids": ["p1", "r1", "a1", "ghost"]})
+    assert res.status_code == 200
+    assert res.json() == {"results": {
+        "p1": "approved", "r1": "approved", "a1": "already_approved", "ghost": "not_found",
+    }}
+    for user_id in ("p1", "r1"):
+        approved = user(db, user_id)
+        assert (approved.registration_status, approved.verified, approved.kyc_level) == ("approved", True, "verified")
+        assert approved.rejection_reason is None
+
+
+def test_approve_collapses_duplicates(db, http, app, cache):
+    add_users(db, {"p1": "pending"})
+    res = http(app, "POST", "/admin/registrations/bulk/approve",
+               json={**CREDS, "ids": ["p1", "p1", "p1"]})
+    assert res.json() == {"results": {"p1": "approved"}}
+
+
+def test_approve_invalidates_only_changed_profiles(db, http, app, cache):
+    add_users(db, {"p1": "pending", "a1": "approved"})
+    cache.put_profile("p1", b"{}")
+    cache.put_profile("a1", b"{}")
+    http(app, "POST", "/admin/registrations/bulk/approve", json={**CREDS, "ids": ["p1", "a1"]})
+    assert cache.get_profile("p1") is None
+    assert cache.get_profile("a1") == b"{}"
+
+
+# ------------------------------------------------------------------
+# Reject
+# ------------------------------------------------------------------
+def test_reject_outcomes_and_reasons(db, http, app, cache):
+    add_users(db, {"p1": "pending", "p2": "pending", "p3": "approved", "p4": "pending"})
+    cache.put_profile("p3", b"{}")
+    res = http(app, "POST", "/admin/registrations/bulk/reject", json={
+        **CREDS,
+        "reason": "blurry selfie",
+        "items": [{"id": "p1"}, {"id": "p2", "reason": "id expired"}, {"id": "p3"}, {"id": "ghost"}],
+    })
+    assert res.status_code == 200
+    assert res.json() == {"results": {
+        "p1": "rejected", "p2": "rejected", "p3": "rejected", "ghost": "not_found",
+    }}
+    assert user(db, "p1").rejection_reason == "blurry selfie"
+    assert user(db, "p2").rejection_reason == "id expired"
+    rejected = user(db, "p3")
+    assert (rejected.registration_status, rejected.verified) == ("rejected", False)
+    assert user(db, "p4").registration_status == "pending"
+    assert cache.get_profile("p3") is None
+
+
+def test_reject_without_any_reason(db, http, app, cache):
+    add_users(db, {"p1": "pending", "p2": "pending"})
+    res = http(app, "POST", "/admin/registrations/bulk/reject", json={
+        **CREDS, "items": [{"id": "p1"}, {"id": "p2", "reason": "spam"}],
+    })
+    assert res.json() == {"results": {"p1": "missing_reason", "p2": "rejected"}}
+    assert user(db, "p1").registration_status == "pending"
+
+
+def test_reject_repeated_id_keeps_the_last_reason(db, http, app, cache):
+    add_users(db, {"p1": "pending"})
+    res = http(app, "POST", "/admin/registrations/bulk/reject", json={
+        **CREDS, "items": [{"id": "p1", "reason": "first"}, {"id": "p1", "reason": "second"}],
+    })
+    assert res.json() == {"results": {"p1": "rejected"}}
+    assert user(db, "p1").rejection_reason == "second"
+
+
+# ------------------------------------------------------------------
+# Whole-request failures
+# ------------------------------------------------------------------
+@pytest.mark.parametrize("path, body", [
+    ("approve", {"ids": ["p1"]}),
+    ("reject", {"items": [{"id": "p1", "reason": "spam"}]}),
+])
+def test_bad_credentials(db, http, app, cache, path, body):
+    add_users(db, {"p1": "pending"})
+    res = http(app, "POST", f"/admin/registrations/bulk/{path}",
+               json={"email": admin.ADMIN_EMAIL, "password": "wrong", **body})
+    assert res.status_code == 401
+    assert user(db, "p1").registration_status == "pending"
+
+
+@pytest.mark.parametrize("size", [0, 4])
+@pytest.mark.parametrize("path, body", [
+    ("approve", lambda ids: {"ids": ids}),
+    ("reject", lambda ids: {"items": [{"id": i, "reason": "spam"} for i in ids]}),
+])
+def test_batch_size_limits(db, http, app, cache, monkeypatch, size, path, body):
+    monkeypatch.setattr(admin, "BULK_REVIEW_MAX_IDS", 3)
+    add_users(db, {f"p{i}": "pending" for i in range(size)})
+    res = http(app, "POST", f"/admin/registrations/bulk/{path}",
+               json={**CREDS, **body([f"p{i}" for i in range(size)])})
+    assert res.status_code == 400
+    assert db.query(User).filter(User.registration_status != "pending").count() == 0
@@ -0,0 +1,132 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from models.user import User
+from routers.admin import decode_cursor, encode_cursor, registrations_page
+
+
+def b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("created_at, user_id", [
+    (datetime(2026, 1, 2, 3, 4, 5, 678901), "0b6c8f1e-2f4c-4c61-9a63-3f0c1d2e4b5a"),
+    (datetime(2026, 1, 2), "1"),
+    (datetime(1999, 12, 31, 23, 59, 59), "id/with?odd&chars"),
+])
+def test_round_trip(created_at, user_id):
+    cursor = encode_cursor(created_at, user_id)
+    assert decode_cursor(cursor) == (created_at, user_id)
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(datetime(2026, 1, 2, 3, 4, 5), "a" * 37)
+    assert "=" not in cursor
+    assert all(c.isalnum() or c in "-_" for c in cursor)
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not a cursor",
+    "%%%%",
+    # Valid base64, not JSON
+    b64(b"\xff\xfe garbage"),
+    # JSON of the wrong shape
+    b64(json.dumps({"created_at": "2026-01-02"}).encode()),
+    b64(json.dumps(["2026-01-02T00:00:00"]).encode()),
+    b64(json.dumps(["2026-01-02T00:00:00", "id", "extra"]).encode()),
+    b64(json.dumps(42).encode()),
+    # Right shape, bad timestamp
+    b64(json.dumps(["yesterday", "id"]).encode()),
+    b64(json.dumps([12345, "id"]).encode()),
+])
+def test_tampered_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+    assert exc.value.detail == "Invalid cursor"
+
+
+def test_truncated_cursor_is_rejected():
+    cursor = encode_cursor(datetime(2026, 1, 2, 3, 4, 5), "user-1")
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor[: len(cursor) // 2])
+
+
+def test_null_created_at_round_trips():
+    cursor = encode_cursor(None, "legacy-1")
+    assert decode_cursor(cursor) == (None, "legacy-1")
+
+
+# ------------------------------------------------------------------
+# Paging, including rows with a NULL created_at
+# ------------------------------------------------------------------
+def add_users(db, rows):
+    for user_id, created_at in rows:
+        db.add(User(
+            id=user_id, name=user_id, email=f"{user_id}@example.com", phone="555-0100",
+            gender="other", dob="1990-01-01", created_at=created_at,
+        ))
+    db.commit()
+    # The column default fills in None on insert; put the legacy NULLs back
+    legacy = [user_id for user_id, created_at in rows if created_at is None]
+    db.query(User).filter(User.id.in_(legacy)).update({"created_at": None}, synchronize_session=False)
+    db.commit()
+
+
+def walk(db, limit, status=None):
+    """Ids in page order, following cursors the way a client would."""
+    seen, cursor = [], None
+    while True:
+        after = decode_cursor(cursor) if cursor else None
+        page = registrations_page(db, status, after, limit + 1)
+        more = len(page) > limit
+        page = page[:limit]
+        seen.extend(u.id for u in page)
+        if not more:
+            return seen
+        cursor = encode_cursor(page[-1].created_at, page[-1].id)
+
+
+ROWS = [
+    ("u1", datetime(2026, 1, 1)),
+    ("u2", datetime(2026, 1, 2)),
+    ("u3", datetime(2026, 1, 2)),
+    ("u4", datetime(2026, 1, 3)),
+    ("old-a", None),
+    ("old-b", None),
+    ("old-c", None),
+]
+EXPECTED = ["u4", "u3", "u2", "u1", "old-c", "old-b", "old-a"]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 7, 100])
+def test_pages_cover_every_row_once_newest_first(db, limit):
+    add_users(db, ROWS)
+    assert walk(db, limit) == EXPECTED
+
+
+def test_listing_pages_through_null_rows(db, http, monkeypatch):
+    from fastapi import FastAPI
+
+    from routers import admin
+
+    add_users(db, ROWS)
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/admin")
+    creds = {"email": admin.ADMIN_EMAIL, "password": admin.ADMIN_PASSWORD}
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        res = http(app, "GET", "/admin/registrations", params=params, json=creds)
+        assert res.status_code == 200
+        seen.extend(r["id"] for r in res.json())
+        cursor = res.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert seen == EXPECTED
@@ -0,0 +1,76 @@
+import base64
+import math
+
+import pytest
+
+from bloom import BloomFilter
+
+
+def ids(prefix, count):
+    return [f"{prefix}-{i}" for i in range(count)]
+
+
+def test_added_items_are_always_found():
+    bloom = BloomFilter.for_capacity(1000, 0.001)
+    members = ids("revoked", 1000)
+    for item in members:
+        bloom.add(item)
+    assert all(item in bloom for item in members)
+
+
+def test_empty_filter_contains_nothing():
+    bloom = BloomFilter.for_capacity(100, 0.01)
+    assert not any(item in bloom for item in ids("x", 100))
+
+
+def test_false_positive_rate_is_near_target():
+    bloom = BloomFilter.build(ids("revoked", 2000), 2000, 0.01)
+    probes = ids("live", 20000)
+    rate = sum(item in bloom for item in probes) / len(probes)
+    assert rate < 0.02
+
+
+def test_sizing_follows_the_standard_formulas():
+    bloom = BloomFilter.for_capacity(1000, 0.001)
+    assert bloom.size_bits == math.ceil(-1000 * math.log(0.001) / math.log(2) ** 2)
+    assert bloom.hashes == 10
+    assert len(bloom.bits) == (bloom.size_bits + 7) // 8
+    # Capacity 0 still gives a usable filter
+    assert BloomFilter.for_capacity(0, 0.01).size_bits > 0
+
+
+def test_serialization_round_trip():
+    members = ids("revoked", 300)
+    bloom = BloomFilter.build(members, 500, 0.001)
+    data = bloom.to_dict()
+    assert set(data) == {"size_bits", "hashes", "bits"}
+
+    copy = BloomFilter.from_dict(data)
+    assert (copy.size_bits, copy.hashes, copy.bits) == (bloom.size_bits, bloom.hashes, bloom.bits)
+    assert all(item in copy for item in members)
+    probes = ids("live", 2000)
+    assert [p in copy for p in probes] == [p in bloom for p in probes]
+
+
+def test_round_trip_copy_is_independent():
+    bloom = BloomFilter.build(["a"], 10, 0.01)
+    copy = BloomFilter.from_dict(bloom.to_dict())
+    copy.add("b")
+    assert "b" in copy
+    assert "b" not in bloom
+
+
+@pytest.mark.parametrize("change", [
+    {"size_bits": 10_000},
+    {"hashes": 0},
+    {"bits": base64.b64encode(b"\x00").decode()},
+])
+def test_malformed_data_is_rejected(change):
+    data = dict(BloomFilter.for_capacity(100, 0.01).to_dict(), **change)
+    with pytest.raises(ValueError):
+        BloomFilter.from_dict(data)
+
+
+def test_missing_fields_are_rejected():
+    with pytest.raises(KeyError):
+        BloomFilter.from_dict({"size_bits": 8, "hashes": 1})
@@ -0,0 +1,76 @@
+import re
+
+import pytest
+from fastapi import FastAPI, File, UploadFile
+
+from body_limit import UPLOAD_LIMITS, BodySizeLimit
+
+LIMIT = 1024
+
+
+@pytest.fixture
+def upload_app():
+    app = FastAPI()
+    app.add_middleware(BodySizeLimit, limits=[("POST", re.compile(r"/users/[^/]+/photos"), LIMIT)])
+    app.state.handled = 0
+
+    @app.post("/users/{user_id}/photos")
+    async def upload(user_id: str, file: UploadFile = File(...)):
+        app.state.handled += 1
+        return {"size": len(await file.read())}
+
+    @app.post("/other")
+    async def other(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    return app
+
+
+def photo(size):
+    return {"file": ("a.jpg", b"x" * size, "image/jpeg")}
+
+
+def test_under_the_cap_is_handled(upload_app, http):
+    res = http(upload_app, "POST", "/users/u1/photos", files=photo(512))
+    assert res.status_code == 200
+    assert res.json() == {"size": 512}
+
+
+def test_declared_length_over_the_cap_is_refused_unread(upload_app, http):
+    res = http(upload_app, "POST", "/users/u1/photos", files=photo(4096))
+    assert res.status_code == 413
+    assert upload_app.state.handled == 0
+
+
+def test_chunked_body_is_cut_off_at_the_cap(upload_app, http):
+    chunks_sent = []
+
+    async def body():
+        yield b'--b\r\nContent-Disposition: form-data; name="file"; filename="a.jpg"\r\n\r\n'
+        for _ in range(64):
+            chunks_sent.append(1)
+            yield b"x" * 256
+        yield b"\r\n--b--\r\n"
+
+    res = http(
+        upload_app, "POST", "/users/u1/photos",
+        content=body(),
+        headers={"Content-Type": "multipart/form-data; boundary=b"},
+    )
+    assert res.status_code == 413
+    assert upload_app.state.handled == 0
+    # Stopped reading soon after the cap, not at the end of the body
+    assert len(chunks_sent) < 64
+
+
+def test_other_routes_are_not_limited(upload_app, http):
+    assert http(upload_app, "POST", "/other", files=photo(4096)).status_code == 200
+    assert http(upload_app, "GET", "/users/u1/photos").status_code == 405
+
+
+def test_default_limits_cover_the_upload_routes():
+    limiter = BodySizeLimit(app=None)
+    assert limiter.limit_for("POST", "/auth/signup") == UPLOAD_LIMITS[0][2]
+    assert limiter.limit_for("POST", "/users/abc/photos") == UPLOAD_LIMITS[1][2]
+    assert limiter.limit_for("POST", "/users/abc/photos/extra") is None
+    assert limiter.limit_for("GET", "/auth/signup") is None
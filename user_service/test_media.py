@@ -0,0 +1,174 @@
+import os
+
+import pytest
+
+from media import parse_range
+
+SIZE = 1000
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=500-", (500, 999)),
+    ("bytes=999-999", (999, 999)),
+    # End past the file is clamped to the last byte
+    ("bytes=900-5000", (900, 999)),
+    ("bytes= 10-20", (10, 20)),
+])
+def test_single_ranges(header, expected):
+    assert parse_range(header, SIZE) == expected
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=-100", (900, 999)),
+    ("bytes=-1", (999, 999)),
+    # Longer than the file: the whole file
+    ("bytes=-5000", (0, 999)),
+])
+def test_suffix_ranges(header, expected):
+    assert parse_range(header, SIZE) == expected
+
+
+@pytest.mark.parametrize("header", [
+    None,
+    "",
+    # Several ranges are answered with the full file
+    "bytes=0-99,200-299",
+    "bytes=-10, 0-5",
+    "items=0-99",
+    "bytes=",
+    "bytes=-",
+    "bytes=abc-def",
+    "bytes=1-x",
+    "bytes=0x10-20",
+    "bytes=-+5",
+    # Reversed bounds are invalid syntax, not unsatisfiable
+    "bytes=50-10",
+])
+def test_full_file_instead_of_range(header):
+    assert parse_range(header, SIZE) is None
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=1000-", SIZE),
+    ("bytes=1000-2000", SIZE),
+    ("bytes=-0", SIZE),
+    ("bytes=0-0", 0),
+    ("bytes=-10", 0),
+])
+def test_unsatisfiable(header, size):
+    with pytest.raises(ValueError):
+        parse_range(header, size)
+
+
+# -------------------------------
+# serve_media
+# -------------------------------
+@pytest.fixture
+def media_app(tmp_path, monkeypatch):
+    import storage
+    from fastapi import FastAPI
+    from routers import media
+
+    monkeypatch.setattr(storage, "UPLOAD_DIR", str(tmp_path))
+    app = FastAPI()
+    app.include_router(media.router, prefix="/users")
+    return app
+
+
+def put(namespace: str, name: str, data: bytes) -> str:
+    import storage
+
+    digest = name[:64]
+    path = storage.object_path(namespace, digest, name[64:])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return f"/users/media/{namespace}/{name}"
+
+
+DIGEST = "ab" * 32
+
+
+def test_image_served_with_fixed_type(media_app, http):
+    url = put("photos", DIGEST + ".png", b"\x89PNG\r\n\x1a\n" + b"\x00" * 100)
+    res = http(media_app, "GET", url)
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "image/png"
+    assert res.headers["x-content-type-options"] == "nosniff"
+    assert "content-disposition" not in res.headers
+    assert res.headers["etag"] == f'"{DIGEST}"'
+    assert res.headers["cache-control"] == "public, max-age=31536000, immutable"
+
+
+@pytest.mark.parametrize("ext", [".html", ".svg", ".js", ""])
+def test_other_types_are_downloads(media_app, http, ext):
+    # e.g. stored before extensions were sniffed from content
+    url = put("photos", DIGEST + ext, b"<html><script>alert(1)</script></html>")
+    res = http(media_app, "GET", url)
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/octet-stream"
+    assert res.headers["content-disposition"] == "attachment"
+    assert res.headers["x-content-type-options"] == "nosniff"
+
+
+def test_range_and_conditional_requests(media_app, http):
+    data = bytes(range(256)) * 4
+    url = put("photos", DIGEST + ".jpg", data)
+
+    partial = http(media_app, "GET", url, headers={"Range": "bytes=-10"})
+    assert partial.status_code == 206
+    assert partial.content == data[-10:]
+    assert partial.headers["content-range"] == f"bytes {len(data) - 10}-{len(data) - 1}/{len(data)}"
+
+    unsatisfiable = http(media_app, "GET", url, headers={"Range": f"bytes={len(data)}-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == f"bytes */{len(data)}"
+
+    cached = http(media_app, "GET", url, headers={"If-None-Match": f'"{DIGEST}"'})
+    assert cached.status_code == 304
+    assert cached.headers["x-content-type-options"] == "nosniff"
+
+    head = http(media_app, "HEAD", url)
+    assert head.status_code == 200
+    assert head.headers["content-length"] == str(len(data))
+    assert head.content == b""
+
+
+def test_unknown_names_are_not_found(media_app, http):
+    assert http(media_app, "GET", f"/users/media/photos/{DIGEST}.png").status_code == 404
+    assert http(media_app, "GET", "/users/media/photos/../../etc/passwd").status_code == 404
+    assert http(media_app, "GET", f"/users/media/other/{DIGEST}.png").status_code == 404
+
+
+def test_private_documents_need_owner_or_admin(media_app, http, db):
+    import storage
+    from models.user import User
+    from routers.auth import create_access_token
+
+    url = put("id_documents", DIGEST + ".jpg", b"\xff\xd8\xff" + b"\x00" * 10)
+    document = storage.object_path("id_documents", DIGEST, ".jpg")
+    db.add(User(id="owner", email="owner@example.com", id_document_path=document))
+    db.add(User(id="other", email="other@example.com"))
+    db.commit()
+
+    def get(user_id=None):
+        headers = {"Authorization": f"Bearer {create_access_token(user_id, user_id)}"} if user_id else {}
+        return http(media_app, "GET", url, headers=headers)
+
+    assert get().status_code == 404
+    assert get("other").status_code == 404
+    owner = get("owner")
+    assert owner.status_code == 200
+    assert owner.headers["content-type"] == "image/jpeg"
+    assert owner.headers["vary"] == "Authorization"
+    assert owner.headers["cache-control"] == "private, no-cache"
+
+    revalidated = http(media_app, "GET", url, headers={
+        "Authorization": f"Bearer {create_access_token('owner', 'owner')}",
+        "If-None-Match": f'"{DIGEST}"',
+    })
+    assert revalidated.status_code == 304
+    # Revalidation is still authorized: no 304 for someone else
+    stranger = http(media_app, "GET", url, headers={"If-None-Match": f'"{DIGEST}"'})
+    assert stranger.status_code == 404
@@ -0,0 +1,180 @@
+import json
+
+import pytest
+
+import profile_cache
+from profile_cache import CacheBackend, MemoryBackend, NullBackend, ProfileCache, RedisBackend, make_backend
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(profile_cache, "time", clock)
+    return clock
+
+
+class RecordingBackend(CacheBackend):
+    """Dict-backed; records delete() calls."""
+
+    def __init__(self):
+        self.data = {}
+        self.deletes = []
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        self.deletes.append(keys)
+        for key in keys:
+            self.data.pop(key, None)
+
+
+# ------------------------------------------------------------------
+# Backends
+# ------------------------------------------------------------------
+def test_backends_must_implement_the_interface():
+    class Partial(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+    assert RecordingBackend().stats() == {}
+
+
+def test_memory_backend_counts_hits_and_misses(clock):
+    cache = MemoryBackend(maxsize=10, ttl=60)
+    cache.set("a", b"1")
+    assert cache.get("a") == b"1"
+    assert cache.get("a") == b"1"
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (2, 1, 0.6667)
+
+
+def test_memory_backend_evicts_least_recently_used(clock):
+    cache = MemoryBackend(maxsize=2, ttl=60)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    cache.get("a")
+    cache.set("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 2
+
+
+def test_memory_backend_expires_entries(clock):
+    cache = MemoryBackend(maxsize=10, ttl=60)
+    cache.set("a", b"1")
+    clock.now += 60
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert (stats["expirations"], stats["misses"], stats["entries"]) == (1, 1, 0)
+
+
+def test_memory_backend_counts_invalidations_of_present_keys(clock):
+    cache = MemoryBackend(maxsize=10, ttl=60)
+    cache.set("a", b"1")
+    cache.delete("a", "never-set")
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_memory_backend_of_size_zero_stores_nothing(clock):
+    cache = MemoryBackend(maxsize=0, ttl=60)
+    cache.set("a", b"1")
+    assert cache.get("a") is None
+
+
+def test_null_backend():
+    cache = NullBackend()
+    cache.set("a", b"1")
+    assert cache.get("a") is None
+    assert cache.stats() == {"backend": "none"}
+
+
+def test_redis_backend_counts_hits_and_misses():
+    class FakeRedis:
+        def __init__(self):
+            self.data, self.ttls = {}, {}
+
+        def get(self, key):
+            return self.data.get(key)
+
+        def set(self, key, value, px):
+            self.data[key], self.ttls[key] = value, px
+
+        def delete(self, *keys):
+            for key in keys:
+                self.data.pop(key, None)
+
+    backend = RedisBackend.__new__(RedisBackend)
+    backend._client, backend.ttl, backend.prefix = FakeRedis(), 30.0, "us:"
+    backend.hits = backend.misses = 0
+
+    backend.set("a", b"1")
+    assert backend._client.ttls == {"us:a": 30000}
+    assert backend.get("a") == b"1"
+    assert backend.get("b") is None
+    backend.delete("a")
+    assert backend.get("a") is None
+    assert backend.stats() == {"backend": "redis", "hits": 1, "misses": 2, "hit_rate": 0.3333}
+
+
+def test_make_backend():
+    assert isinstance(make_backend("none"), NullBackend)
+    assert isinstance(make_backend("memory"), MemoryBackend)
+    custom = make_backend("test_profile_cache:RecordingBackend")
+    assert type(custom).__name__ == "RecordingBackend"
+
+
+# ------------------------------------------------------------------
+# ProfileCache
+# ------------------------------------------------------------------
+def test_profile_bodies_round_trip():
+    cache = ProfileCache(RecordingBackend())
+    cache.put_profile("u1", b'{"id":"u1"}')
+    assert cache.get_profile("u1") == b'{"id":"u1"}'
+    assert cache.get_profile("u2") is None
+
+
+def test_fields_hit_only_when_every_requested_field_is_cached():
+    cache = ProfileCache(RecordingBackend())
+    cache.merge("u1", {"id": "u1", "name": "Ann"})
+    cache.merge("u1", {"gender": "f"})
+    assert cache.get("u1", ["name", "gender"]) == {"id": "u1", "name": "Ann", "gender": "f"}
+    assert cache.get("u1", ["name", "bio"]) is None
+    assert cache.get("u2", ["name"]) is None
+
+
+def test_invalidate_drops_both_entries():
+    backend = RecordingBackend()
+    cache = ProfileCache(backend)
+    cache.put_profile("u1", b"{}")
+    cache.merge("u1", {"name": "Ann"})
+    cache.invalidate("u1")
+    assert backend.data == {}
+
+
+def test_invalidate_many_is_one_backend_call():
+    backend = RecordingBackend()
+    cache = ProfileCache(backend)
+    for uid in ("u1", "u2", "u3"):
+        cache.put_profile(uid, json.dumps({"id": uid}).encode())
+    cache.invalidate_many(["u1", "u2"])
+    assert backend.deletes == [("profile:u1", "fields:u1", "profile:u2", "fields:u2")]
+    assert list(backend.data) == ["profile:u3"]
+
+    cache.invalidate_many([])
+    assert len(backend.deletes) == 1
@@ -0,0 +1,81 @@
+import os
+
+import jwt
+import pytest
+
+import signing_keys
+from signing_keys import KeyRing
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(signing_keys.time, "time", clock)
+    return clock
+
+
+def ring(directory):
+    # Rotate every 100s, publish 10s ahead, keep the old key 30s
+    return KeyRing(str(directory), rotate_after=100, publish_ahead=10, retain=30)
+
+
+def published(keys):
+    return [jwk["kid"] for jwk in keys.jwks()["keys"]]
+
+
+def test_first_key_is_created_and_reused(tmp_path, clock):
+    keys = ring(tmp_path)
+    first = keys.current()
+    clock.now += 50
+    assert keys.current().kid == first.kid
+    assert published(keys) == [first.kid]
+    assert os.listdir(tmp_path) == [f"{first.kid}.pem"]
+
+
+def test_rotation_publishes_ahead_then_retires_old_key(tmp_path, clock):
+    keys = ring(tmp_path)
+    old = keys.current()
+
+    # Due for rotation: the successor is published but not yet signing
+    clock.now += 95
+    assert keys.current().kid == old.kid
+    new = published(keys)[0]
+    assert published(keys) == [new, old.kid]
+
+    clock.now += 10
+    assert keys.current().kid == new
+    assert published(keys) == [new, old.kid]
+    assert keys.public_key(old.kid) is not None
+
+    # Retained long enough for the old key's tokens to expire, then removed
+    clock.now += 31
+    assert keys.current().kid == new
+    assert published(keys) == [new]
+    assert keys.public_key(old.kid) is None
+
+
+def test_tokens_verify_with_the_published_key(tmp_path, clock):
+    keys = ring(tmp_path)
+    key = keys.current()
+    token = jwt.encode({"sub": "u"}, key.private_key, algorithm="RS256", headers={"kid": key.kid})
+
+    jwk = keys.jwks()["keys"][0]
+    assert (jwk["kid"], jwk["alg"], jwk["use"]) == (key.kid, "RS256", "sig")
+    assert "d" not in jwk
+    assert jwt.decode(token, jwt.PyJWK(jwk).key, algorithms=["RS256"]) == {"sub": "u"}
+
+
+def test_workers_sharing_the_directory_see_each_others_keys(tmp_path, clock):
+    one, two = ring(tmp_path), ring(tmp_path)
+    key = one.current()
+    assert two.current().kid == key.kid
+    assert two.public_key(key.kid) is not None
+    assert len(os.listdir(tmp_path)) == 1
@@ -0,0 +1,93 @@
+import asyncio
+import io
+import os
+
+import pytest
+from starlette.datastructures import UploadFile
+
+import storage
+from storage import UploadTooLarge, media_url, sniff_extension, store_upload
+
+JPEG = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00" + b"\x00" * 64
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+
+def upload(data: bytes, filename: str = "photo.jpg", size=None) -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename=filename, size=size)
+
+
+def store(data: bytes, namespace="photos", max_bytes=1024, **kwargs):
+    return asyncio.run(store_upload(upload(data, **kwargs), namespace, max_bytes))
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.mark.parametrize("head, ext", [
+    (JPEG, ".jpg"),
+    (PNG, ".png"),
+    (b"GIF89a" + b"\x00" * 10, ".gif"),
+    (b"RIFF\x00\x00\x00\x00WEBPVP8 ", ".webp"),
+    (b"<html><script>alert(1)</script>", ""),
+    (b'<svg xmlns="http://www.w3.org/2000/svg">', ""),
+    (b"%PDF-1.7", ""),
+    (b"", ""),
+])
+def test_sniff_extension(head, ext):
+    assert sniff_extension(head) == ext
+
+
+def test_extension_comes_from_content_not_filename(upload_dir):
+    stored = store(b"<html><script>alert(1)</script></html>", filename="evil.html")
+    assert os.path.splitext(stored.path)[1] == ""
+
+    disguised = store(b"<svg onload=alert(1)>", filename="photo.jpg")
+    assert os.path.splitext(disguised.path)[1] == ""
+
+    renamed = store(PNG, filename="photo.html")
+    assert renamed.path.endswith(".png")
+
+
+def test_content_addressed_path(upload_dir):
+    stored = store(JPEG)
+    digest = stored.sha256
+    assert stored.path == os.path.join(str(upload_dir), "photos", digest[:2], digest[2:4], digest + ".jpg")
+    assert stored.size == len(JPEG)
+    with open(stored.path, "rb") as f:
+        assert f.read() == JPEG
+    assert media_url(stored.path) == f"/users/media/photos/{digest}.jpg"
+
+
+def test_identical_uploads_are_deduplicated(upload_dir):
+    first = store(JPEG, filename="a.jpg")
+    second = store(JPEG, filename="b.jpg")
+    assert not first.deduplicated
+    assert second.deduplicated
+    assert second.path == first.path
+    # The temporary copy of the duplicate is gone
+    assert os.listdir(upload_dir / "photos" / "tmp") == []
+
+    other_namespace = store(JPEG, namespace="selfies")
+    assert not other_namespace.deduplicated
+
+
+def test_size_cap_while_streaming(upload_dir):
+    with pytest.raises(UploadTooLarge):
+        store(JPEG + b"\x00" * 2048, max_bytes=1024)
+    # Nothing left behind, not even the temporary file
+    assert os.listdir(upload_dir / "photos" / "tmp") == []
+    assert sorted(os.listdir(upload_dir / "photos")) == ["tmp"]
+
+
+def test_size_cap_from_declared_size(upload_dir):
+    with pytest.raises(UploadTooLarge):
+        store(JPEG, max_bytes=1024, size=4096)
+    assert not (upload_dir / "photos").exists()
+
+
+def test_exactly_at_cap_is_accepted():
+    data = JPEG + b"\x00" * (1024 - len(JPEG))
+    assert store(data, max_bytes=1024).size == 1024
@@ -0,0 +1,104 @@
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import event
+
+from models.user import User
+from profile_cache import MemoryBackend, ProfileCache
+from routers import users
+
+
+@pytest.fixture
+def app(db, monkeypatch):
+    for i in range(1, 4):
+        db.add(User(
+            id=f"u{i}", name=f"User {i}", email=f"u{i}@example.com", phone="555-0100",
+            gender="other", dob="1990-01-01", password_hash="secret-hash",
+            profile_photo=f"uploads/photos/ab/cd/{'ab' * 32}.jpg" if i == 1 else None,
+        ))
+    db.commit()
+    monkeypatch.setattr(users, "profile_cache", ProfileCache(MemoryBackend(maxsize=100, ttl=60)))
+    app = FastAPI()
+    app.include_router(users.router, prefix="/users")
+    return app
+
+
+@pytest.fixture
+def queries(db):
+    """SELECTs against the users table, counted."""
+    engine = db.get_bind()
+    seen = []
+
+    def count(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM users" in statement:
+            seen.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    yield seen
+    event.remove(engine, "before_cursor_execute", count)
+
+
+def batch(http, app, **payload):
+    return http(app, "POST", "/users/batch", json=payload)
+
+
+def test_batch_returns_found_and_missing_in_request_order(app, http):
+    res = batch(http, app, ids=["u3", "nope", "u1", "u3"])
+    assert res.status_code == 200
+    body = res.json()
+    assert [u["id"] for u in body["users"]] == ["u3", "u1"]
+    assert body["missing"] == ["nope"]
+
+
+def test_fields_are_projected(app, http, queries):
+    res = batch(http, app, ids=["u1", "u2"], fields=["name", "profile_photo"])
+    users_out = res.json()["users"]
+    assert users_out[0] == {
+        "id": "u1",
+        "name": "User 1",
+        "profile_photo": f"/users/media/photos/{'ab' * 32}.jpg",
+    }
+    assert set(users_out[1]) == {"id", "name", "profile_photo"}
+    # Only the requested columns are selected, in one query
+    assert len(queries) == 1
+    assert "password_hash" not in queries[0]
+    assert "email" not in queries[0]
+
+
+def test_all_profile_fields_by_default_and_nothing_private(app, http):
+    user = batch(http, app, ids=["u2"]).json()["users"][0]
+    assert set(user) == set(users.PROFILE_FIELDS)
+    assert "password_hash" not in user
+
+
+def test_unknown_or_private_fields_are_rejected(app, http):
+    res = batch(http, app, ids=["u1"], fields=["name", "password_hash"])
+    assert res.status_code == 400
+    assert "password_hash" in res.json()["detail"]
+
+
+def test_too_many_ids(app, http, monkeypatch):
+    monkeypatch.setattr(users, "BATCH_MAX_IDS", 2)
+    assert batch(http, app, ids=["u1", "u2", "u3"]).status_code == 400
+    # Duplicates don't count against the limit
+    assert batch(http, app, ids=["u1", "u2", "u1"]).status_code == 200
+
+
+def test_cached_users_are_not_queried(app, http, queries):
+    batch(http, app, ids=["u1", "u2"], fields=["name", "gender"])
+    queries.clear()
+
+    # A narrower projection is served from the cached fields
+    res = batch(http, app, ids=["u1", "u2"], fields=["name"])
+    assert [u["name"] for u in res.json()["users"]] == ["User 1", "User 2"]
+    assert queries == []
+
+    # Only the user that isn't cached is looked up
+    res = batch(http, app, ids=["u1", "u3"], fields=["name"])
+    assert [u["name"] for u in res.json()["users"]] == ["User 1", "User 3"]
+    assert len(queries) == 1
+
+
+def test_update_invalidates_cached_fields(app, http):
+    batch(http, app, ids=["u1"], fields=["name"])
+    assert http(app, "PUT", "/users/u1", json={"name": "Renamed"}).status_code == 200
+    assert batch(http, app, ids=["u1"], fields=["name"]).json()["users"][0]["name"] == "Renamed"